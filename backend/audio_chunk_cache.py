@@ -0,0 +1,124 @@
+"""
+Size-bounded on-disk LRU cache of fixed-size chunks of stored audio files.
+
+GET /tracks/{id}/audio serves byte ranges by reading whole chunks through
+this cache, so seeking within a track only fetches the chunks that are not on
+local disk yet. Chunks are keyed by blob name, blob generation and chunk
+index, which makes a replaced file miss instead of serving stale bytes.
+Concurrent requests for the same missing chunk share one fetch.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class AudioChunkCache:
+    """LRU of chunk files under `directory`, at most `max_bytes` in total.
+
+    The index lives in memory, so the cache is per process: each instance
+    keeps its files in a private subdirectory of `directory`, and close()
+    removes only that. Index updates happen on the event loop; file I/O runs
+    in worker threads.
+    """
+
+    def __init__(self, directory: str, chunk_size: int, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix="chunks-", dir=directory))
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (blob name, generation, index) -> chunk size
+        self.bytes = 0
+        self._loading = {}  # key -> task fetching that chunk
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fetched_bytes = 0
+
+    def _path(self, key) -> Path:
+        blob_name, generation, index = key
+        digest = hashlib.sha1(f"{blob_name}#{generation}".encode()).hexdigest()
+        return self.directory / f"{digest}.{index}"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # Write then rename, so readers never see a partial chunk
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def _add(self, key, size: int) -> None:
+        self.entries[key] = size
+        self.bytes += size
+        while self.bytes > self.max_bytes and self.entries:
+            old_key, old_size = self.entries.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    async def _load(self, key, fetch) -> bytes:
+        data = await fetch()
+        self.fetched_bytes += len(data)
+        if len(data) <= self.max_bytes:
+            await asyncio.to_thread(self._write, self._path(key), data)
+            self._add(key, len(data))
+        return data
+
+    def _loaded(self, key, task) -> None:
+        self._loading.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here too, in case every waiter has gone away
+            logger.warning(f"Fetching audio chunk {key} failed: {task.exception()}")
+
+    async def get(self, blob_name: str, generation, index: int, fetch) -> bytes:
+        """
+        Chunk `index` of a blob generation; `fetch` is a coroutine function
+        returning the chunk bytes from storage on a miss.
+        """
+        key = (blob_name, generation, index)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            try:
+                data = await asyncio.to_thread(self._path(key).read_bytes)
+                self.hits += 1
+                return data
+            except FileNotFoundError:
+                self.bytes -= self.entries.pop(key, 0)
+
+        task = self._loading.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._loaded(key, done))
+        # A disconnecting client must not cancel a fetch other requests wait for
+        return await asyncio.shield(task)
+
+    def close(self) -> None:
+        """Delete this cache's chunk files"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        """Size, hit and miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "chunks": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "chunk_size": self.chunk_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "fetched_bytes": self.fetched_bytes,
+        }
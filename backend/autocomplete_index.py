@@ -0,0 +1,193 @@
+"""
+In-process prefix index for typeahead over the track name fields.
+
+For every autocomplete field the distinct values are kept in sorted arrays of
+(case-folded value, value), one per audio language plus one across all
+languages, so a prefix lookup is a bisect followed by a short forward scan.
+Each track's contribution is remembered by id, which makes updates idempotent
+and lets the index be kept current from the track write path. Writes made by
+other processes are not seen; `version` records the global catalog version the
+index reflects so callers can tell when it needs a rebuild.
+"""
+import asyncio
+import bisect
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# URL name -> track field
+AUTOCOMPLETE_FIELDS = {
+    "composer": "music_composer",
+    "lyricist": "lyricist",
+    "singer": "singer_name",
+    "album": "album_name",
+}
+LANGUAGE_FIELD = "audio_language"
+ALL_LANGUAGES = "*"
+# Yield to the event loop every this many documents while building
+BUILD_YIELD_EVERY = 1000
+
+
+def normalize(value) -> str:
+    """Case-fold a value or prefix for matching"""
+    return str(value).strip().casefold() if value else ""
+
+
+class AutocompleteIndex:
+    """Sorted distinct values of AUTOCOMPLETE_FIELDS per language, keyed by track id.
+
+    Not thread-safe: all mutations are expected to happen on the event loop.
+    """
+
+    def __init__(self):
+        self.entries = {}  # (field, language) -> sorted list of (normalized value, value)
+        self.counts = {}  # (field, language) -> {value: number of tracks}
+        self.documents = {}  # track id -> tuple of (field, language, value)
+        self.ready = False
+        self.version = None  # Global catalog version the entries reflect
+        self._building = False
+        self._removed_during_build = set()
+        self._shadow = None  # Fresh index being built by rebuild()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _increment(self, key, value):
+        counts = self.counts.setdefault(key, {})
+        if value not in counts:
+            bisect.insort(self.entries.setdefault(key, []), (normalize(value), value))
+        counts[value] = counts.get(value, 0) + 1
+
+    def _decrement(self, key, value):
+        counts = self.counts.get(key, {})
+        if value not in counts:
+            return
+        counts[value] -= 1
+        if counts[value] > 0:
+            return
+        del counts[value]
+        entries = self.entries[key]
+        position = bisect.bisect_left(entries, (normalize(value), value))
+        if position < len(entries) and entries[position][1] == value:
+            del entries[position]
+
+    def add(self, track: dict) -> None:
+        """Index a track document, replacing any previous entry for the same id"""
+        track_id = track.get("id")
+        if not track_id:
+            return
+        self.remove(track_id)
+        self._removed_during_build.discard(track_id)
+
+        language = track.get(LANGUAGE_FIELD) or ""
+        contributions = []
+        for field in AUTOCOMPLETE_FIELDS.values():
+            value = str(track.get(field) or "").strip()
+            if value:
+                contributions.append((field, language, value))
+        self.documents[track_id] = tuple(contributions)
+        for field, language, value in contributions:
+            self._increment((field, language), value)
+            self._increment((field, ALL_LANGUAGES), value)
+        if self._shadow is not None:
+            self._shadow.add(track)
+
+    def remove(self, track_id: str) -> None:
+        """Drop a track's values from the index"""
+        if self._building:
+            self._removed_during_build.add(track_id)
+        if self._shadow is not None:
+            self._shadow.remove(track_id)
+        contributions = self.documents.pop(track_id, None)
+        if contributions is None:
+            return
+        for field, language, value in contributions:
+            self._decrement((field, language), value)
+            self._decrement((field, ALL_LANGUAGES), value)
+
+    def _scan(self, key, needle: str, limit: int) -> list:
+        """Up to `limit` (normalized value, value) entries of `key` starting with `needle`"""
+        entries = self.entries.get(key, [])
+        position = bisect.bisect_left(entries, (needle,))
+        matches = []
+        while position < len(entries) and len(matches) < limit and entries[position][0].startswith(needle):
+            matches.append(entries[position])
+            position += 1
+        return matches
+
+    def complete(self, field: str, prefix: str, languages=None, limit: int = 10) -> list:
+        """
+        Distinct values of `field` starting with `prefix` (case-insensitive),
+        in alphabetical order with the number of tracks using each value.
+        `languages` restricts the lookup to those audio languages; None means all.
+        """
+        needle = normalize(prefix)
+        keys = [(field, ALL_LANGUAGES)] if languages is None else [(field, language) for language in languages]
+
+        matches = sorted({entry for key in keys for entry in self._scan(key, needle, limit)})[:limit]
+        return [
+            {"value": value, "count": sum(self.counts.get(key, {}).get(value, 0) for key in keys)}
+            for _, value in matches
+        ]
+
+    async def build(self, collection, version=None) -> None:
+        """
+        Populate the index from a Motor collection using a projected cursor.
+        `version` is the global catalog version read before the cursor started.
+        """
+        started = time.perf_counter()
+        self._building = True
+        self._removed_during_build = set()
+        try:
+            projection = {"_id": 0, "id": 1, LANGUAGE_FIELD: 1, **{field: 1 for field in AUTOCOMPLETE_FIELDS.values()}}
+            processed = 0
+            async for track in collection.find({}, projection):
+                if track.get("id") not in self._removed_during_build and track.get("id") not in self.documents:
+                    self.add(track)
+                processed += 1
+                if processed % BUILD_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+            # Writes that raced the cursor win over the snapshot it returned
+            for track_id in self._removed_during_build:
+                if track_id in self.documents:
+                    self.remove(track_id)
+        finally:
+            self._building = False
+            self._removed_during_build = set()
+
+        self.version = version
+        self.ready = True
+        stats = self.stats()
+        logger.info(
+            f"Autocomplete index built in {time.perf_counter() - started:.2f}s: "
+            f"{stats['tracks']} tracks, distinct values {stats['distinct_values']}"
+        )
+
+    async def rebuild(self, collection, version=None) -> None:
+        """
+        Build a fresh index from the collection and swap it in once complete.
+        The current entries stay in place meanwhile, and writes applied during
+        the rebuild reach both indexes.
+        """
+        fresh = AutocompleteIndex()
+        self._shadow = fresh
+        try:
+            await fresh.build(collection, version)
+        finally:
+            self._shadow = None
+        self.entries, self.counts, self.documents = fresh.entries, fresh.counts, fresh.documents
+        self.version = version
+        self.ready = True
+
+    def stats(self) -> dict:
+        """Number of indexed tracks and distinct values per field across all languages"""
+        return {
+            "ready": self.ready,
+            "version": self.version,
+            "tracks": len(self.documents),
+            "distinct_values": {
+                name: len(self.entries.get((field, ALL_LANGUAGES), []))
+                for name, field in AUTOCOMPLETE_FIELDS.items()
+            },
+        }
@@ -0,0 +1,124 @@
+"""
+Benchmark the track list serialization paths.
+
+Compares the legacy path (parse_from_mongo -> MusicTrack model per row ->
+FastAPI response_model validation -> stdlib JSON) with the fast path used by
+GET /api/tracks (stored dicts encoded directly with orjson) on synthetic rows:
+
+    python benchmark_serialization.py --rows 1000 10000 100000
+"""
+import asyncio
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models import MusicTrack
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ["Telugu", "Hindi", "Tamil", "English"]
+
+
+def parse_args():
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark track list serialization paths')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                      help='Row counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3,
+                      help='Runs per path and row count; the fastest run is reported')
+    return parser.parse_args()
+
+
+def make_rows(count: int) -> List[dict]:
+    """Synthetic track documents shaped like the stored ones (every model field, created_at as an ISO string)"""
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        language = LANGUAGES[i % len(LANGUAGES)]
+        row = MusicTrack(**{
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "unique_code": f"{language[:3].upper()}-MR{i:06d}",
+            "rights_type": "multi_rights",
+            "serial_number": f"MR{i:06d}",
+            "title": f"Track {i}",
+            "music_composer": f"Composer {i % 97}",
+            "lyricist": f"Lyricist {i % 89}",
+            "singer_name": f"Singer {i % 83}",
+            "tempo": "120",
+            "scale": "C Major",
+            "audio_language": language,
+            "release_date": "2024-01-01",
+            "album_name": f"Album {i % 211}",
+            "mp3_blob_name": f"audio/{i}.mp3",
+            "mp3_filename": f"{i}.mp3",
+            "created_at": started + timedelta(seconds=i),
+            "created_by": "admin-id",
+        }).model_dump()
+        row["created_at"] = row["created_at"].isoformat()
+        rows.append(row)
+    return rows
+
+
+def parse_from_mongo(item):
+    """Same conversion server.parse_from_mongo applies (kept here to avoid importing the app)"""
+    if isinstance(item.get("created_at"), str):
+        try:
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+        except ValueError:
+            pass
+    return item
+
+
+async def legacy_path(rows: List[dict]) -> bytes:
+    """Per-row model construction followed by a response_model pass"""
+    field = create_response_field(name="Response_get_tracks", type_=List[MusicTrack])
+    tracks = [MusicTrack(**parse_from_mongo(dict(row))) for row in rows]
+    content = await serialize_response(field=field, response_content=tracks, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def fast_path(rows: List[dict]) -> bytes:
+    """Stored dicts encoded directly, as GET /api/tracks does"""
+    return ORJSONResponse({"items": rows, "next_cursor": None}).body
+
+
+async def best_time(func, rows: List[dict], repeat: int):
+    """Fastest wall time over `repeat` runs, plus the encoded size"""
+    best, size = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await func(rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        size = len(body)
+    return best, size
+
+
+async def main():
+    """Main entry point with CLI argument handling."""
+    args = parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    for count in args.rows:
+        rows = make_rows(count)
+        legacy, legacy_size = await best_time(legacy_path, rows, args.repeat)
+        fast, fast_size = await best_time(fast_path, rows, args.repeat)
+        logger.info(
+            f"{count:>7} rows: legacy {legacy * 1000:8.1f} ms ({legacy_size / 1_000_000:.1f} MB), "
+            f"fast {fast * 1000:8.1f} ms ({fast_size / 1_000_000:.1f} MB), "
+            f"speedup x{legacy / fast:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
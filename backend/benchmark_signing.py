@@ -0,0 +1,108 @@
+"""
+Benchmark the URL signers.
+
+Signs --count distinct stream URLs with each requested signer, --concurrency at
+a time, and reports throughput and the signer's own latency counters:
+
+    python benchmark_signing.py --signer fake local_key --key-file sa.json --bucket my-bucket
+    SIGNING_SERVICE_ACCOUNT_EMAIL=signer@project.iam.gserviceaccount.com \\
+        python benchmark_signing.py --signer iam --bucket my-bucket
+
+The fake signer needs no credentials; --fake-latency-ms simulates a network
+round trip so the concurrency limit can be exercised offline.
+"""
+import asyncio
+import argparse
+import logging
+import os
+import time
+from datetime import timedelta
+
+from url_signers import URL_SIGNER_KINDS, build_url_signer
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark URL signers')
+    parser.add_argument('--signer', choices=URL_SIGNER_KINDS, nargs='+', default=['fake'],
+                      help='Signers to benchmark')
+    parser.add_argument('--count', type=int, default=1000,
+                      help='URLs to sign per signer')
+    parser.add_argument('--concurrency', type=int, default=16,
+                      help='Signer concurrency limit')
+    parser.add_argument('--bucket', default=os.environ.get('GCS_BUCKET_NAME', 'fake-bucket'),
+                      help='Bucket the URLs are signed for')
+    parser.add_argument('--key-file', default=os.environ.get('SIGNING_KEY_FILE'),
+                      help='Service-account key file for the local_key signer')
+    parser.add_argument('--fake-latency-ms', type=float, default=0.0,
+                      help='Simulated latency of the fake signer')
+    return parser.parse_args()
+
+
+def make_bucket(kind: str, args):
+    """Storage bucket for the real signers (none for the fake)"""
+    if kind == "fake":
+        return None
+    from google.cloud import storage
+
+    if kind == "local_key":
+        from google.oauth2 import service_account
+
+        credentials = service_account.Credentials.from_service_account_file(args.key_file)
+        client = storage.Client(project=credentials.project_id, credentials=credentials)
+    else:
+        client = storage.Client()
+    return client.bucket(args.bucket)
+
+
+def make_credential_manager(kind: str):
+    if kind != "iam" or not os.environ.get('SIGNING_SERVICE_ACCOUNT_EMAIL'):
+        return None
+    from signing_credentials import SigningCredentialManager
+
+    return SigningCredentialManager(os.environ['SIGNING_SERVICE_ACCOUNT_EMAIL'])
+
+
+async def run(kind: str, args):
+    """Sign args.count URLs with one signer and log the results"""
+    signer = build_url_signer(
+        kind,
+        bucket=make_bucket(kind, args),
+        credential_manager=make_credential_manager(kind),
+        key_file=args.key_file,
+        max_concurrency=args.concurrency,
+        fake_latency=args.fake_latency_ms / 1000,
+        bucket_name=args.bucket,
+    )
+    # Warm up credentials outside the measurement
+    await signer.sign("audio/warmup.mp3", timedelta(hours=2))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        signer.sign(f"audio/{i:08d}.mp3", timedelta(hours=2)) for i in range(args.count)
+    ))
+    elapsed = time.perf_counter() - started
+    stats = signer.stats()
+    logger.info(
+        f"{kind:>9}: {args.count} URLs in {elapsed:.2f}s ({args.count / elapsed:,.0f}/s), "
+        f"avg {stats['avg_ms']} ms, max {stats['max_ms']} ms, failures {stats['failures']}"
+    )
+
+
+async def main():
+    """Main entry point with CLI argument handling."""
+    args = parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    for kind in args.signer:
+        await run(kind, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,244 @@
+"""
+Declarative MongoDB index registry.
+
+Every query shape issued by the routes in server.py is listed in QUERY_SHAPES
+and must be served by one of the indexes declared in INDEXES. The indexes are
+created idempotently at application startup; the query shapes can be checked
+against a live database with:
+
+    python db_indexes.py --verify
+
+which runs explain() on every shape and exits non-zero if any of them falls
+back to a collection scan.
+"""
+import asyncio
+import argparse
+import logging
+import sys
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Collation of case-insensitive sorts; queries must use it to be served by the matching index
+CASE_INSENSITIVE_COLLATION = {"locale": "en", "strength": 2}
+
+# collection name -> list of (keys, options)
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        ([("manager_id", ASCENDING)], {"name": "manager_id"}),
+    ],
+    "managers": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        ([("email", ASCENDING)], {"name": "email"}),
+        ([("is_active", ASCENDING)], {"name": "is_active"}),
+    ],
+    "tracks": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        # Legacy tracks may have no unique_code, so uniqueness only applies to real codes
+        ([("unique_code", ASCENDING)], {
+            "name": "unique_code_unique",
+            "unique": True,
+            "partialFilterExpression": {"unique_code": {"$type": "string"}},
+        }),
+        # Serves exact and anchored-prefix unique_code lookups sorted by code
+        ([("unique_code", ASCENDING), ("id", ASCENDING)], {"name": "unique_code_id"}),
+        ([("serial_number", ASCENDING), ("id", ASCENDING)], {"name": "serial_number_id"}),
+        # Track list pages (newest first), admin and manager scoped
+        ([("created_at", DESCENDING), ("id", DESCENDING)], {"name": "created_at_id"}),
+        ([("audio_language", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {
+            "name": "audio_language_created_at_id",
+        }),
+        # Sorted track pages (GET /tracks?sort=...); each index also serves the reverse direction.
+        # Titles sort case-insensitively, so their index carries the same collation as the query.
+        ([("title", ASCENDING), ("id", ASCENDING)], {
+            "name": "title_id",
+            "collation": CASE_INSENSITIVE_COLLATION,
+        }),
+        ([("release_date", ASCENDING), ("id", ASCENDING)], {"name": "release_date_id"}),
+        # Free-text search. Names span many languages, so no stemming or stop words.
+        ([
+            ("title", TEXT),
+            ("unique_code", TEXT),
+            ("music_composer", TEXT),
+            ("singer_name", TEXT),
+            ("album_name", TEXT),
+        ], {
+            "name": "track_search_text",
+            "weights": {"title": 10, "unique_code": 10, "music_composer": 5, "singer_name": 5, "album_name": 3},
+            "default_language": "none",
+        }),
+    ],
+    "email_logs": [
+        ([("type", ASCENDING), ("sent_at", DESCENDING)], {"name": "type_sent_at"}),
+        ([("recipient_email", ASCENDING), ("type", ASCENDING), ("sent_at", DESCENDING)], {
+            "name": "recipient_email_type_sent_at",
+        }),
+    ],
+}
+
+# Query shapes used by the routes: (description, collection, filter, sort[, collation]).
+# Values are placeholders; only the shape matters to the query planner.
+QUERY_SHAPES = [
+    ("login / register by email", "users", {"email": "user@example.com"}, None),
+    ("current user by id", "users", {"id": "user-id"}, None),
+    ("users of a manager", "users", {"manager_id": "manager-id"}, None),
+    ("manager by id", "managers", {"id": "manager-id"}, None),
+    ("active manager by id", "managers", {"id": "manager-id", "is_active": True}, None),
+    ("manager by email", "managers", {"email": "manager@example.com"}, None),
+    ("active managers", "managers", {"is_active": True}, None),
+    ("track by id", "tracks", {"id": "track-id"}, None),
+    ("track by unique_code", "tracks", {"unique_code": "TEL-MR0001"}, None),
+    (
+        "manager batch get",
+        "tracks",
+        {"id": {"$in": ["track-1", "track-2"]}, "audio_language": {"$in": ["Telugu"]}},
+        None,
+    ),
+    ("next unique_code", "tracks", {"unique_code": {"$regex": "^TEL-MR\\d+$"}}, [("unique_code", -1)]),
+    ("next serial_number", "tracks", {"serial_number": {"$regex": "^MR"}}, [("serial_number", -1)]),
+    ("admin track page", "tracks", {}, [("created_at", -1), ("id", -1)]),
+    (
+        "manager track page",
+        "tracks",
+        {"audio_language": {"$in": ["Telugu", "Hindi"]}},
+        [("created_at", -1), ("id", -1)],
+    ),
+    (
+        "track page after cursor",
+        "tracks",
+        {"$or": [
+            {"created_at": {"$lt": "2024-01-01T00:00:00+00:00"}},
+            {"created_at": "2024-01-01T00:00:00+00:00", "id": {"$lt": "track-id"}},
+        ]},
+        [("created_at", -1), ("id", -1)],
+    ),
+    (
+        "track page by title",
+        "tracks",
+        {"$or": [{"title": {"$gt": "melody"}}, {"title": "melody", "id": {"$gt": "track-id"}}]},
+        [("title", 1), ("id", 1)],
+        CASE_INSENSITIVE_COLLATION,
+    ),
+    ("track page by unique_code", "tracks", {}, [("unique_code", -1), ("id", -1)]),
+    ("track page by serial_number", "tracks", {}, [("serial_number", 1), ("id", 1)]),
+    ("track page by release_date", "tracks", {}, [("release_date", -1), ("id", -1)]),
+    (
+        "manager track page by title",
+        "tracks",
+        {"audio_language": {"$in": ["Telugu", "Hindi"]}},
+        [("title", 1), ("id", 1)],
+        CASE_INSENSITIVE_COLLATION,
+    ),
+    ("unique_code prefix search", "tracks", {"unique_code": {"$regex": "^TEL-MR00"}}, None),
+    ("text search", "tracks", {"$text": {"$search": "melody"}}, None),
+    (
+        "manager text search",
+        "tracks",
+        {"$and": [{"audio_language": {"$in": ["Telugu"]}}, {"$text": {"$search": "melody"}}]},
+        None,
+    ),
+    ("credential email logs", "email_logs", {"type": "manager_credentials"}, [("sent_at", -1)]),
+    (
+        "manager credential email log",
+        "email_logs",
+        {"recipient_email": "manager@example.com", "type": "manager_credentials"},
+        [("sent_at", -1)],
+    ),
+]
+
+
+async def ensure_indexes(db):
+    """
+    Create every declared index. Safe to run on every startup: existing indexes
+    with the same definition are left alone. Failures (e.g. duplicate data that
+    violates a unique index) are logged and do not stop the remaining indexes.
+    If MongoDB cannot be reached at all, the bootstrap is abandoned (also
+    logged) instead of waiting out a timeout per index; it runs again on the
+    next startup.
+    """
+    created, failed = 0, 0
+    for collection_name, indexes in INDEXES.items():
+        for keys, options in indexes:
+            try:
+                await db[collection_name].create_index(keys, **options)
+                created += 1
+            except ConnectionFailure as e:
+                logger.error(f"Index bootstrap abandoned, MongoDB is unreachable: {e}")
+                return False
+            except PyMongoError as e:
+                failed += 1
+                logger.error(f"Failed to create index {collection_name}.{options.get('name')}: {e}")
+    logger.info(f"Index bootstrap finished: {created} ensured, {failed} failed")
+    return failed == 0
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree"""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def verify_query_plans(db):
+    """
+    Run explain() on every registered query shape.
+
+    Returns a list of (description, stages) for the shapes whose winning plan
+    contains a COLLSCAN. An empty list means every shape is index-backed.
+    """
+    collscans = []
+    for description, collection_name, query, sort, *collation in QUERY_SHAPES:
+        cursor = db[collection_name].find(query, collation=collation[0] if collation else None)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.limit(1).explain()
+        winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(_plan_stages(winning_plan))
+        if "COLLSCAN" in stages:
+            collscans.append((description, stages))
+            logger.error(f"COLLSCAN for query shape '{description}' on {collection_name}: {stages}")
+        else:
+            logger.info(f"OK: '{description}' -> {' <- '.join(stages)}")
+    return collscans
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Create MongoDB indexes and verify query plans')
+    parser.add_argument('--verify', action='store_true',
+                      help='Fail if any registered query shape uses a collection scan')
+    return parser.parse_args()
+
+
+async def main():
+    """Main entry point with CLI argument handling."""
+    args = parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    from server import db
+
+    ok = await ensure_indexes(db)
+    if args.verify:
+        collscans = await verify_query_plans(db)
+        if collscans:
+            logger.error(f"{len(collscans)} query shape(s) fall back to COLLSCAN")
+            return 1
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
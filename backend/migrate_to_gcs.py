@@ -1,6 +1,6 @@
 import asyncio
 import argparse
-from server import db, upload_to_gcs
+from server import db, upload_file_to_storage
 from fastapi import UploadFile
 from io import BytesIO
 import aiofiles
@@ -70,7 +70,7 @@ async def migrate_track_to_gcs(track, dry_run: bool = False):
                 # Use a placeholder blob name for dry run
                 blob_name = f"{folder}/{filename}"
             else:
-                blob_name = await upload_to_gcs(file, folder)
+                blob_name = await upload_file_to_storage(file, folder)
                 logger.info(f"Migrated {file_path} to GCS blob: {blob_name}")
             
             updates[blob_key] = blob_name
@@ -0,0 +1,208 @@
+"""
+Pydantic models for the Music Production Inventory API.
+
+Kept free of database and storage side effects so scripts and benchmarks can
+import them without a running MongoDB or GCS bucket.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import uuid
+
+from pydantic import BaseModel, Field
+
+# Maximum number of ids accepted by POST /tracks/batch-get
+TRACK_BATCH_MAX_IDS = 500
+# Maximum number of (track, file type) pairs accepted by POST /tracks/signed-urls
+TRACK_SIGNED_URL_MAX_ITEMS = 200
+
+class User(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    username: str
+    email: str
+    user_type: str = "admin"  # "admin" or "manager"
+    manager_id: Optional[str] = None  # Link to manager record if user_type is "manager"
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class UserCreate(BaseModel):
+    username: str
+    email: str
+    password: str
+
+class UserLogin(BaseModel):
+    email: str
+    password: str
+
+class ForgotPasswordRequest(BaseModel):
+    email: str
+
+class ResetPasswordRequest(BaseModel):
+    token: str
+    new_password: str
+
+class AdminPasswordUpdateRequest(BaseModel):
+    user_id: str
+    new_password: str
+    notify_user: bool = True
+
+class Manager(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    email: str
+    assigned_language: List[str]
+    phone: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: str
+
+class ManagerCreate(BaseModel):
+    name: str
+    email: str
+    assigned_language: List[str]
+    phone: Optional[str] = None
+    custom_password: Optional[str] = None  # Admin can set custom password
+
+class ManagerUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    assigned_language: Optional[List[str]] = None
+    phone: Optional[str] = None
+    is_active: Optional[bool] = None
+
+class AccessScope(BaseModel):
+    """What the current user may see, resolved once per request"""
+    user: User
+    role: str  # "admin" or "manager"
+    is_active: bool = True
+    # Audio languages the user may access; None means unrestricted, [] means none
+    languages: Optional[List[str]] = None
+
+    @property
+    def is_restricted(self) -> bool:
+        return self.languages is not None
+
+    def allows_language(self, language: Optional[str]) -> bool:
+        return self.languages is None or language in self.languages
+
+    def track_filter(self, track_id: str) -> Dict[str, Any]:
+        """Mongo filter for one track that only matches if the user may access it"""
+        if self.languages is None:
+            return {"id": track_id}
+        return {"id": track_id, "audio_language": {"$in": self.languages}}
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+    user: User
+
+class MusicTrack(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    unique_code: Optional[str] = None  # User-provided unique identifier for the track
+    rights_type: Optional[str] = None  # "original" or "multi_rights"
+    track_category: Optional[str] = None  # "cover_song" or "original_composition" (only for original tracks)
+    rights_details: Optional[str] = None  # "multi_rights" or "own_rights"
+    serial_number: Optional[str] = None  # Auto-generated based on rights_type (OC or MR prefix)
+    title: str
+    music_composer: str
+    lyricist: str
+    singer_name: str
+    tempo: Optional[str] = None
+    scale: Optional[str] = None
+    audio_language: str
+    release_date: Optional[str] = None
+    album_name: Optional[str] = None
+    other_info: Optional[str] = None
+    # GCS blob names for file storage
+    mp3_blob_name: Optional[str] = None
+    lyrics_blob_name: Optional[str] = None
+    session_blob_name: Optional[str] = None
+    singer_agreement_blob_name: Optional[str] = None
+    music_director_agreement_blob_name: Optional[str] = None
+    # Legacy file paths - to be removed after migration
+    mp3_file_path: Optional[str] = None
+    lyrics_file_path: Optional[str] = None
+    session_file_path: Optional[str] = None
+    singer_agreement_file_path: Optional[str] = None
+    music_director_agreement_file_path: Optional[str] = None
+    mp3_filename: Optional[str] = None
+    lyrics_filename: Optional[str] = None
+    session_filename: Optional[str] = None
+    singer_agreement_filename: Optional[str] = None
+    music_director_agreement_filename: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: str
+    managed_by: Optional[str] = None
+    revision: int = 0  # Incremented on every update; drives the track ETag
+
+class MusicTrackCreate(BaseModel):
+    unique_code: str
+    rights_type: str  # "original" or "multi_rights"
+    track_category: Optional[str] = None  # "cover_song" or "original_composition" (only for original tracks)
+    rights_details: Optional[str] = None  # "multi_rights" or "own_rights"
+    title: str
+    music_composer: str
+    lyricist: str
+    singer_name: str
+    tempo: Optional[str] = None
+    scale: Optional[str] = None
+    audio_language: str
+    release_date: Optional[str] = None
+    album_name: Optional[str] = None
+    other_info: Optional[str] = None
+
+class MusicTrackUpdate(BaseModel):
+    unique_code: Optional[str] = None
+    rights_type: Optional[str] = None
+    track_category: Optional[str] = None
+    rights_details: Optional[str] = None
+    title: Optional[str] = None
+    music_composer: Optional[str] = None
+    lyricist: Optional[str] = None
+    singer_name: Optional[str] = None
+    tempo: Optional[str] = None
+    scale: Optional[str] = None
+    audio_language: Optional[str] = None
+    release_date: Optional[str] = None
+    album_name: Optional[str] = None
+    other_info: Optional[str] = None
+
+# All MusicTrack field names, for validating sparse fieldsets
+TRACK_FIELDS = set(MusicTrack.model_fields)
+
+class TrackPage(BaseModel):
+    items: List[Dict[str, Any]]  # MusicTrack documents restricted to the requested fields
+    next_cursor: Optional[str] = None  # Pass back as `after` to fetch the next page
+
+class TrackBatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=TRACK_BATCH_MAX_IDS)
+    fields: Optional[str] = "all"  # Same values as the `fields` query parameter of GET /tracks
+
+class TrackBatchGetResponse(BaseModel):
+    items: List[Dict[str, Any]]  # Found tracks, in request order
+    not_found: List[str] = []
+    forbidden: List[str] = []
+
+class TrackFileRef(BaseModel):
+    track_id: str
+    file_type: str = "mp3"  # "mp3", "lyrics", "session", "singer_agreement" or "music_director_agreement"
+    mode: str = "download"  # "download" (attachment URL) or "stream" (mp3 only)
+
+class TrackSignedUrlRequest(BaseModel):
+    items: List[TrackFileRef] = Field(..., min_length=1, max_length=TRACK_SIGNED_URL_MAX_ITEMS)
+
+class TrackSignedUrl(BaseModel):
+    track_id: str
+    file_type: str
+    mode: str
+    url: Optional[str] = None
+    max_age: Optional[int] = None  # Seconds the URL may be reused by the client
+    status: int = 200  # HTTP status the single-item endpoint would have returned
+    error: Optional[str] = None
+
+class TrackSignedUrlResponse(BaseModel):
+    items: List[TrackSignedUrl]  # One result per requested pair, in request order
+
+class BulkUploadResponse(BaseModel):
+    successful_count: int
+    failed_count: int
+    errors: List[dict] = []
+    successful_tracks: List[str] = []
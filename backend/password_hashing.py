@@ -0,0 +1,143 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow (~250 ms at cost 12), so hashing inline would stall
+every other request while users log in. Hashes and checks run in a small
+dedicated thread pool (bcrypt releases the GIL), admission is capped by a
+semaphore, and callers beyond a bounded wait queue are turned away instead of
+piling up. Legacy unsalted SHA-256 hashes are still accepted and reported by
+needs_rehash() so they can be replaced on the next successful login.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+def _prehash(password: str) -> bytes:
+    """
+    bcrypt only uses the first 72 bytes of its input (and bcrypt>=5 rejects
+    longer ones), so passwords are reduced to a fixed-size SHA-256 digest first.
+    """
+    return base64.b64encode(hashlib.sha256(password.encode()).digest())
+
+
+def is_legacy_hash(hashed_password: str) -> bool:
+    return bool(LEGACY_SHA256_RE.match(hashed_password or ""))
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a bounded thread pool.
+
+    `workers` hashes run at once; up to `max_queue` more callers wait for a
+    slot and any further caller gets PasswordHasherBusy.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 4, max_queue: int = 100):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_waiting = 0
+        self.total_wait_seconds = 0.0
+        self.total_hash_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def _run(self, func, *args):
+        """Run a CPU-bound call in the pool once a slot is free"""
+        # Only callers that would have to wait count against the queue
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy(f"{self.waiting} password hashes already queued")
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        started = time.perf_counter()
+        wait = started - queued
+        self.total_wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_hash_seconds += time.perf_counter() - started
+            self._slots.release()
+
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(_prehash(password), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    @staticmethod
+    def _check(password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(_prehash(password), hashed_password.encode())
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash of a password"""
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a bcrypt or legacy SHA-256 hash"""
+        if not hashed_password:
+            return False
+        if is_legacy_hash(hashed_password):
+            # Cheap enough to stay on the loop
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed_password)
+        return await self._run(self._check, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True for legacy hashes and bcrypt hashes below the configured cost"""
+        if is_legacy_hash(hashed_password):
+            return True
+        try:
+            return int(hashed_password.split("$")[2]) < self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """Pool size, queue depth and latency counters"""
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            "avg_hash_ms": round(self.total_hash_seconds / self.completed * 1000, 2) if self.completed else 0,
+        }
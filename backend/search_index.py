@@ -0,0 +1,190 @@
+"""
+In-process trigram index for substring ("contains") search over the track catalog.
+
+The index maps every 3-character sequence of the searchable track fields to the
+set of track ids containing it. A query is answered by intersecting the posting
+sets of its trigrams (smallest first) and confirming each candidate with a real
+substring check, so results match the old case-insensitive regex search exactly
+without touching MongoDB.
+
+The index only sees the writes of its own process. `version` records the global
+catalog version it reflects, so callers can tell when another instance has
+written since and rebuild it.
+"""
+import asyncio
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("title", "music_composer", "singer_name", "album_name", "unique_code")
+GRAM_SIZE = 3
+# Yield to the event loop every this many documents while building
+BUILD_YIELD_EVERY = 1000
+
+
+def normalize(value) -> str:
+    """Case-fold a field value for matching"""
+    return str(value).casefold() if value else ""
+
+
+def trigrams(text: str) -> set:
+    """All GRAM_SIZE-character substrings of already-normalized text"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """Substring index over SEARCH_FIELDS of every track, keyed by track id.
+
+    Not thread-safe: all mutations are expected to happen on the event loop.
+    """
+
+    def __init__(self):
+        self.postings = {}  # trigram -> set of track ids
+        self.documents = {}  # track id -> tuple of normalized field values
+        self.ready = False
+        self.version = None  # Global catalog version the entries reflect
+        self._building = False
+        self._removed_during_build = set()
+        self._shadow = None  # Fresh index being built by rebuild()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, track: dict) -> None:
+        """Index a track document, replacing any previous entry for the same id"""
+        track_id = track.get("id")
+        if not track_id:
+            return
+        self.remove(track_id)
+        self._removed_during_build.discard(track_id)
+
+        values = tuple(normalize(track.get(field)) for field in SEARCH_FIELDS)
+        self.documents[track_id] = values
+        for gram in set().union(*(trigrams(value) for value in values)):
+            self.postings.setdefault(gram, set()).add(track_id)
+        if self._shadow is not None:
+            self._shadow.add(track)
+
+    def remove(self, track_id: str) -> None:
+        """Drop a track from the index"""
+        if self._building:
+            self._removed_during_build.add(track_id)
+        if self._shadow is not None:
+            self._shadow.remove(track_id)
+        values = self.documents.pop(track_id, None)
+        if values is None:
+            return
+        for gram in set().union(*(trigrams(value) for value in values)):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(track_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def search(self, query: str):
+        """
+        Return the set of track ids whose searchable fields contain `query`
+        (case-insensitive), or None if the query is shorter than a trigram and
+        cannot be answered by the index.
+        """
+        needle = normalize(query).strip()
+        if len(needle) < GRAM_SIZE:
+            return None
+
+        posting_sets = []
+        for gram in trigrams(needle):
+            ids = self.postings.get(gram)
+            if not ids:
+                return set()
+            posting_sets.append(ids)
+        posting_sets.sort(key=len)
+
+        candidates = set(posting_sets[0])
+        for ids in posting_sets[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+
+        # Trigrams can match across non-adjacent positions, so confirm each candidate
+        return {
+            track_id for track_id in candidates
+            if any(needle in value for value in self.documents[track_id])
+        }
+
+    async def build(self, collection, version=None) -> None:
+        """
+        Populate the index from a Motor collection using a projected cursor.
+        `version` is the global catalog version read before the cursor started.
+        """
+        started = time.perf_counter()
+        self._building = True
+        self._removed_during_build = set()
+        try:
+            projection = {"_id": 0, "id": 1, **{field: 1 for field in SEARCH_FIELDS}}
+            processed = 0
+            async for track in collection.find({}, projection):
+                if track.get("id") not in self._removed_during_build and track.get("id") not in self.documents:
+                    self.add(track)
+                processed += 1
+                if processed % BUILD_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+            # Writes that raced the cursor win over the snapshot it returned
+            for track_id in self._removed_during_build:
+                if track_id in self.documents:
+                    self.remove(track_id)
+        finally:
+            self._building = False
+            self._removed_during_build = set()
+
+        self.version = version
+        self.ready = True
+        stats = self.stats()
+        logger.info(
+            f"Track search index built in {time.perf_counter() - started:.2f}s: "
+            f"{stats['tracks']} tracks, {stats['trigrams']} trigrams, "
+            f"~{stats['memory_bytes'] / 1_000_000:.1f} MB "
+            f"(~{stats['memory_bytes_per_100k_tracks'] / 1_000_000:.1f} MB per 100k tracks)"
+        )
+
+    async def rebuild(self, collection, version=None) -> None:
+        """
+        Build a fresh index from the collection and swap it in once complete.
+        The current entries stay in place meanwhile, and writes applied during
+        the rebuild reach both indexes.
+        """
+        fresh = TrigramIndex()
+        self._shadow = fresh
+        try:
+            await fresh.build(collection, version)
+        finally:
+            self._shadow = None
+        self.postings, self.documents = fresh.postings, fresh.documents
+        self.version = version
+        self.ready = True
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index (containers plus their keys and values)"""
+        total = sys.getsizeof(self.postings) + sys.getsizeof(self.documents)
+        for gram, ids in self.postings.items():
+            total += sys.getsizeof(gram) + sys.getsizeof(ids)
+        for track_id, values in self.documents.items():
+            # Track id strings are shared with the posting sets, so count them once here
+            total += sys.getsizeof(track_id) + sys.getsizeof(values)
+            total += sum(sys.getsizeof(value) for value in values)
+        return total
+
+    def stats(self) -> dict:
+        """Size and memory statistics, including memory extrapolated to 100k tracks"""
+        tracks = len(self.documents)
+        memory = self.memory_bytes()
+        return {
+            "ready": self.ready,
+            "version": self.version,
+            "tracks": tracks,
+            "trigrams": len(self.postings),
+            "postings": sum(len(ids) for ids in self.postings.values()),
+            "memory_bytes": memory,
+            "memory_bytes_per_100k_tracks": int(memory / tracks * 100_000) if tracks else 0,
+        }
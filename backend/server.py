@@ -1,41 +1,75 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, status, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, Response, RedirectResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, RedirectResponse, StreamingResponse
 from io import BytesIO
 from dotenv import load_dotenv
 import tempfile
 from google.cloud.exceptions import NotFound, Forbidden
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request as StarletteRequest
 from motor.motor_asyncio import AsyncIOMotorClient
+import csv
 import hashlib
+import json
+import orjson
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 import os
 import logging
+import queue
 import string
 import threading
 import time
 from pathlib import Path
-from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
 import aiofiles
+from cachetools import LRUCache, TTLCache
 import mimetypes
 from bson import ObjectId
+from pymongo import DeleteMany, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import pandas as pd
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 import io
 import urllib.request
 import re
-from urllib.parse import urlparse, parse_qs
-from google.cloud import storage
+from urllib.parse import urlparse, parse_qs, quote
+import unicodedata
 import base64
-from google.auth import impersonated_credentials
-from google.auth.transport.requests import Request
-import google.auth
+from db_indexes import CASE_INSENSITIVE_COLLATION, ensure_indexes
+from search_index import TrigramIndex
+from autocomplete_index import AUTOCOMPLETE_FIELDS, AutocompleteIndex
+from password_hashing import PasswordHasher, PasswordHasherBusy
+from signing_credentials import STORAGE_SCOPES, SigningCredentialManager
+from url_signers import build_url_signer, verify_local_storage_signature
+from storage_backends import GCSStorageBackend, LocalStorageBackend, UploadTooLarge, build_storage_backend
+from audio_chunk_cache import AudioChunkCache
+from models import (
+    AccessScope,
+    TRACK_FIELDS,
+    User,
+    UserCreate,
+    UserLogin,
+    ForgotPasswordRequest,
+    ResetPasswordRequest,
+    AdminPasswordUpdateRequest,
+    Manager,
+    ManagerCreate,
+    ManagerUpdate,
+    Token,
+    MusicTrack,
+    MusicTrackUpdate,
+    TrackPage,
+    TrackBatchGetRequest,
+    TrackBatchGetResponse,
+    TrackSignedUrlRequest,
+    TrackSignedUrlResponse,
+)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -46,8 +80,123 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production'
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480  # 8 hours to prevent frequent session expiration
 
-# Simple password hashing with SHA256
+# Resolved principals: decoded tokens and User objects, so authenticated requests skip Mongo.
+# Writes to a user or manager invalidate explicitly; the TTL bounds staleness across workers.
+PRINCIPAL_CACHE_TTL_SECONDS = 60
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+# Optional self-contained access tokens carrying role, manager state and languages.
+# They are revoked by bumping the user's token_version; other workers notice within the TTL.
+JWT_EMBED_CLAIMS = os.environ.get('JWT_EMBED_CLAIMS', 'false').lower() == 'true'
+TOKEN_VERSION_CACHE_TTL_SECONDS = 30
+# bcrypt password hashing runs in its own thread pool; callers beyond the queue get a 503
+PASSWORD_HASH_ROUNDS = int(os.environ.get('PASSWORD_HASH_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '100'))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 2
+
+# Track list pagination (keyset on created_at + id, newest first)
+TRACK_PAGE_DEFAULT_LIMIT = 100
+TRACK_PAGE_MAX_LIMIT = 500
+# Sortable fields; every sort is (field, direction) with id as the tiebreaker in the same direction
+TRACK_SORT_FIELDS = ["title", "created_at", "unique_code", "serial_number", "release_date"]
+TRACK_DEFAULT_SORT = ("created_at", -1)
+# Human-entered text sorts case-insensitively; the matching index uses the same collation
+TRACK_SORT_COLLATION = CASE_INSENSITIVE_COLLATION
+TRACK_COLLATED_SORT_FIELDS = {"title"}
+TRACK_STREAM_BATCH_SIZE = 500  # Documents per Motor batch when streaming a full listing
+
+# Default list-view projection: what the dashboard renders, without the legacy
+# *_file_path fields, original filenames and audit fields
+TRACK_SUMMARY_FIELDS = [
+    "id", "unique_code", "serial_number", "rights_type", "track_category", "rights_details",
+    "title", "music_composer", "lyricist", "singer_name", "tempo", "scale",
+    "audio_language", "release_date", "album_name",
+    "mp3_blob_name", "lyrics_blob_name", "session_blob_name",
+    "singer_agreement_blob_name", "music_director_agreement_blob_name",
+    "created_at"
+]
+
+# Conditional GET: clients may cache but must revalidate with If-None-Match
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+# Track facets: response key -> track field
+TRACK_FACET_FIELDS = {
+    "language": "audio_language",
+    "rights_type": "rights_type",
+    "composer": "music_composer",
+    "singer": "singer_name",
+    "album": "album_name",
+}
+TRACK_FACET_DEFAULT_TOP = 10
+TRACK_FACET_MAX_TOP = 100
+TRACK_FACET_CACHE_TTL_SECONDS = 30
+
+# Catalog export: column order and headers (track field -> header)
+TRACK_EXPORT_COLUMNS = {
+    "unique_code": "Unique Code",
+    "serial_number": "Serial Number",
+    "title": "Title",
+    "music_composer": "Music Composer",
+    "lyricist": "Lyricist",
+    "singer_name": "Singer Name",
+    "audio_language": "Audio Language",
+    "rights_type": "Rights Type",
+    "track_category": "Track Category",
+    "rights_details": "Rights Details",
+    "tempo": "Tempo",
+    "scale": "Scale",
+    "album_name": "Album Name",
+    "release_date": "Release Date",
+    "other_info": "Other Info",
+    "created_at": "Created At",
+    "id": "Track ID",
+}
+TRACK_EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+TRACK_EXPORT_QUEUE_BATCHES = 4  # Batches buffered between the cursor and the xlsx writer thread
+TRACK_EXPORT_CHUNK_SIZE = 64 * 1024
+
+# GET /tracks page cache, bounded by the total size of the cached response bodies
+TRACK_RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+TRACK_RESULT_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+
+# Signed GET URLs are reused while at least this fraction of their lifetime remains
+SIGNED_URL_CACHE_MAX_ENTRIES = 10000
+SIGNED_URL_MIN_REMAINING_FRACTION = 0.5
+TRACK_STREAM_URL_EXPIRATION = timedelta(hours=2)
+TRACK_DOWNLOAD_URL_EXPIRATION = timedelta(minutes=15)
+# Downloadable track files: file type -> blob field (the original name is in "<file type>_filename")
+TRACK_FILE_BLOB_FIELDS = {
+    "mp3": "mp3_blob_name",
+    "lyrics": "lyrics_blob_name",
+    "session": "session_blob_name",
+    "singer_agreement": "singer_agreement_blob_name",
+    "music_director_agreement": "music_director_agreement_blob_name",
+}
+SIGNED_URL_BATCH_CONCURRENCY = 8  # Signing calls in flight per POST /tracks/signed-urls
+
+# Audio proxy (GET /tracks/{id}/audio): byte ranges are served from fixed-size chunks cached on local disk
+AUDIO_CHUNK_SIZE = 1024 * 1024
+AUDIO_CHUNK_CACHE_DIR = os.environ.get('AUDIO_CHUNK_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'audio-chunks'))
+AUDIO_CHUNK_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CHUNK_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+AUDIO_METADATA_CACHE_TTL_SECONDS = 300
+AUDIO_PROXY_CACHE_CONTROL = "private, max-age=3600"
+
+# Name typeahead
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Track search
+TRACK_SEARCH_MODES = ["contains", "text", "regex"]
+# Searches shaped like a unique code (e.g. TEL-MR0042, ENG-OCC) take the indexed prefix path
+UNIQUE_CODE_SEARCH_RE = re.compile(r"^[A-Za-z]{3}-(OCC|OCW|OC|MR)\d*$", re.IGNORECASE)
+
 security = HTTPBearer()
+password_hasher = PasswordHasher(
+    rounds=PASSWORD_HASH_ROUNDS, workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE
+)
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
@@ -57,26 +206,54 @@ db = client[os.environ['DB_NAME']]
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# --- Google Cloud Storage (GCS) Connection ---
+# --- File storage ---
+# "gcs" (default) or "local": files under LOCAL_STORAGE_ROOT, served by the API itself
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'gcs')
+LOCAL_STORAGE_ROOT = os.environ.get('LOCAL_STORAGE_ROOT')
+# Base of signed local storage URLs; make it absolute when the frontend is served from another origin
+LOCAL_STORAGE_URL_BASE = os.environ.get('LOCAL_STORAGE_URL_BASE', '/api/storage')
+# Largest direct upload accepted through a signed local storage URL
+LOCAL_STORAGE_MAX_UPLOAD_BYTES = int(os.environ.get('LOCAL_STORAGE_MAX_UPLOAD_BYTES', str(2 * 1024 * 1024 * 1024)))
 # This environment variable will be injected from Secret Manager by our CI/CD pipeline.
 GCS_BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME')
 SIGNING_SERVICE_ACCOUNT_EMAIL = os.environ.get('SIGNING_SERVICE_ACCOUNT_EMAIL') # Add this line
-
-# Validate GCS configuration before creating client
-if not GCS_BUCKET_NAME:
-    logger.critical("FATAL: GCS_BUCKET_NAME environment variable is not set.")
-    raise SystemExit(1)
-
-# Initialize GCS client
+# Impersonated credentials shared by every signed URL, refreshed in the background before expiry
+signing_credentials = SigningCredentialManager(SIGNING_SERVICE_ACCOUNT_EMAIL) if SIGNING_SERVICE_ACCOUNT_EMAIL else None
+# How URLs are signed: "iam" (impersonation via signBlob), "local_key" (SIGNING_KEY_FILE),
+# "local" (URLs to the local storage endpoints) or "fake"
+URL_SIGNER = os.environ.get('URL_SIGNER', 'local' if STORAGE_BACKEND == 'local' else 'iam')
+SIGNING_KEY_FILE = os.environ.get('SIGNING_KEY_FILE')
+URL_SIGNER_MAX_CONCURRENCY = int(os.environ.get('URL_SIGNER_MAX_CONCURRENCY', '16'))
+
+# Initialize the storage backend; GCS must be reachable at startup
 try:
-    storage_client = storage.Client()
-    # Verify we can access the bucket (optional)
-    storage_client.get_bucket(GCS_BUCKET_NAME)
-    logger.info(f"Successfully connected to GCS bucket: {GCS_BUCKET_NAME}")
+    storage_backend = build_storage_backend(STORAGE_BACKEND, bucket_name=GCS_BUCKET_NAME, local_root=LOCAL_STORAGE_ROOT)
+    if isinstance(storage_backend, GCSStorageBackend):
+        storage_backend.check()
+        logger.info(f"Successfully connected to GCS bucket: {GCS_BUCKET_NAME}")
+    else:
+        logger.info(f"Storing files on local disk under {LOCAL_STORAGE_ROOT}")
 except Exception as e:
-    logger.critical(f"FATAL: Failed to initialize GCS client or access bucket: {str(e)}")
+    logger.critical(f"FATAL: Failed to initialize {STORAGE_BACKEND} storage: {str(e)}")
     raise SystemExit(1) from e
 
+# A missing signer only disables signed URLs, like a missing signing account did before
+try:
+    url_signer = build_url_signer(
+        URL_SIGNER,
+        bucket=storage_backend.bucket if isinstance(storage_backend, GCSStorageBackend) else None,
+        credential_manager=signing_credentials,
+        key_file=SIGNING_KEY_FILE,
+        max_concurrency=URL_SIGNER_MAX_CONCURRENCY,
+        bucket_name=GCS_BUCKET_NAME or "fake-bucket",
+        local_base_url=LOCAL_STORAGE_URL_BASE,
+        local_secret=SECRET_KEY.encode(),
+    )
+    logger.info(f"Signing URLs with the '{URL_SIGNER}' signer")
+except Exception as e:
+    url_signer = None
+    logger.error(f"URL signing is disabled: {e}")
+
 
 
 # Create the main app
@@ -87,147 +264,41 @@ app = FastAPI(title="Music Production Inventory")
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Models
-class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    username: str
-    email: str
-    user_type: str = "admin"  # "admin" or "manager"
-    manager_id: Optional[str] = None  # Link to manager record if user_type is "manager"
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class UserCreate(BaseModel):
-    username: str
-    email: str
-    password: str
-
-class UserLogin(BaseModel):
-    email: str
-    password: str
-
-class ForgotPasswordRequest(BaseModel):
-    email: str
-
-class ResetPasswordRequest(BaseModel):
-    token: str
-    new_password: str
-
-class AdminPasswordUpdateRequest(BaseModel):
-    user_id: str
-    new_password: str
-    notify_user: bool = True
-
-class Manager(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    name: str
-    email: str
-    assigned_language: List[str]
-    phone: Optional[str] = None
-    is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    created_by: str
-
-class ManagerCreate(BaseModel):
-    name: str
-    email: str
-    assigned_language: List[str]
-    phone: Optional[str] = None
-    custom_password: Optional[str] = None  # Admin can set custom password
-
-class ManagerUpdate(BaseModel):
-    name: Optional[str] = None
-    email: Optional[str] = None
-    assigned_language: Optional[List[str]] = None
-    phone: Optional[str] = None
-    is_active: Optional[bool] = None
-
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-    user: User
-
-class MusicTrack(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    unique_code: Optional[str] = None  # User-provided unique identifier for the track
-    rights_type: Optional[str] = None  # "original" or "multi_rights"
-    track_category: Optional[str] = None  # "cover_song" or "original_composition" (only for original tracks)
-    rights_details: Optional[str] = None  # "multi_rights" or "own_rights"
-    serial_number: Optional[str] = None  # Auto-generated based on rights_type (OC or MR prefix)
-    title: str
-    music_composer: str
-    lyricist: str
-    singer_name: str
-    tempo: Optional[str] = None
-    scale: Optional[str] = None
-    audio_language: str
-    release_date: Optional[str] = None
-    album_name: Optional[str] = None
-    other_info: Optional[str] = None
-    # GCS blob names for file storage
-    mp3_blob_name: Optional[str] = None
-    lyrics_blob_name: Optional[str] = None
-    session_blob_name: Optional[str] = None
-    singer_agreement_blob_name: Optional[str] = None
-    music_director_agreement_blob_name: Optional[str] = None
-    # Legacy file paths - to be removed after migration
-    mp3_file_path: Optional[str] = None
-    lyrics_file_path: Optional[str] = None
-    session_file_path: Optional[str] = None
-    singer_agreement_file_path: Optional[str] = None
-    music_director_agreement_file_path: Optional[str] = None
-    mp3_filename: Optional[str] = None
-    lyrics_filename: Optional[str] = None
-    session_filename: Optional[str] = None
-    singer_agreement_filename: Optional[str] = None
-    music_director_agreement_filename: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    created_by: str
-    managed_by: Optional[str] = None
-
-class MusicTrackCreate(BaseModel):
-    unique_code: str
-    rights_type: str  # "original" or "multi_rights"
-    track_category: Optional[str] = None  # "cover_song" or "original_composition" (only for original tracks)
-    rights_details: Optional[str] = None  # "multi_rights" or "own_rights"
-    title: str
-    music_composer: str
-    lyricist: str
-    singer_name: str
-    tempo: Optional[str] = None
-    scale: Optional[str] = None
-    audio_language: str
-    release_date: Optional[str] = None
-    album_name: Optional[str] = None
-    other_info: Optional[str] = None
-
-class MusicTrackUpdate(BaseModel):
-    unique_code: Optional[str] = None
-    rights_type: Optional[str] = None
-    track_category: Optional[str] = None
-    rights_details: Optional[str] = None
-    title: Optional[str] = None
-    music_composer: Optional[str] = None
-    lyricist: Optional[str] = None
-    singer_name: Optional[str] = None
-    tempo: Optional[str] = None
-    scale: Optional[str] = None
-    audio_language: Optional[str] = None
-    release_date: Optional[str] = None
-    album_name: Optional[str] = None
-    other_info: Optional[str] = None
-
-class BulkUploadResponse(BaseModel):
-    successful_count: int
-    failed_count: int
-    errors: List[dict] = []
-    successful_tracks: List[str] = []
-
 # Security functions
-def verify_password(plain_password, hashed_password):
-    return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+def password_hasher_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Too many password operations in progress, please retry",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
+
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
 
-def get_password_hash(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+async def rehash_legacy_password(user: dict, password: str):
+    """Replace an outdated hash after a successful login; a concurrent password change wins"""
+    if not password_hasher.needs_rehash(user["hashed_password"]):
+        return
+    try:
+        hashed_password = await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        # Try again on a later login rather than failing this one
+        return
+    result = await db.users.update_one(
+        {"id": user["id"], "hashed_password": user["hashed_password"]},
+        {"$set": {"hashed_password": hashed_password}}
+    )
+    if result.modified_count:
+        logger.info(f"Upgraded password hash for user {user['id']}")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -239,22 +310,180 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            logger.warning("JWT token missing 'sub' claim")
+# token -> decoded payload, user id -> User, manager id -> (is_active, languages)
+# and user id -> token_version (None for deleted users)
+decoded_token_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+manager_scope_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+token_version_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=TOKEN_VERSION_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(user_id: str):
+    """Drop a user's cached principal and token version after a write to their account"""
+    principal_cache.pop(user_id, None)
+    token_version_cache.pop(user_id, None)
+
+def invalidate_cached_manager_users(manager_id: str):
+    """Drop the cached access scope of a manager record and the principals linked to it"""
+    manager_scope_cache.pop(manager_id, None)
+    for user_id, user in list(principal_cache.items()):
+        if user.manager_id == manager_id:
+            principal_cache.pop(user_id, None)
+
+async def revoke_manager_user_tokens(manager_id: str):
+    """Bump token_version of the users linked to a manager so their claim tokens stop validating"""
+    users = await db.users.find({"manager_id": manager_id}, {"_id": 0, "id": 1}).to_list(100)
+    if users:
+        await db.users.update_many({"manager_id": manager_id}, {"$inc": {"token_version": 1}})
+    for user in users:
+        invalidate_cached_user(user["id"])
+
+async def load_manager_scope(manager_id: str) -> tuple:
+    """(is_active, assigned languages) of a manager profile, served from manager_scope_cache"""
+    cached = manager_scope_cache.get(manager_id)
+    if cached is None:
+        manager_record = await db.managers.find_one(
+            {"id": manager_id}, {"_id": 0, "is_active": 1, "assigned_language": 1}
+        )
+        if not manager_record:
+            cached = (False, [])
+        else:
+            languages = manager_record.get("assigned_language")
+            if isinstance(languages, str):
+                languages = [languages]
+            cached = (manager_record.get("is_active", True), languages if isinstance(languages, list) else [])
+        manager_scope_cache[manager_id] = cached
+    return cached
+
+async def get_token_version(user_id: str) -> Optional[int]:
+    """Current token_version of a user, or None if the user no longer exists"""
+    if user_id in token_version_cache:
+        return token_version_cache[user_id]
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "token_version": 1})
+    version = None if user is None else user.get("token_version", 0)
+    token_version_cache[user_id] = version
+    return version
+
+async def build_access_token_claims(user: dict) -> dict:
+    """
+    Claims of a newly issued access token. With JWT_EMBED_CLAIMS the token also
+    carries the user's identity, role, manager profile state and languages plus
+    their token_version ("tv"), so requests can be authorized from the token alone.
+    """
+    claims = {"sub": user["id"]}
+    if not JWT_EMBED_CLAIMS:
+        return claims
+    
+    created_at = user.get("created_at")
+    claims.update({
+        "username": user["username"],
+        "email": user["email"],
+        "user_type": user.get("user_type", "admin"),
+        "manager_id": user.get("manager_id"),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "tv": user.get("token_version", 0),
+    })
+    if claims["user_type"] == "manager" and claims["manager_id"]:
+        is_active, languages = await load_manager_scope(claims["manager_id"])
+        claims.update({"active": is_active, "langs": list(languages)})
+    return claims
+
+async def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """
+    Decode the bearer token (cached per token until it expires). Tokens that
+    carry a token_version are rejected once the user's version has moved on,
+    which takes at most TOKEN_VERSION_CACHE_TTL_SECONDS to reach every worker.
+    """
+    token = credentials.credentials
+    payload = decoded_token_cache.get(token)
+    if payload is None or payload.get("exp", 0) <= time.time():
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("sub") is None:
+                logger.warning("JWT token missing 'sub' claim")
+                raise HTTPException(status_code=401, detail="Could not validate credentials")
+        except JWTError as e:
+            logger.warning(f"JWT decode error: {str(e)}")
             raise HTTPException(status_code=401, detail="Could not validate credentials")
-    except JWTError as e:
-        logger.warning(f"JWT decode error: {str(e)}")
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
+        decoded_token_cache[token] = payload
+    
+    if "tv" in payload and await get_token_version(payload["sub"]) != payload["tv"]:
+        logger.warning(f"Rejected revoked token for user {payload['sub']}")
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+async def get_current_user(claims: dict = Depends(get_token_claims)):
+    user_id = claims["sub"]
+    if "tv" in claims:
+        # Self-contained token: the identity travels in the claims
+        return User(
+            id=user_id,
+            username=claims["username"],
+            email=claims["email"],
+            user_type=claims["user_type"],
+            manager_id=claims.get("manager_id"),
+            created_at=claims["created_at"]
+        )
+    
+    cached_user = principal_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
     
     user = await db.users.find_one({"id": user_id})
     if user is None:
         logger.warning(f"User not found for ID: {user_id}")
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    user = User(**user)
+    principal_cache[user_id] = user
+    return user
+
+async def get_access_scope(
+    current_user: User = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims)
+) -> AccessScope:
+    """
+    Resolve the current user's role, active flag and track languages once per request.
+    - Managers are restricted to their assigned language(s); a missing or
+      inactive manager profile, or one without languages, gets no tracks.
+    - Admins see all tracks (languages is None).
+    Self-contained tokens carry the manager's state; otherwise manager profiles
+    are served from manager_scope_cache, invalidated on manager writes.
+    """
+    if current_user.user_type != "manager":
+        return AccessScope(user=current_user, role=current_user.user_type)
+    
+    if not current_user.manager_id:
+        logger.warning(f"Manager user {current_user.id} has no manager_id. Returning empty scope.")
+        return AccessScope(user=current_user, role="manager", is_active=False, languages=[])
+    
+    if "tv" in claims:
+        is_active, languages = claims.get("active", False), claims.get("langs") or []
+    else:
+        is_active, languages = await load_manager_scope(current_user.manager_id)
+    if not is_active:
+        logger.warning(f"Manager profile for user {current_user.id} not found or inactive. Returning empty scope.")
+        languages = []
+    return AccessScope(user=current_user, role="manager", is_active=is_active, languages=list(languages))
+
+async def find_track_in_scope(
+    access: AccessScope,
+    track_id: str,
+    action: str,
+    projection: Optional[dict] = None
+) -> dict:
+    """
+    Load one track with the access check folded into the query. Only when
+    nothing matches is a second, id-only lookup made to tell 403 from 404.
+    """
+    track = await db.tracks.find_one(access.track_filter(track_id), projection)
+    if track:
+        return track
+    if access.is_restricted and await db.tracks.find_one({"id": track_id}, {"_id": 0, "id": 1}):
+        logger.warning(
+            f"Manager {access.user.manager_id} attempted to {action} track {track_id} "
+            f"outside their assigned languages {access.languages}"
+        )
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this track")
+    raise HTTPException(status_code=404, detail="Track not found")
 
 # Mock Email Service (replace with real email service later)
 async def send_manager_login_credentials(email: str, name: str, password: str, password_source: str = "auto-generated"):
@@ -467,6 +696,218 @@ def parse_from_mongo(item):
                     pass
     return item
 
+async def build_track_search_filter(search: str, search_mode: str = "text"):
+    """
+    Build the Mongo filter for the free-text `search` parameter.
+    
+    Returns (filter, ranked). `ranked` is True when the filter is a $text query
+    whose results should be ordered by relevance score.
+    - Searches that look like a unique code (e.g. TEL-MR0042, ENG-OC) use an
+      anchored prefix match on the unique_code index.
+    - "contains" mode resolves the substring match against the in-memory
+      trigram index and fetches the matching ids with a single $in. While the
+      index is behind the global catalog version it falls back to "regex".
+    - "text" mode uses the weighted text index over title, composer, singer,
+      album and unique code.
+    - "regex" mode is the legacy case-insensitive substring match on every
+      field. It cannot use an index and scans the whole collection.
+    """
+    if UNIQUE_CODE_SEARCH_RE.match(search):
+        return {"unique_code": {"$regex": f"^{re.escape(search.upper())}"}}, False
+    
+    if search_mode == "contains":
+        track_ids = None
+        if await catalog_index_is_current(track_search_index):
+            track_ids = track_search_index.search(search)
+        if track_ids is not None:
+            return {"id": {"$in": list(track_ids)}}, False
+        # Index building, behind other instances' writes or query shorter than a
+        # trigram: same semantics, unindexed
+        search_mode = "regex"
+    
+    if search_mode == "regex":
+        return {
+            "$or": [
+                {"unique_code": {"$regex": search, "$options": "i"}},
+                {"title": {"$regex": search, "$options": "i"}},
+                {"music_composer": {"$regex": search, "$options": "i"}},
+                {"singer_name": {"$regex": search, "$options": "i"}},
+                {"album_name": {"$regex": search, "$options": "i"}}
+            ]
+        }, False
+    
+    return {"$text": {"$search": search}}, True
+
+def build_track_filters(composer=None, singer=None, album=None, language=None, rights_type=None):
+    """Build the list of Mongo filters for the optional track filter parameters"""
+    query_filters = []
+    
+    if composer:
+        query_filters.append({"music_composer": {"$regex": composer, "$options": "i"}})
+    if singer:
+        query_filters.append({"singer_name": {"$regex": singer, "$options": "i"}})
+    if album:
+        query_filters.append({"album_name": {"$regex": album, "$options": "i"}})
+    if language:
+        query_filters.append({"audio_language": {"$regex": language, "$options": "i"}})
+    if rights_type in ["original", "multi_rights"]:
+        query_filters.append({"rights_type": rights_type})
+    
+    return query_filters
+
+def resolve_track_projection(fields: Optional[str]) -> dict:
+    """
+    Turn the `fields` query parameter into a Mongo projection.
+    Accepts "summary" (the default list view), "all", or a comma-separated list
+    of MusicTrack field names. id and created_at are always included because
+    pagination cursors are built from them.
+    """
+    if not fields or fields == "summary":
+        names = TRACK_SUMMARY_FIELDS
+    elif fields == "all":
+        return {"_id": 0}
+    else:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TRACK_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown track fields: {', '.join(unknown)}")
+    
+    projection = {"_id": 0, "id": 1, "created_at": 1}
+    projection.update({name: 1 for name in names})
+    return projection
+
+def encode_page_cursor(payload: dict) -> str:
+    """Encode a pagination position as an opaque, URL-safe cursor"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_page_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_page_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor payload must be an object")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return payload
+
+def resolve_track_sort(sort: Optional[str]) -> tuple:
+    """
+    Turn the `sort` query parameter ("title" ascending, "-title" descending)
+    into a (field, direction) pair. Defaults to newest first.
+    """
+    if not sort:
+        return TRACK_DEFAULT_SORT
+    field, direction = (sort[1:], -1) if sort.startswith("-") else (sort, 1)
+    if field not in TRACK_SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort must be one of: {', '.join(TRACK_SORT_FIELDS)} (prefix with - for descending)"
+        )
+    return field, direction
+
+def track_sort_keys(order: tuple) -> list:
+    """Mongo sort specification for a (field, direction) pair, with the id tiebreaker"""
+    field, direction = order
+    return [(field, direction), ("id", direction)]
+
+def track_sort_collation(order: tuple) -> Optional[dict]:
+    """Collation the query must use to be served by the sort's index"""
+    return TRACK_SORT_COLLATION if order[0] in TRACK_COLLATED_SORT_FIELDS else None
+
+def build_keyset_filter(order: tuple, value, track_id: str) -> dict:
+    """
+    Filter for the documents after (value, track_id) in `order`.
+    Missing and null values sort before every other value, so they need their
+    own branches: they come first ascending and last descending.
+    """
+    field, direction = order
+    after_op = "$gt" if direction == 1 else "$lt"
+    if value is None:
+        branches = [{field: None, "id": {after_op: track_id}}]
+        if direction == 1:
+            branches.append({field: {"$ne": None}})
+    else:
+        branches = [{field: {after_op: value}}, {field: value, "id": {after_op: track_id}}]
+        if direction == -1:
+            branches.append({field: None})
+    return {"$or": branches}
+
+async def fetch_track_page(
+    query: dict,
+    limit: int,
+    after: Optional[str] = None,
+    ranked: bool = False,
+    projection: Optional[dict] = None,
+    order: tuple = TRACK_DEFAULT_SORT
+) -> dict:
+    """
+    Fetch one page of tracks.
+    
+    Unranked results are ordered by `order` (newest first by default) using
+    keyset pagination on (sort field, id): only `limit + 1` documents are read,
+    so the cost of a page does not grow with the catalog. Ranked ($text)
+    results are ordered by relevance score and paginated by offset, since the
+    score cannot be used as a range filter.
+    `projection` is pushed down to Mongo so unrequested fields never leave the
+    database; the sort field is always included because the cursor is built from it.
+    
+    Returns a TrackPage-shaped dict of the raw stored documents, ready to be
+    encoded with orjson without a Pydantic round trip.
+    """
+    cursor_payload = decode_page_cursor(after) if after else {}
+    projection = dict(projection or {"_id": 0})
+    field, direction = order
+    sort_name = field if direction == 1 else f"-{field}"
+    
+    if ranked:
+        offset = cursor_payload.get("o", 0)
+        if after and (not isinstance(offset, int) or offset < 0):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        projection["score"] = {"$meta": "textScore"}
+        cursor = db.tracks.find(query, projection).sort(
+            [("score", {"$meta": "textScore"})] + track_sort_keys(TRACK_DEFAULT_SORT)
+        ).skip(offset)
+    else:
+        if any(value == 1 for value in projection.values()):
+            projection[field] = 1
+        if after:
+            keyset = cursor_payload.get("k")
+            # Cursors from before sorting was configurable carry no sort and are newest first
+            cursor_sort = cursor_payload.get("s", "-created_at")
+            if (
+                cursor_sort != sort_name
+                or not isinstance(keyset, list) or len(keyset) != 2
+                or not isinstance(keyset[1], str)
+                or not (keyset[0] is None or isinstance(keyset[0], str))
+            ):
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+            keyset_filter = build_keyset_filter(order, *keyset)
+            query = {"$and": [query, keyset_filter]} if query else keyset_filter
+        cursor = db.tracks.find(query, projection, collation=track_sort_collation(order)).sort(
+            track_sort_keys(order)
+        )
+    
+    tracks = await cursor.limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(tracks) > limit:
+        tracks = tracks[:limit]
+        if ranked:
+            next_cursor = encode_page_cursor({"o": cursor_payload.get("o", 0) + limit})
+        else:
+            last = tracks[-1]
+            value = last.get(field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            next_cursor = encode_page_cursor({"s": sort_name, "k": [value, last.get("id")]})
+    
+    if ranked:
+        for track in tracks:
+            track.pop("score", None)
+    
+    return {"items": tracks, "next_cursor": next_cursor}
+
 def extract_google_drive_file_id(url):
     """Extract file ID from Google Drive URL"""
     if not url or not isinstance(url, str):
@@ -630,100 +1071,153 @@ def generate_excel_template():
 
 import asyncio
 
-async def generate_signed_url_with_impersonation(blob_name: str, expiration: timedelta, method: str = "GET", content_type: Optional[str] = None, response_disposition: Optional[str] = None) -> str:
+class SignedUrlCache(LRUCache):
+    """
+    LRU cache of signed URLs keyed by (blob name, method, response disposition).
+    
+    A URL is handed out again while at least `min_remaining_fraction` of its
+    lifetime is left, so a client always gets that much time to use it. Callers
+    authorize the track before looking up its URL. Entries are also indexed by
+    blob name, so the URLs of a blob a track no longer uses can be dropped.
+    Not thread-safe: used from the event loop only.
+    """
+    
+    def __init__(self, maxsize: int, min_remaining_fraction: float):
+        super().__init__(maxsize=maxsize)
+        self.min_remaining_fraction = min_remaining_fraction
+        self.keys_by_blob = {}  # blob name -> cache keys
+        self.hits = 0
+        self.misses = 0
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        keys = self.keys_by_blob.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_blob[key[0]]
+    
+    def min_remaining(self, expiration: timedelta) -> float:
+        return expiration.total_seconds() * self.min_remaining_fraction
+    
+    def lookup(self, key, expiration: timedelta):
+        """(url, seconds it can still be reused) for `key`, or None"""
+        entry = self.get(key)
+        if entry is not None:
+            url, expires_at = entry
+            reusable_for = expires_at - time.time() - self.min_remaining(expiration)
+            if reusable_for > 0:
+                self.hits += 1
+                return url, reusable_for
+            self.pop(key, None)
+        self.misses += 1
+        return None
+    
+    def store(self, key, url: str, expires_at: float):
+        self[key] = (url, expires_at)
+        if key in self:
+            self.keys_by_blob.setdefault(key[0], set()).add(key)
+    
+    def invalidate_blobs(self, blob_names):
+        """Drop every cached URL of the given blobs"""
+        for blob_name in blob_names:
+            for key in list(self.keys_by_blob.get(blob_name, ())):
+                self.pop(key, None)
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+signed_url_cache = SignedUrlCache(SIGNED_URL_CACHE_MAX_ENTRIES, SIGNED_URL_MIN_REMAINING_FRACTION)
+
+async def get_cached_signed_url(blob_name: str, expiration: timedelta, response_disposition: Optional[str] = None):
+    """
+    Signed GET URL for a blob, reused from signed_url_cache when possible.
+    Returns (url, seconds the response may be cached by the client).
+    """
+    key = (blob_name, "GET", response_disposition)
+    cached = signed_url_cache.lookup(key, expiration)
+    if cached:
+        return cached
+    
+    # Signed just before the request; the URL expires `expiration` after that
+    expires_at = time.time() + expiration.total_seconds()
+    url = await sign_blob_url(
+        blob_name=blob_name,
+        expiration=expiration,
+        method="GET",
+        response_disposition=response_disposition
+    )
+    signed_url_cache.store(key, url, expires_at)
+    return url, expiration.total_seconds() - signed_url_cache.min_remaining(expiration)
+
+def signed_url_cache_control(max_age: float) -> str:
+    return f"private, max-age={int(max_age)}"
+
+async def sign_blob_url(blob_name: str, expiration: timedelta, method: str = "GET", content_type: Optional[str] = None, response_disposition: Optional[str] = None) -> str:
     """
-    A robust, reusable helper to generate any signed URL using explicit service account impersonation.
+    Generate any signed URL with the configured signer (see URL_SIGNER).
     """
-    if not SIGNING_SERVICE_ACCOUNT_EMAIL:
-        logger.error("FATAL: SIGNING_SERVICE_ACCOUNT_EMAIL is not set.")
+    if url_signer is None:
+        logger.error("FATAL: no URL signer is configured.")
         raise HTTPException(status_code=500, detail="Server is critically misconfigured for signing URLs.")
 
     try:
-        # Step 1: Manually fetch the base credentials from the environment
-        base_creds, project_id = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
-        
-        # Step 2: Manually create the impersonated credentials
-        impersonated_creds = impersonated_credentials.Credentials(
-            source_credentials=base_creds,
-            target_principal=SIGNING_SERVICE_ACCOUNT_EMAIL,
-            target_scopes=["https://www.googleapis.com/auth/devstorage.read_write"],
-            lifetime=int(expiration.total_seconds())
+        return await url_signer.sign(
+            blob_name,
+            expiration,
+            method=method,
+            content_type=content_type,
+            response_disposition=response_disposition
         )
-        
-        # Step 3: Use the explicit credentials to generate the URL
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-        
-        # This is the correctly indented block
-        kwargs = {
-            "version": "v4",
-            "expiration": expiration,
-            "method": method,
-            "credentials": impersonated_creds
-        }
-        if content_type:
-            kwargs["content_type"] = content_type
-        if response_disposition:
-            kwargs["response_disposition"] = response_disposition
-
-        url = await asyncio.to_thread(blob.generate_signed_url, **kwargs)
-        return url
-        
     except Exception as e:
-        logger.exception("CRITICAL ERROR during explicit signed URL generation in helper function.")
+        logger.exception("CRITICAL ERROR during signed URL generation in helper function.")
         raise HTTPException(status_code=500, detail=f"Failed to generate URL: {type(e).__name__}")
 
-async def upload_to_gcs(file_path: str, original_filename: str, folder: str, content_type: str = None) -> str:
+async def upload_to_storage(file_path: str, original_filename: str, folder: str, content_type: str = None) -> str:
     """
-    Uploads a file from disk to a specified folder in the GCS bucket using streaming.
+    Uploads a file from disk to a specified folder of the storage backend using streaming.
     This memory-efficient approach reads directly from disk without loading the entire file into memory.
     
     Args:
         file_path: Path to the file on the server's disk
         original_filename: Original name of the file (used for generating blob name)
-        folder: Target folder in GCS bucket (e.g., 'audio', 'lyrics', 'sessions', 'agreements')
+        folder: Target folder (e.g., 'audio', 'lyrics', 'sessions', 'agreements')
         content_type: Optional MIME type for the file
     
     Returns:
-        The blob name (path) in GCS
+        The blob name (path) in storage
     """
-    if not GCS_BUCKET_NAME:
-        raise HTTPException(status_code=500, detail="GCS bucket name is not configured.")
-    
     try:
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        
         # Create a unique filename using a UUID to prevent collisions.
         # Format: audio/123e4567-e89b-12d3-a456-426614174000_my-song.mp3
         blob_name = f"{folder}/{uuid.uuid4()}_{original_filename}"
-        blob = bucket.blob(blob_name)
+        await storage_backend.upload_file(file_path, blob_name, content_type)
         
-        # Set content type if provided
-        if content_type:
-            blob.content_type = content_type
-        
-        # Upload directly from file on disk using asyncio.to_thread for the blocking operation
-        # This streams the file without loading it entirely into memory
-        await asyncio.to_thread(blob.upload_from_filename, file_path)
-        
-        logger.info(f"Successfully uploaded {original_filename} to gs://{GCS_BUCKET_NAME}/{blob_name} (streamed from disk)")
+        logger.info(f"Successfully uploaded {original_filename} to {storage_backend.describe(blob_name)} (streamed from disk)")
     except Exception as e:
-        logger.exception(f"Failed to upload {original_filename} to GCS")
+        logger.exception(f"Failed to upload {original_filename} to {STORAGE_BACKEND} storage")
         raise HTTPException(status_code=500, detail=f"Could not upload file: {e}") from e
     
     return blob_name
 
-async def upload_file_to_gcs(file: UploadFile, folder: str) -> str:
+async def upload_file_to_storage(file: UploadFile, folder: str) -> str:
     """
-    Helper function to upload an UploadFile object to GCS using the streaming approach.
-    This saves the file to a temporary location on disk first, then streams it to GCS.
+    Helper function to upload an UploadFile object using the streaming approach.
+    This saves the file to a temporary location on disk first, then streams it to storage.
     
     Args:
         file: FastAPI UploadFile object
-        folder: Target folder in GCS bucket
+        folder: Target folder in storage
     
     Returns:
-        The blob name (path) in GCS
+        The blob name (path) in storage
     """
     temp_file_path = None
     try:
@@ -736,8 +1230,8 @@ async def upload_file_to_gcs(file: UploadFile, folder: str) -> str:
             content = await file.read()
             await f.write(content)
         
-        # Upload to GCS from disk (memory-efficient)
-        blob_name = await upload_to_gcs(temp_file_path, file.filename, folder, file.content_type)
+        # Upload from disk (memory-efficient)
+        blob_name = await upload_to_storage(temp_file_path, file.filename, folder, file.content_type)
         
         return blob_name
     finally:
@@ -749,63 +1243,36 @@ async def upload_file_to_gcs(file: UploadFile, folder: str) -> str:
             except Exception as e:
                 logger.warning(f"Failed to clean up temporary upload file {temp_file_path}: {e}")
 
-async def generate_signed_url(blob_name: str, expiration_minutes: int = 60) -> str:
-    """
-    Generate a signed URL for a GCS blob with configurable expiration time.
-    """
-    if not GCS_BUCKET_NAME or not blob_name:
-        raise HTTPException(status_code=500, detail="GCS bucket name or blob name not configured.")
-    
-    try:
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-        
-        # Generate signed URL that expires in specified minutes
-        url = await asyncio.to_thread(
-            blob.generate_signed_url,
-            expiration=timedelta(minutes=expiration_minutes),
-            method="GET",
-            version="v4"
-        )
-        return url
-    except Exception as e:
-        logger.exception(f"Failed to generate signed URL for blob: {blob_name}")
-        raise HTTPException(status_code=500, detail=f"Could not generate signed URL: {e}") from e
-async def read_gcs_text(blob_name: str) -> str:
+async def read_storage_text(blob_name: str) -> str:
     """
-    Read text content from a GCS blob.
+    Read text content from a stored blob.
     """
-    if not GCS_BUCKET_NAME or not blob_name:
-        raise HTTPException(status_code=500, detail="GCS bucket name or blob name not configured.")
+    if not blob_name:
+        raise HTTPException(status_code=500, detail="Blob name not configured.")
     
     try:
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-        
-        # Download the blob content as text using a thread to avoid blocking
-        content = await asyncio.to_thread(blob.download_as_text)
-        return content
+        return await storage_backend.read_text(blob_name)
     except Exception as e:
         logger.exception(f"Failed to read text from blob: {blob_name}")
         raise HTTPException(status_code=500, detail=f"Could not read file content: {e}") from e
-# DELETE helper for GCS
-async def delete_from_gcs(file_reference: str):
+# DELETE helper for stored files
+async def delete_from_storage(file_reference: str):
     """
-    Deletes a file from the GCS bucket using either a blob name or a public URL.
+    Deletes a file from storage using either a blob name or a public GCS URL.
     
     Args:
-        file_reference: Either a GCS blob name or a public URL from storage.googleapis.com
+        file_reference: Either a blob name or a public URL from storage.googleapis.com
         
     Returns:
         None. Logs success or failure but doesn't raise exceptions.
     """
-    if not GCS_BUCKET_NAME or not file_reference:
-        logger.warning("GCS_BUCKET_NAME not configured or no file reference provided. Skipping deletion.")
+    if not file_reference:
+        logger.warning("No file reference provided. Skipping deletion.")
         return
 
+    blob_name = file_reference
     try:
         # Normalize input - extract blob name from URL if needed
-        blob_name = file_reference
         if file_reference.startswith("https://storage.googleapis.com/"):
             prefix = f"https://storage.googleapis.com/{GCS_BUCKET_NAME}/"
             if not file_reference.startswith(prefix):
@@ -813,23 +1280,16 @@ async def delete_from_gcs(file_reference: str):
                 return
             blob_name = file_reference.replace(prefix, "")
 
-        # Get bucket and blob references
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-
-        # Check existence and delete using asyncio.to_thread for blocking operations
-        exists = await asyncio.to_thread(blob.exists)
-        if exists:
-            await asyncio.to_thread(blob.delete)
-            logger.info(f"Successfully deleted gs://{GCS_BUCKET_NAME}/{blob_name}")
+        if await storage_backend.delete(blob_name):
+            logger.info(f"Successfully deleted {storage_backend.describe(blob_name)}")
         else:
             logger.warning(f"Attempted to delete non-existent blob: {blob_name}")
 
     except Exception as e:
-        logger.exception(f"Failed to delete {blob_name} from GCS")
+        logger.exception(f"Failed to delete {blob_name} from {STORAGE_BACKEND} storage")
         # We don't raise an exception as this is often called during cleanup
 
-async def process_bulk_upload_row(row_data, row_number, current_user):
+async def process_bulk_upload_row(row_data, row_number, current_user, access: AccessScope):
     """Process a single row from bulk upload Excel"""
     try:
         # Extract data from row
@@ -871,12 +1331,8 @@ async def process_bulk_upload_row(row_data, row_number, current_user):
             return None, f"For original tracks, track category must be 'cover_song' or 'original_composition'"
         
         # For managers, validate language
-        if current_user.user_type == "manager" and current_user.manager_id:
-            manager_record = await db.managers.find_one({"id": current_user.manager_id})
-            if manager_record and manager_record.get("assigned_language"):
-                assigned_language = manager_record["assigned_language"]
-                if audio_language != assigned_language:
-                    return None, f"You can only upload tracks in your assigned language: {assigned_language}"
+        if not access.allows_language(audio_language):
+            return None, f"You can only upload tracks in your assigned languages: {', '.join(access.languages)}"
         
         # Generate unique code and serial number
         # Get language code (first 3 characters, uppercase)
@@ -891,22 +1347,7 @@ async def process_bulk_upload_row(row_data, row_number, current_user):
         else:  # multi_rights
             prefix = f"{language_code}-MR"
         
-        # Get the next number for this prefix
-        last_track = await db.tracks.find_one(
-            {"unique_code": {"$regex": f"^{prefix}"}},
-            sort=[("unique_code", -1)]
-        )
-        
-        if last_track and last_track.get("unique_code"):
-            try:
-                last_number = int(last_track["unique_code"].split(prefix)[1])
-                next_number = last_number + 1
-            except (ValueError, IndexError):
-                next_number = 1
-        else:
-            next_number = 1
-        
-        unique_code = f"{prefix}{next_number:04d}"
+        unique_code = await next_unique_code(prefix)
         
         # Generate serial number
         serial_prefix = "OC" if rights_type == "original" else "MR"
@@ -950,7 +1391,7 @@ async def process_bulk_upload_row(row_data, row_number, current_user):
                     temp_file_path = await download_from_google_drive(google_drive_url, temp_filename)
                     
                     # Upload to GCS directly from disk (memory-efficient streaming)
-                    blob_name = await upload_to_gcs(temp_file_path, temp_filename, folder, content_type)
+                    blob_name = await upload_to_storage(temp_file_path, temp_filename, folder, content_type)
                     
                     # Store the blob name and original filename
                     blob_names[blob_key] = blob_name
@@ -997,11 +1438,19 @@ async def process_bulk_upload_row(row_data, row_number, current_user):
             **file_names   # Store original filenames
         )
         
-        track_dict = prepare_for_mongo(track.dict())
-        await db.tracks.insert_one(track_dict)
+        try:
+            track_dict = await insert_track(track, prefix)
+        except Exception:
+            for blob_name in blob_names.values():
+                await delete_from_storage(blob_name)
+            raise
+        await record_track_change(None, track_dict)
         
         return track.id, None
         
+    except HTTPException as e:
+        return None, e.detail
+        
     except Exception as e:
         logger.error(f"Error processing row {row_number}: {e}")
         return None, f"Unexpected error: {str(e)}"
@@ -1070,33 +1519,403 @@ class RateLimiter:
 # Initialize rate limiter (15 requests per minute per user, cleanup at 10k users)
 upload_rate_limiter = RateLimiter(max_requests=15, time_window=60, max_users=10000)
 
-async def require_upload_permission(folder: str, current_user: User):
+# In-memory substring index for track search, built at startup and kept current by track writes
+track_search_index = TrigramIndex()
+track_autocomplete_index = AutocompleteIndex()
+
+# Short-lived cache of facet counts keyed by language scope + filters
+track_facet_cache = TTLCache(maxsize=1024, ttl=TRACK_FACET_CACHE_TTL_SECONDS)
+
+# Catalog statistics: incrementally maintained counts per dimension value
+CATALOG_STAT_DIMENSIONS = {
+    "language": "audio_language",
+    "rights_type": "rights_type",
+    "track_category": "track_category",
+    "manager": "managed_by",
+}
+CATALOG_STATS_RECONCILE_INTERVAL_SECONDS = 6 * 60 * 60
+catalog_stats_last_reconcile = {}
+
+def catalog_stat_keys(track: Optional[dict]) -> set:
+    """The (dimension, value) counters a track contributes to, including the overall total"""
+    if not track:
+        return set()
+    keys = {("total", None)}
+    for dimension, field in CATALOG_STAT_DIMENSIONS.items():
+        keys.add((dimension, track.get(field)))
+    return keys
+
+def catalog_stat_id(dimension: str, value) -> str:
+    return f"{dimension}:{'' if value is None else value}"
+
+async def update_catalog_stats(before: Optional[dict], after: Optional[dict]):
+    """Apply the $inc deltas for a track insert (before=None), delete (after=None) or update"""
+    old_keys = catalog_stat_keys(before)
+    new_keys = catalog_stat_keys(after)
+    deltas = [(key, -1) for key in old_keys - new_keys] + [(key, 1) for key in new_keys - old_keys]
+    if not deltas:
+        return
+    
+    operations = [
+        UpdateOne(
+            {"_id": catalog_stat_id(dimension, value)},
+            {"$inc": {"count": delta}, "$set": {"dimension": dimension, "value": value}},
+            upsert=True
+        )
+        for (dimension, value), delta in deltas
+    ]
+    try:
+        await db.catalog_stats.bulk_write(operations, ordered=False)
+    except Exception:
+        # Stats are advisory; the periodic reconciliation repairs any missed update
+        logger.exception("Failed to update catalog statistics")
+
+async def reconcile_catalog_stats() -> dict:
+    """
+    Recompute every catalog counter from db.tracks, overwrite the stored values
+    and report the drift between the incremental and recomputed counts.
+    """
+    facet_stages = {
+        dimension: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        for dimension, field in CATALOG_STAT_DIMENSIONS.items()
+    }
+    facet_stages["total"] = [{"$count": "count"}]
+    results = await db.tracks.aggregate([{"$facet": facet_stages}]).to_list(1)
+    result = results[0] if results else {}
+    
+    actual = {}
+    total = result.get("total") or [{"count": 0}]
+    actual[catalog_stat_id("total", None)] = ("total", None, total[0]["count"])
+    for dimension in CATALOG_STAT_DIMENSIONS:
+        for bucket in result.get(dimension, []):
+            actual[catalog_stat_id(dimension, bucket["_id"])] = (dimension, bucket["_id"], bucket["count"])
+    
+    stored = {doc["_id"]: doc.get("count", 0) for doc in await db.catalog_stats.find({}).to_list(None)}
+    
+    drift = {}
+    for stat_id in set(actual) | set(stored):
+        expected = actual[stat_id][2] if stat_id in actual else 0
+        if stored.get(stat_id, 0) != expected:
+            drift[stat_id] = {"stored": stored.get(stat_id, 0), "actual": expected}
+    
+    operations = [
+        UpdateOne(
+            {"_id": stat_id},
+            {"$set": {"dimension": dimension, "value": value, "count": count}},
+            upsert=True
+        )
+        for stat_id, (dimension, value, count) in actual.items()
+    ]
+    stale_ids = [stat_id for stat_id in stored if stat_id not in actual]
+    if stale_ids:
+        operations.append(DeleteMany({"_id": {"$in": stale_ids}}))
+    if operations:
+        await db.catalog_stats.bulk_write(operations, ordered=False)
+    
+    report = {
+        "reconciled_at": datetime.now(timezone.utc).isoformat(),
+        "counters": len(actual),
+        "drifted": len(drift),
+        "drift": drift
+    }
+    catalog_stats_last_reconcile.clear()
+    catalog_stats_last_reconcile.update(report)
+    if drift:
+        logger.warning(f"Catalog stats reconciliation corrected {len(drift)} drifted counters: {drift}")
+    else:
+        logger.info(f"Catalog stats reconciliation found no drift across {len(actual)} counters")
+    return report
+
+async def run_catalog_stats_reconciliation():
+    """Background loop: reconcile catalog stats at startup and then periodically"""
+    while True:
+        try:
+            await reconcile_catalog_stats()
+        except Exception:
+            logger.exception("Catalog stats reconciliation failed")
+        await asyncio.sleep(CATALOG_STATS_RECONCILE_INTERVAL_SECONDS)
+
+# Catalog versions: one counter per language plus a global one ("*"), bumped on
+# every track write. List ETags are derived from the counters of the caller's scope.
+CATALOG_VERSION_GLOBAL = "*"
+# Inserts retried when a generated unique code collides with a concurrent insert
+UNIQUE_CODE_INSERT_ATTEMPTS = 5
+CATALOG_VERSION_BUMP_ATTEMPTS = 3
+CATALOG_VERSION_BUMP_RETRY_SECONDS = 0.1
+# A bump that still fails is retried in the background, off the request path
+CATALOG_VERSION_REPAIR_ATTEMPTS = 10
+CATALOG_VERSION_REPAIR_RETRY_SECONDS = 30
+catalog_version_repair_tasks: set = set()
+
+async def increment_catalog_versions(keys: set) -> int:
+    """Increment the counters in `keys` and return the new global version"""
+    language_keys = [key for key in keys if key != CATALOG_VERSION_GLOBAL]
+    if language_keys:
+        await db.catalog_versions.bulk_write(
+            [UpdateOne({"_id": key}, {"$inc": {"version": 1}}, upsert=True) for key in language_keys],
+            ordered=False
+        )
+    doc = await db.catalog_versions.find_one_and_update(
+        {"_id": CATALOG_VERSION_GLOBAL},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+async def repair_catalog_versions(keys: set):
+    """Keep retrying a bump that failed while serving a write"""
+    for attempt in range(1, CATALOG_VERSION_REPAIR_ATTEMPTS + 1):
+        await asyncio.sleep(CATALOG_VERSION_REPAIR_RETRY_SECONDS)
+        try:
+            await increment_catalog_versions(keys)
+        except Exception:
+            logger.warning(f"Catalog version repair attempt {attempt} failed")
+            continue
+        logger.info(f"Catalog versions {sorted(keys)} repaired after {attempt} attempts")
+        return
+    logger.error(f"Gave up repairing catalog versions {sorted(keys)}; they move again on the next write")
+
+async def bump_catalog_versions(languages: set) -> Optional[int]:
+    """
+    Increment the global catalog version and the version of each affected language,
+    returning the new global version.
+    The track write has already happened, so a failure never fails the request:
+    the bump is retried briefly, then handed to a background repair task and
+    None is returned.
+    """
+    keys = {CATALOG_VERSION_GLOBAL} | {language for language in languages if language}
+    for attempt in range(1, CATALOG_VERSION_BUMP_ATTEMPTS + 1):
+        try:
+            return await increment_catalog_versions(keys)
+        except Exception as e:
+            error = e
+            if attempt < CATALOG_VERSION_BUMP_ATTEMPTS:
+                logger.warning(f"Failed to bump catalog versions (attempt {attempt}), retrying")
+                await asyncio.sleep(CATALOG_VERSION_BUMP_RETRY_SECONDS * attempt)
+    logger.error(f"Failed to bump catalog versions after {CATALOG_VERSION_BUMP_ATTEMPTS} attempts: {error}")
+    # Pages cached by this worker are keyed on the versions that did not move
+    track_result_cache.clear()
+    task = asyncio.create_task(repair_catalog_versions(keys))
+    catalog_version_repair_tasks.add(task)
+    task.add_done_callback(catalog_version_repair_tasks.discard)
+    return None
+
+async def get_catalog_version(scope: Optional[List[str]]) -> str:
+    """Version string of the tracks visible within a language scope (None = all tracks)"""
+    keys = [CATALOG_VERSION_GLOBAL] if scope is None else sorted(scope)
+    if not keys:
+        return ""
+    docs = await db.catalog_versions.find({"_id": {"$in": keys}}).to_list(len(keys))
+    versions = {doc["_id"]: doc.get("version", 0) for doc in docs}
+    return ",".join(f"{key}={versions.get(key, 0)}" for key in keys)
+
+async def get_global_catalog_version() -> int:
+    doc = await db.catalog_versions.find_one({"_id": CATALOG_VERSION_GLOBAL})
+    return (doc or {}).get("version", 0)
+
+# In-process indexes being rebuilt, so each has at most one rebuild running
+catalog_index_rebuilds: dict = {}
+
+async def rebuild_catalog_index(index, version: Optional[int] = None):
+    try:
+        if version is None:
+            version = await get_global_catalog_version()
+        await index.rebuild(db.tracks, version)
+    except Exception:
+        logger.exception(f"Rebuilding the {type(index).__name__} failed")
+
+def schedule_catalog_index_rebuild(index, version: Optional[int] = None):
+    """Start a background rebuild of an in-process index unless one is running"""
+    if index in catalog_index_rebuilds:
+        return
+    task = asyncio.create_task(rebuild_catalog_index(index, version))
+    catalog_index_rebuilds[index] = task
+    task.add_done_callback(lambda _: catalog_index_rebuilds.pop(index, None))
+
+async def catalog_index_is_current(index) -> bool:
+    """
+    Whether an in-process index has seen every track write, including those made
+    by other instances. When the global catalog version has moved past the index
+    a rebuild is started, and callers fall back to querying MongoDB until it lands.
+    """
+    version = await get_global_catalog_version()
+    if index.ready and index.version == version:
+        return True
+    schedule_catalog_index_rebuild(index, version)
+    return False
+
+def compute_etag(*parts) -> str:
+    """Strong ETag from a JSON-serializable description of a representation"""
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: StarletteRequest, etag: str) -> bool:
+    """Whether the request's If-None-Match header matches `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+class TrackResultCache(LRUCache):
+    """
+    LRU cache of encoded GET /tracks pages, bounded by total body size.
+    
+    Each entry is tagged with the languages it was computed over
+    (CATALOG_VERSION_GLOBAL for unrestricted scopes), so a track write drops
+    exactly the pages of the affected language plus the global ones. Entries also
+    remember the catalog version they were built at, so writes made by other
+    workers are caught on lookup. Not thread-safe: used from the event loop only.
+    """
+    
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        super().__init__(maxsize=max_bytes, getsizeof=lambda entry: len(entry[1]))
+        self.max_entry_bytes = max_entry_bytes
+        self.keys_by_tag = {}  # language (or CATALOG_VERSION_GLOBAL) -> cache keys
+        self.tags_by_key = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        for tag in self.tags_by_key.pop(key, ()):
+            keys = self.keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_tag[tag]
+    
+    def lookup(self, key, version: str) -> Optional[bytes]:
+        """Cached body for `key` if it was built at catalog `version`"""
+        entry = self.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+    
+    def store(self, key, scope: Optional[List[str]], version: str, body: bytes):
+        """Cache `body` for `key`, tagged with the languages of `scope`"""
+        if len(body) > self.max_entry_bytes:
+            return
+        self.pop(key, None)
+        self[key] = (version, body)
+        tags = {CATALOG_VERSION_GLOBAL} if scope is None else set(scope)
+        self.tags_by_key[key] = tags
+        for tag in tags:
+            self.keys_by_tag.setdefault(tag, set()).add(key)
+    
+    def invalidate(self, languages: set):
+        """Drop every page that may include a track in one of `languages`"""
+        for tag in {CATALOG_VERSION_GLOBAL} | {language for language in languages if language}:
+            for key in list(self.keys_by_tag.get(tag, ())):
+                self.pop(key, None)
+                self.invalidations += 1
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "bytes": self.currsize,
+            "max_bytes": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+track_result_cache = TrackResultCache(TRACK_RESULT_CACHE_MAX_BYTES, TRACK_RESULT_CACHE_MAX_ENTRY_BYTES)
+
+async def record_track_change(before: Optional[dict], after: Optional[dict]):
+    """
+    Keep derived in-process and Mongo state in sync after a track write.
+    `before` is None for inserts and `after` is None for deletes.
+    """
+    if after:
+        track_search_index.add(after)
+        track_autocomplete_index.add(after)
+    elif before:
+        track_search_index.remove(before["id"])
+        track_autocomplete_index.remove(before["id"])
+    # URLs of files the track no longer references must not be handed out again
+    signed_url_cache.invalidate_blobs({
+        (before or {}).get(field) for field in TRACK_FILE_BLOB_FIELDS.values()
+    } - {(after or {}).get(field) for field in TRACK_FILE_BLOB_FIELDS.values()} - {None})
+    languages = {(track or {}).get("audio_language") for track in (before, after)}
+    track_result_cache.invalidate(languages)
+    await update_catalog_stats(before, after)
+    version = await bump_catalog_versions(languages)
+    # The indexes already hold this write; any other bump in between came from
+    # another instance and leaves them behind until the next rebuild
+    if version is not None:
+        for index in (track_search_index, track_autocomplete_index):
+            if index.version == version - 1:
+                index.version = version
+
+async def next_unique_code(prefix: str) -> str:
+    """Next "<prefix>NNNN" unique code (e.g. TEL-MR0042), one above the highest in use"""
+    last_track = await db.tracks.find_one(
+        {"unique_code": {"$regex": f"^{re.escape(prefix)}\\d+$"}},
+        {"_id": 0, "unique_code": 1},
+        sort=[("unique_code", -1)]
+    )
+    next_number = 1
+    if last_track:
+        try:
+            next_number = int(last_track["unique_code"][len(prefix):]) + 1
+        except ValueError:
+            pass
+    return f"{prefix}{next_number:04d}"
+
+async def insert_track(track: MusicTrack, code_prefix: Optional[str] = None) -> dict:
+    """
+    Insert a new track and return the stored document. `code_prefix` is set
+    when the unique code was generated: a concurrent insert that took the same
+    code makes this pick the next one and retry. A caller-supplied code that
+    is already in use is a 409.
+    """
+    for _ in range(UNIQUE_CODE_INSERT_ATTEMPTS):
+        track_dict = prepare_for_mongo(track.dict())
+        try:
+            await db.tracks.insert_one(track_dict)
+            return track_dict
+        except DuplicateKeyError:
+            if code_prefix is None:
+                raise HTTPException(status_code=409, detail="Unique code already exists")
+            logger.info(f"Unique code {track.unique_code} was taken concurrently, generating another")
+            track.unique_code = await next_unique_code(code_prefix)
+    raise HTTPException(status_code=409, detail="Could not allocate a unique code, please retry")
+
+async def require_upload_permission(folder: str, access: AccessScope):
     """Validate user's permission to upload to specific folder"""
-    if current_user.user_type == "admin":
+    if access.role == "admin":
         return  # Admins have full access
     
-    if current_user.user_type != "manager":
+    if access.role != "manager":
         raise HTTPException(
             status_code=403,
             detail="Only managers and admins can upload files"
         )
     
     # Check manager exists and is active before any folder access
-    if current_user.manager_id:
-        manager = await db.managers.find_one({"id": current_user.manager_id})
-        if not manager or not manager.get("is_active"):
-            raise HTTPException(
-                status_code=403,
-                detail="Manager account is inactive"
-            )
-        
-        # Folder-specific access control can be added here if needed
-        # Example: Restrict manager access to specific folders if required
-        # if folder == "audio" and not manager.get("has_audio_access", False):
-        #     raise HTTPException(
-        #         status_code=403,
-        #         detail="Access to audio folder is not permitted for this manager"
-        #     )
+    if not access.is_active:
+        raise HTTPException(
+            status_code=403,
+            detail="Manager account is inactive"
+        )
+    
+    # Folder-specific access control can be added here if needed
+    # Example: Restrict manager access to specific folders if required
+    # if folder == "audio" and not manager.get("has_audio_access", False):
+    #     raise HTTPException(
+    #         status_code=403,
+    #         detail="Access to audio folder is not permitted for this manager"
+    #     )
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
@@ -1147,7 +1966,7 @@ async def register(user_data: UserCreate):
     await db.managers.insert_one(manager_dict)
     
     # Create user with manager role and link to manager record
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
@@ -1159,18 +1978,24 @@ async def register(user_data: UserCreate):
     user_dict["hashed_password"] = hashed_password
     user_dict = prepare_for_mongo(user_dict)
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Registered concurrently since the check above
+        await db.managers.delete_one({"id": manager.id})
+        raise HTTPException(status_code=400, detail="Email already registered")
     return user
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["hashed_password"]):
+    if not user or not await verify_password(user_data.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
+    await rehash_legacy_password(user, user_data.password)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["id"]}, expires_delta=access_token_expires
+        data=await build_access_token_claims(user), expires_delta=access_token_expires
     )
     
     user_obj = User(**parse_from_mongo(user))
@@ -1219,14 +2044,15 @@ async def reset_password(request: ResetPasswordRequest):
         raise HTTPException(status_code=400, detail="Invalid or expired token")
     
     # Update user's password
-    hashed_password = get_password_hash(request.new_password)
+    hashed_password = await get_password_hash(request.new_password)
     result = await db.users.update_one(
         {"id": user_id}, 
-        {"$set": {"hashed_password": hashed_password}}
+        {"$set": {"hashed_password": hashed_password}, "$inc": {"token_version": 1}}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    invalidate_cached_user(user_id)
     
     return {"message": "Password successfully reset"}
 
@@ -1277,10 +2103,15 @@ async def create_manager(manager_data: ManagerCreate, current_user: User = Depen
     )
     
     user_dict = manager_user.dict()
-    user_dict["hashed_password"] = get_password_hash(temp_password)
+    user_dict["hashed_password"] = await get_password_hash(temp_password)
     user_dict = prepare_for_mongo(user_dict)
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Created concurrently since the check above
+        await db.managers.delete_one({"id": manager.id})
+        raise HTTPException(status_code=400, detail="User with this email already exists")
     
     # Mock email service - log credentials and store in database
     await send_manager_login_credentials(manager_data.email, manager_data.name, temp_password, password_source)
@@ -1349,6 +2180,10 @@ async def update_manager(
     
     if update_data:
         await db.managers.update_one({"id": manager_id}, {"$set": update_data})
+        invalidate_cached_manager_users(manager_id)
+        # Deactivation and language changes must also reach self-contained tokens
+        if "is_active" in update_data or "assigned_language" in update_data:
+            await revoke_manager_user_tokens(manager_id)
     
     updated_manager = await db.managers.find_one({"id": manager_id})
     return Manager(**parse_from_mongo(updated_manager))
@@ -1375,7 +2210,11 @@ async def delete_manager(manager_id: str, current_user: User = Depends(get_curre
     
     # Step 1: Permanently delete the associated user account from users collection
     if manager_email:
+        manager_user = await db.users.find_one({"email": manager_email}, {"_id": 0, "id": 1})
         user_delete_result = await db.users.delete_one({"email": manager_email})
+        # Only after the delete, so a concurrent request cannot re-cache the account
+        if manager_user:
+            invalidate_cached_user(manager_user["id"])
         if user_delete_result.deleted_count > 0:
             logger.info(f"✓ Permanently deleted user account for {manager_email}")
         else:
@@ -1385,6 +2224,7 @@ async def delete_manager(manager_id: str, current_user: User = Depends(get_curre
     
     # Step 2: Permanently delete the manager record from managers collection
     manager_delete_result = await db.managers.delete_one({"id": manager_id})
+    invalidate_cached_manager_users(manager_id)
     
     if manager_delete_result.deleted_count > 0:
         logger.info(f"✓ Permanently deleted manager record for {manager_name}")
@@ -1434,17 +2274,24 @@ async def update_password(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify old password
-    if not verify_password(old_password, user["hashed_password"]):
+    if not await verify_password(old_password, user["hashed_password"]):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     # Update password
-    hashed_new_password = get_password_hash(new_password)
-    await db.users.update_one(
+    hashed_new_password = await get_password_hash(new_password)
+    # Revokes every self-contained token of the user, so hand back a fresh one
+    user = await db.users.find_one_and_update(
         {"id": current_user.id}, 
-        {"$set": {"hashed_password": hashed_new_password}}
+        {"$set": {"hashed_password": hashed_new_password}, "$inc": {"token_version": 1}},
+        return_document=ReturnDocument.AFTER
     )
+    invalidate_cached_user(current_user.id)
     
-    return {"message": "Password updated successfully"}
+    access_token = create_access_token(
+        data=await build_access_token_claims(user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"message": "Password updated successfully", "access_token": access_token, "token_type": "bearer"}
 
 @api_router.put("/admin/users/{user_id}/password")
 async def admin_update_user_password(
@@ -1462,11 +2309,12 @@ async def admin_update_user_password(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Update password
-    hashed_new_password = get_password_hash(password_data.new_password)
+    hashed_new_password = await get_password_hash(password_data.new_password)
     await db.users.update_one(
         {"id": user_id}, 
-        {"$set": {"hashed_password": hashed_new_password}}
+        {"$set": {"hashed_password": hashed_new_password}, "$inc": {"token_version": 1}}
     )
+    invalidate_cached_user(user_id)
     
     # Send notification if requested
     if password_data.notify_user:
@@ -1510,11 +2358,12 @@ async def admin_reset_user_password(
     new_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
     
     # Update password
-    hashed_new_password = get_password_hash(new_password)
+    hashed_new_password = await get_password_hash(new_password)
     await db.users.update_one(
         {"id": user_id}, 
-        {"$set": {"hashed_password": hashed_new_password}}
+        {"$set": {"hashed_password": hashed_new_password}, "$inc": {"token_version": 1}}
     )
+    invalidate_cached_user(user_id)
     
     # Send new credentials
     await send_password_reset_notification(
@@ -1543,6 +2392,89 @@ async def get_email_logs(current_user: User = Depends(get_current_user)):
     
     return email_logs
 
+@api_router.get("/admin/search-index")
+async def get_search_index_stats(current_user: User = Depends(get_current_user)):
+    """Size and memory use of the in-memory track search index"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return track_search_index.stats()
+
+@api_router.get("/admin/track-cache")
+async def get_track_cache_stats(current_user: User = Depends(get_current_user)):
+    """Size, hit and miss counters of the GET /tracks result cache"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return track_result_cache.stats()
+
+@api_router.get("/admin/signed-url-cache")
+async def get_signed_url_cache_stats(current_user: User = Depends(get_current_user)):
+    """Size, hit and miss counters of the signed URL cache"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return signed_url_cache.stats()
+
+@api_router.get("/admin/audio-cache")
+async def get_audio_cache_stats(current_user: User = Depends(get_current_user)):
+    """Size, hit and miss counters of the audio proxy's chunk cache"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return audio_chunk_cache.stats()
+
+@api_router.get("/admin/url-signer")
+async def get_url_signer_stats(current_user: User = Depends(get_current_user)):
+    """Kind, concurrency and latency counters of the URL signer"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return url_signer.stats() if url_signer else {"configured": False}
+
+@api_router.get("/admin/signing-credentials")
+async def get_signing_credentials_stats(current_user: User = Depends(get_current_user)):
+    """Cached signing credentials, their expiry and refresh counters"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return signing_credentials.stats() if signing_credentials else {"configured": False}
+
+@api_router.get("/admin/password-hashing")
+async def get_password_hashing_stats(current_user: User = Depends(get_current_user)):
+    """Worker pool, queue depth and latency counters of password hashing"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return password_hasher.stats()
+
+@api_router.get("/admin/catalog-stats")
+async def get_catalog_stats(current_user: User = Depends(get_current_user)):
+    """Catalog totals per language, rights type, track category and manager"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    counters = await db.catalog_stats.find({}).to_list(None)
+    
+    stats = {"total": 0, **{f"by_{dimension}": {} for dimension in CATALOG_STAT_DIMENSIONS}}
+    for counter in counters:
+        if counter.get("dimension") == "total":
+            stats["total"] = counter.get("count", 0)
+        elif counter.get("dimension") in CATALOG_STAT_DIMENSIONS and counter.get("count", 0) > 0:
+            value = counter.get("value")
+            stats[f"by_{counter['dimension']}"][value if value is not None else "unspecified"] = counter["count"]
+    
+    stats["last_reconciliation"] = catalog_stats_last_reconcile or None
+    return stats
+
+@api_router.post("/admin/catalog-stats/reconcile")
+async def reconcile_catalog_stats_now(current_user: User = Depends(get_current_user)):
+    """Recompute catalog stats from scratch and report drift"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await reconcile_catalog_stats()
+
 @api_router.get("/admin/manager-credentials/{manager_id}")
 async def get_manager_credentials(manager_id: str, current_user: User = Depends(get_current_user)):
     """Get specific manager's login credentials for admin"""
@@ -1578,12 +2510,19 @@ async def update_profile(
 ):
     update_data = {}
     
-    if username:
+    if username and username != current_user.username:
         update_data["username"] = username
     
-    # Update user record
+    # Update user record. Self-contained tokens carry the username, so a change
+    # revokes them like a password change does and a fresh token is handed back
+    user = None
     if update_data:
-        await db.users.update_one({"id": current_user.id}, {"$set": update_data})
+        user = await db.users.find_one_and_update(
+            {"id": current_user.id},
+            {"$set": update_data, "$inc": {"token_version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        invalidate_cached_user(current_user.id)
     
     # If user is a manager, also update manager record
     if current_user.user_type == "manager" and current_user.manager_id:
@@ -1598,8 +2537,15 @@ async def update_profile(
                 {"id": current_user.manager_id}, 
                 {"$set": manager_update}
             )
+            invalidate_cached_manager_users(current_user.manager_id)
     
-    return {"message": "Profile updated successfully"}
+    if user is None:
+        return {"message": "Profile updated successfully"}
+    access_token = create_access_token(
+        data=await build_access_token_claims(user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"message": "Profile updated successfully", "access_token": access_token, "token_type": "bearer"}
 
 @api_router.post("/tracks", response_model=MusicTrack)
 async def create_track(
@@ -1635,7 +2581,8 @@ async def create_track(
     session_file: Optional[UploadFile] = File(None),
     singer_agreement_file: Optional[UploadFile] = File(None),
     music_director_agreement_file: Optional[UploadFile] = File(None),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    access: AccessScope = Depends(get_access_scope)
 ):
     # Validate rights type and track category
     if rights_type not in ["original", "multi_rights"]:
@@ -1668,34 +2615,13 @@ async def create_track(
             code_prefix = "MR"
         
         # Find the next available number for this language-prefix combination
-        full_prefix = f"{language_code}-{code_prefix}"
-        regex_pattern = f"^{language_code}-{code_prefix}\\d+$"
-        
-        last_track_with_code = await db.tracks.find_one(
-            {"unique_code": {"$regex": regex_pattern}},
-            sort=[("unique_code", -1)]
-        )
-        
-        if last_track_with_code and last_track_with_code.get("unique_code"):
-            try:
-                # Extract number from last unique code
-                last_code = last_track_with_code["unique_code"]
-                number_part = last_code[len(f"{language_code}-{code_prefix}"):]
-                last_number = int(number_part)
-                next_number = last_number + 1
-            except (ValueError, IndexError):
-                next_number = 1
-        else:
-            next_number = 1
-        
-        # Generate the unique code
-        unique_code = f"{language_code}-{code_prefix}{next_number:04d}"
-        
-        # Double check this code doesn't exist
-        existing_track = await db.tracks.find_one({"unique_code": unique_code})
-        if existing_track:
-            next_number += 1
-            unique_code = f"{language_code}-{code_prefix}{next_number:04d}"
+        generated_code_prefix = f"{language_code}-{code_prefix}"
+        unique_code = await next_unique_code(generated_code_prefix)
+    else:
+        generated_code_prefix = None
+        # Checked before any file is uploaded; the unique index catches races
+        if await db.tracks.find_one({"unique_code": unique_code}, {"_id": 0, "id": 1}):
+            raise HTTPException(status_code=409, detail="Unique code already exists")
     
     # Generate serial number based on rights type
     prefix = "OC" if rights_type == "original" else "MR"
@@ -1727,240 +2653,583 @@ async def create_track(
     # Priority: If files are uploaded directly, use them (legacy)
     # Otherwise, use blob names provided from frontend (new workflow)
     
-    # MP3 Audio
-    if mp3_file:
-        # Legacy: Upload file directly (now using memory-efficient streaming)
-        mp3_blob_name = await upload_file_to_gcs(mp3_file, "audio")
-        mp3_filename = mp3_file.filename
-    # else: use mp3_blob_name and mp3_filename from Form parameters (already set)
-    
-    # Lyrics
-    if lyrics_file:
-        lyrics_blob_name = await upload_file_to_gcs(lyrics_file, "lyrics")
-        lyrics_filename = lyrics_file.filename
-    # else: use lyrics_blob_name and lyrics_filename from Form parameters
-        
-    # Session
-    if session_file:
-        session_blob_name = await upload_file_to_gcs(session_file, "sessions")
-        session_filename = session_file.filename
-    # else: use session_blob_name and session_filename from Form parameters
-        
-    # Singer Agreement
-    if singer_agreement_file:
-        singer_agreement_blob_name = await upload_file_to_gcs(singer_agreement_file, "agreements")
-        singer_agreement_filename = singer_agreement_file.filename
-    # else: use singer_agreement_blob_name and singer_agreement_filename from Form parameters
-        
-    # Music Director Agreement
-    if music_director_agreement_file:
-        music_director_agreement_blob_name = await upload_file_to_gcs(music_director_agreement_file, "agreements")
-        music_director_agreement_filename = music_director_agreement_file.filename
-    # else: use music_director_agreement_blob_name and music_director_agreement_filename from Form parameters
-    
-    # For managers, validate that they have assigned languages and are uploading in those languages
-    if current_user.user_type == "manager":
-        if not current_user.manager_id:
-            raise HTTPException(
-                status_code=403, 
-                detail="Manager account not properly configured. Please contact admin."
-            )
-        
-        manager_record = await db.managers.find_one({"id": current_user.manager_id})
-        if not manager_record:
-            raise HTTPException(
-                status_code=403, 
-                detail="Manager profile not found. Please contact admin."
-            )
+    # Blobs uploaded by this request, deleted again if the track is not saved.
+    # Blobs uploaded directly by the frontend are cleaned up by the frontend.
+    uploaded_blobs = []
+    try:
+        # MP3 Audio
+        if mp3_file:
+            # Legacy: Upload file directly (now using memory-efficient streaming)
+            mp3_blob_name = await upload_file_to_storage(mp3_file, "audio")
+            uploaded_blobs.append(mp3_blob_name)
+            mp3_filename = mp3_file.filename
+        # else: use mp3_blob_name and mp3_filename from Form parameters (already set)
+    
+        # Lyrics
+        if lyrics_file:
+            lyrics_blob_name = await upload_file_to_storage(lyrics_file, "lyrics")
+            uploaded_blobs.append(lyrics_blob_name)
+            lyrics_filename = lyrics_file.filename
+        # else: use lyrics_blob_name and lyrics_filename from Form parameters
+        
+        # Session
+        if session_file:
+            session_blob_name = await upload_file_to_storage(session_file, "sessions")
+            uploaded_blobs.append(session_blob_name)
+            session_filename = session_file.filename
+        # else: use session_blob_name and session_filename from Form parameters
+        
+        # Singer Agreement
+        if singer_agreement_file:
+            singer_agreement_blob_name = await upload_file_to_storage(singer_agreement_file, "agreements")
+            uploaded_blobs.append(singer_agreement_blob_name)
+            singer_agreement_filename = singer_agreement_file.filename
+        # else: use singer_agreement_blob_name and singer_agreement_filename from Form parameters
+        
+        # Music Director Agreement
+        if music_director_agreement_file:
+            music_director_agreement_blob_name = await upload_file_to_storage(music_director_agreement_file, "agreements")
+            uploaded_blobs.append(music_director_agreement_blob_name)
+            music_director_agreement_filename = music_director_agreement_file.filename
+        # else: use music_director_agreement_blob_name and music_director_agreement_filename from Form parameters
+    
+        # For managers, validate that they have assigned languages and are uploading in those languages
+        if access.is_restricted:
+            if not current_user.manager_id:
+                raise HTTPException(
+                    status_code=403, 
+                    detail="Manager account not properly configured. Please contact admin."
+                )
         
-        assigned_languages = manager_record.get("assigned_language", [])
+            if not access.is_active:
+                raise HTTPException(
+                    status_code=403, 
+                    detail="Manager profile not found or inactive. Please contact admin."
+                )
         
-        # Block upload if no languages assigned
-        if not assigned_languages or len(assigned_languages) == 0:
-            raise HTTPException(
-                status_code=403, 
-                detail="You don't have permission to upload tracks yet. Please wait for admin to assign languages to your account."
-            )
+            # Block upload if no languages assigned
+            if not access.languages:
+                raise HTTPException(
+                    status_code=403, 
+                    detail="You don't have permission to upload tracks yet. Please wait for admin to assign languages to your account."
+                )
         
-        # Validate that track language is in assigned languages
-        if audio_language not in assigned_languages:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"You can only upload tracks in your assigned languages: {', '.join(assigned_languages)}"
-            )
+            # Validate that track language is in assigned languages
+            if not access.allows_language(audio_language):
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"You can only upload tracks in your assigned languages: {', '.join(access.languages)}"
+                )
         
-        # Auto-set managed_by for manager uploads
-        managed_by = current_user.manager_id
-
-    # Create track
-    track = MusicTrack(
-        unique_code=unique_code,
-        rights_type=rights_type,
-        track_category=track_category,
-        rights_details=rights_details,
-        serial_number=serial_number,
-        title=title,
-        music_composer=music_composer,
-        lyricist=lyricist,
-        singer_name=singer_name,
-        tempo=tempo,
-        scale=scale,
-        audio_language=audio_language,
-        release_date=release_date,
-        album_name=album_name,
-        other_info=other_info,
-        # Store GCS blob names
-        mp3_blob_name=mp3_blob_name,
-        lyrics_blob_name=lyrics_blob_name,
-        session_blob_name=session_blob_name,
-        singer_agreement_blob_name=singer_agreement_blob_name,
-        music_director_agreement_blob_name=music_director_agreement_blob_name,
-        # Store original filenames
-        mp3_filename=mp3_filename,
-        lyrics_filename=lyrics_filename,
-        session_filename=session_filename,
-        singer_agreement_filename=singer_agreement_filename,
-        music_director_agreement_filename=music_director_agreement_filename,
-        created_by=current_user.id,
-        managed_by=managed_by
-    )
+            # Auto-set managed_by for manager uploads
+            managed_by = current_user.manager_id
+
+        # Create track
+        track = MusicTrack(
+            unique_code=unique_code,
+            rights_type=rights_type,
+            track_category=track_category,
+            rights_details=rights_details,
+            serial_number=serial_number,
+            title=title,
+            music_composer=music_composer,
+            lyricist=lyricist,
+            singer_name=singer_name,
+            tempo=tempo,
+            scale=scale,
+            audio_language=audio_language,
+            release_date=release_date,
+            album_name=album_name,
+            other_info=other_info,
+            # Store GCS blob names
+            mp3_blob_name=mp3_blob_name,
+            lyrics_blob_name=lyrics_blob_name,
+            session_blob_name=session_blob_name,
+            singer_agreement_blob_name=singer_agreement_blob_name,
+            music_director_agreement_blob_name=music_director_agreement_blob_name,
+            # Store original filenames
+            mp3_filename=mp3_filename,
+            lyrics_filename=lyrics_filename,
+            session_filename=session_filename,
+            singer_agreement_filename=singer_agreement_filename,
+            music_director_agreement_filename=music_director_agreement_filename,
+            created_by=current_user.id,
+            managed_by=managed_by
+        )
     
-    logger.info(f"Track created with blob names: mp3={track.mp3_blob_name}, lyrics={track.lyrics_blob_name}")
+        logger.info(f"Track created with blob names: mp3={track.mp3_blob_name}, lyrics={track.lyrics_blob_name}")
     
-    track_dict = prepare_for_mongo(track.dict())
-    await db.tracks.insert_one(track_dict)
+        track_dict = await insert_track(track, generated_code_prefix)
+    except Exception:
+        for blob_name in uploaded_blobs:
+            await delete_from_storage(blob_name)
+        raise
+    await record_track_change(None, track_dict)
     
     logger.info(f"Track saved to database with ID: {track.id}")
     
     return track
 
-@api_router.get("/tracks", response_model=List[MusicTrack])
-async def get_tracks(
+async def build_track_query(
+    scope: Optional[List[str]],
     search: Optional[str] = None,
     composer: Optional[str] = None,
     singer: Optional[str] = None,
     album: Optional[str] = None,
     language: Optional[str] = None,
     rights_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    search_mode: str = "contains"
 ):
     """
-    Fetches tracks with robust, role-based access control.
-    - Managers see tracks ONLY based on their assigned language(s).
-    - Admins see all tracks and can use all filters.
+    Build the Mongo query for the track listing filters within a language scope
+    (AccessScope.languages).
+    
+    Returns (query, ranked). `query` is None when the scope allows no tracks;
+    `ranked` is True when results should be ordered by text score.
     """
+    if search_mode not in TRACK_SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"search_mode must be one of: {', '.join(TRACK_SEARCH_MODES)}")
     
-    # --- MANAGER-SPECIFIC LOGIC ---
-    if current_user.user_type == "manager":
-        if not current_user.manager_id:
-            logger.warning(f"Manager user {current_user.id} has no manager_id. Returning empty list.")
-            return []
+    if scope is None:
+        query_filters = []
+    elif not scope:
+        return None, False
+    else:
+        # Language restriction for managers, combined with the optional filters
+        query_filters = [{"audio_language": {"$in": scope}}]
 
-        manager_record = await db.managers.find_one({"id": current_user.manager_id})
+    ranked = False
+    if search:
+        search_filter, ranked = await build_track_search_filter(search, search_mode)
+        query_filters.append(search_filter)
+    query_filters.extend(build_track_filters(composer, singer, album, language, rights_type))
 
-        if not manager_record or not manager_record.get("is_active", True):
-            logger.warning(f"Manager profile for user {current_user.id} not found or inactive. Returning empty list.")
-            return []
+    # If the list of filters is not empty, combine them with "$and".
+    # Otherwise, the query is an empty dictionary {}, which finds all documents.
+    query = {"$and": query_filters} if query_filters else {}
+    return query, ranked
 
-        manager_languages = manager_record.get("assigned_language")
+async def iter_track_batches(
+    query: Optional[dict],
+    projection: dict,
+    ranked: bool,
+    order: tuple = TRACK_DEFAULT_SORT
+):
+    """
+    Yield the full result of a track query in list order, one Motor batch
+    (TRACK_STREAM_BATCH_SIZE documents) at a time so memory stays constant.
+    """
+    if query is None:
+        return
+    
+    projection = dict(projection)
+    collation = None
+    if ranked:
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"})] + track_sort_keys(TRACK_DEFAULT_SORT)
+    else:
+        sort = track_sort_keys(order)
+        collation = track_sort_collation(order)
+    
+    cursor = db.tracks.find(query, projection, collation=collation).sort(sort).batch_size(TRACK_STREAM_BATCH_SIZE)
+    try:
+        while True:
+            batch = await cursor.to_list(TRACK_STREAM_BATCH_SIZE)
+            if not batch:
+                break
+            if ranked:
+                for track in batch:
+                    track.pop("score", None)
+            yield batch
+    finally:
+        await cursor.close()
+
+async def stream_tracks(
+    query: Optional[dict],
+    projection: dict,
+    ranked: bool,
+    ndjson: bool,
+    order: tuple = TRACK_DEFAULT_SORT
+):
+    """
+    Yield the full result of a track query as NDJSON lines or as one JSON array.
+    """
+    if not ndjson:
+        yield b"["
+    
+    first = True
+    async for batch in iter_track_batches(query, projection, ranked, order):
+        rows = [orjson.dumps(track, default=str) for track in batch]
+        if ndjson:
+            yield b"\n".join(rows) + b"\n"
+        else:
+            yield (b"" if first else b",") + b",".join(rows)
+        first = False
+    
+    if not ndjson:
+        yield b"]"
 
-        if not manager_languages or not isinstance(manager_languages, list) or not manager_languages:
-            logger.info(f"Manager {current_user.id} has no assigned languages. Returning empty list.")
-            return []
-        
-        # Build query filters for managers (language restriction + optional filters)
-        query_filters = [{"audio_language": {"$in": manager_languages}}]
-        
-        if search:
-            query_filters.append({
-                "$or": [
-                    {"unique_code": {"$regex": search, "$options": "i"}},
-                    {"title": {"$regex": search, "$options": "i"}},
-                    {"music_composer": {"$regex": search, "$options": "i"}},
-                    {"singer_name": {"$regex": search, "$options": "i"}},
-                    {"album_name": {"$regex": search, "$options": "i"}}
-                ]
-            })
-        
-        if composer:
-            query_filters.append({"music_composer": {"$regex": composer, "$options": "i"}})
-        if singer:
-            query_filters.append({"singer_name": {"$regex": singer, "$options": "i"}})
-        if album:
-            query_filters.append({"album_name": {"$regex": album, "$options": "i"}})
-        if language:
-            query_filters.append({"audio_language": {"$regex": language, "$options": "i"}})
-        if rights_type in ["original", "multi_rights"]:
-            query_filters.append({"rights_type": rights_type})
-        
-        query = {"$and": query_filters}
-        
-        tracks = await db.tracks.find(query).to_list(1000)
-        return [MusicTrack(**parse_from_mongo(track)) for track in tracks]
+def export_row(track: dict) -> list:
+    """One export row in TRACK_EXPORT_COLUMNS order; missing fields become empty cells"""
+    return [
+        "" if track.get(field) is None else str(track[field])
+        for field in TRACK_EXPORT_COLUMNS
+    ]
+
+# Leading characters that make spreadsheet apps read a CSV cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_export_row(track: dict) -> list:
+    """
+    export_row for CSV: cells that would run as a formula when the file is
+    opened in Excel or Sheets are prefixed with a quote. The xlsx export
+    forces string cells instead.
+    """
+    return [
+        f"'{value}" if value.startswith(CSV_FORMULA_PREFIXES) else value
+        for value in export_row(track)
+    ]
+
+def encode_csv_rows(rows: List[list]) -> bytes:
+    """Encode rows as CSV. Runs in a worker thread."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def write_xlsx_export(batches: "queue.Queue", path: str):
+    """
+    Write track batches from `batches` to an xlsx file until a None sentinel
+    arrives. Runs in a worker thread. The write-only workbook flushes rows to
+    disk as they are appended, so memory does not grow with the row count.
+    """
+    finished = False
+    try:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Tracks")
+        ws.append(list(TRACK_EXPORT_COLUMNS.values()))
+        while True:
+            batch = batches.get()
+            if batch is None:
+                finished = True
+                break
+            for track in batch:
+                cells = []
+                for value in export_row(track):
+                    cell = WriteOnlyCell(ws, value=value)
+                    # Catalog text is data: never let openpyxl turn "=..." into a formula
+                    cell.data_type = "s"
+                    cells.append(cell)
+                ws.append(cells)
+        wb.save(path)
+    except Exception:
+        # Keep draining so the producer never blocks on a full queue
+        while not finished and batches.get() is not None:
+            pass
+        raise
 
-    # --- ADMIN-SPECIFIC LOGIC (This part has the improvement) ---
-    # If we reach here, the user is an admin.
+async def stream_csv_export(query: Optional[dict], projection: dict, ranked: bool, order: tuple):
+    """Yield the export as CSV, encoding each batch in a worker thread"""
+    yield encode_csv_rows([list(TRACK_EXPORT_COLUMNS.values())])
+    async for batch in iter_track_batches(query, projection, ranked, order):
+        yield await asyncio.to_thread(encode_csv_rows, [csv_export_row(track) for track in batch])
+
+async def build_xlsx_export(query: Optional[dict], projection: dict, ranked: bool, order: tuple) -> str:
+    """
+    Build the xlsx export in a temporary file and return its path. The Motor
+    cursor feeds a writer thread through a bounded queue, so at most
+    TRACK_EXPORT_QUEUE_BATCHES batches are held in memory.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as temp_file:
+        path = temp_file.name
     
-    # We build a list of all requested filters.
-    query_filters = []
+    batches = queue.Queue(maxsize=TRACK_EXPORT_QUEUE_BATCHES)
+    writer = asyncio.ensure_future(asyncio.to_thread(write_xlsx_export, batches, path))
+    try:
+        try:
+            async for batch in iter_track_batches(query, projection, ranked, order):
+                await asyncio.to_thread(batches.put, batch)
+        finally:
+            # The writer drains the queue until the sentinel even after a failure
+            await asyncio.to_thread(batches.put, None)
+            await writer
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+async def stream_file_and_delete(path: str):
+    """Yield a temporary file in chunks and remove it afterwards"""
+    try:
+        async with aiofiles.open(path, "rb") as f:
+            while True:
+                chunk = await f.read(TRACK_EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+@api_router.get("/tracks", response_model=TrackPage)
+async def get_tracks(
+    request: StarletteRequest,
+    search: Optional[str] = None,
+    composer: Optional[str] = None,
+    singer: Optional[str] = None,
+    album: Optional[str] = None,
+    language: Optional[str] = None,
+    rights_type: Optional[str] = None,
+    search_mode: str = "contains",
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: int = Query(TRACK_PAGE_DEFAULT_LIMIT, ge=1, le=TRACK_PAGE_MAX_LIMIT),
+    after: Optional[str] = None,
+    stream: bool = False,
+    access: AccessScope = Depends(get_access_scope)
+):
+    """
+    Fetches tracks with robust, role-based access control.
+    - Managers see tracks ONLY based on their assigned language(s).
+    - Admins see all tracks and can use all filters.
+    Results are returned newest first, one page at a time. Pass the returned
+    `next_cursor` as `after` to fetch the following page.
+    `sort` orders by title, created_at, unique_code, serial_number or
+    release_date ("-" prefix for descending), with the track id as tiebreaker;
+    titles compare case-insensitively. It overrides relevance ordering of text searches.
+    `search` is a case-insensitive substring match served by the in-memory
+    trigram index; `search_mode=text` ranks whole-word matches by relevance and
+    `search_mode=regex` forces the legacy (unindexed) substring scan.
+    `fields` selects the returned fields: "summary" (default), "all", or a
+    comma-separated list of field names.
+    With `Accept: application/x-ndjson` or `stream=1` the whole result is
+    streamed (NDJSON or a JSON array) instead of paginated; `limit` and `after`
+    are ignored.
+    Responses carry an ETag derived from the catalog version of the caller's
+    language scope; a matching If-None-Match is answered with 304 without
+    querying the tracks collection. Pages are also kept in a shared result cache
+    keyed by scope and filters, dropped when a track of that language changes.
+    """
+    projection = resolve_track_projection(fields)
+    order = resolve_track_sort(sort)
+    scope = access.languages
+    ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+    # Read the version before the data (including the search index check), so a
+    # concurrent write can only make the ETag and the cached page stale
+    version = await get_catalog_version(scope)
+    query, ranked = await build_track_query(
+        scope, search, composer, singer, album, language, rights_type, search_mode
+    )
+    ranked = ranked and not sort
+    etag = compute_etag("tracks", version, sorted(request.query_params.multi_items()), ndjson)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    if ndjson or stream:
+        return StreamingResponse(
+            stream_tracks(query, projection, ranked, ndjson, order),
+            media_type="application/x-ndjson" if ndjson else "application/json",
+            headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+        )
     
-    if search:
-        query_filters.append({
-            "$or": [
-                {"unique_code": {"$regex": search, "$options": "i"}},
-                {"title": {"$regex": search, "$options": "i"}},
-                {"music_composer": {"$regex": search, "$options": "i"}},
-                {"singer_name": {"$regex": search, "$options": "i"}},
-                {"album_name": {"$regex": search, "$options": "i"}}
-            ]
-        })
+    headers = {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+    cache_key = (
+        None if scope is None else tuple(sorted(scope)),
+        search or None, search_mode, composer or None, singer or None, album or None,
+        language or None, rights_type or None, fields or "summary", order, limit, after or None
+    )
+    body = track_result_cache.lookup(cache_key, version)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=headers)
+    
+    # Stored documents are already in wire format, so skip the response_model pass
+    page = {"items": [], "next_cursor": None}
+    if query is not None:
+        page = await fetch_track_page(query, limit, after, ranked=ranked, projection=projection, order=order)
+    body = orjson.dumps(page)
+    track_result_cache.store(cache_key, scope, version, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@api_router.post("/tracks/batch-get", response_model=TrackBatchGetResponse)
+async def batch_get_tracks(request: TrackBatchGetRequest, access: AccessScope = Depends(get_access_scope)):
+    """
+    Fetch many tracks in one round trip. Manager language scoping is applied in
+    the query itself; ids that were not returned are reported as not_found or,
+    if the track exists outside the manager's languages, forbidden.
+    """
+    track_ids = list(dict.fromkeys(request.ids))  # De-duplicate, keep request order
+    projection = resolve_track_projection(request.fields)
+    scope = access.languages
     
-    # Add individual filters to the list.
-    if composer:
-        query_filters.append({"music_composer": {"$regex": composer, "$options": "i"}})
-    if singer:
-        query_filters.append({"singer_name": {"$regex": singer, "$options": "i"}})
-    if album:
-        query_filters.append({"album_name": {"$regex": album, "$options": "i"}})
-    if language:
-        query_filters.append({"audio_language": {"$regex": language, "$options": "i"}})
-    if rights_type in ["original", "multi_rights"]:
-        query_filters.append({"rights_type": rights_type})
-
-    # If the list of filters is not empty, combine them with "$and".
-    # Otherwise, the query is an empty dictionary {}, which finds all documents.
-    query = {"$and": query_filters} if query_filters else {}
+    if scope is not None and not scope:
+        tracks = []
+    else:
+        query = {"id": {"$in": track_ids}}
+        if scope is not None:
+            query["audio_language"] = {"$in": scope}
+        tracks = await db.tracks.find(query, projection).to_list(len(track_ids))
+    
+    found = {track["id"]: track for track in tracks}
+    missing = [track_id for track_id in track_ids if track_id not in found]
+    
+    forbidden = []
+    if missing and scope is not None:
+        # Only managers can be denied; tell "exists elsewhere" apart from "does not exist"
+        existing = await db.tracks.find({"id": {"$in": missing}}, {"_id": 0, "id": 1}).to_list(len(missing))
+        existing_ids = {track["id"] for track in existing}
+        forbidden = [track_id for track_id in missing if track_id in existing_ids]
+        missing = [track_id for track_id in missing if track_id not in existing_ids]
+        if forbidden:
+            logger.warning(f"Manager {access.user.manager_id} requested {len(forbidden)} tracks outside their assigned languages")
+    
+    return ORJSONResponse({
+        "items": [found[track_id] for track_id in track_ids if track_id in found],
+        "not_found": missing,
+        "forbidden": forbidden
+    })
+
+@api_router.get("/tracks/facets")
+async def get_track_facets(
+    search: Optional[str] = None,
+    composer: Optional[str] = None,
+    singer: Optional[str] = None,
+    album: Optional[str] = None,
+    language: Optional[str] = None,
+    rights_type: Optional[str] = None,
+    search_mode: str = "contains",
+    top: int = Query(TRACK_FACET_DEFAULT_TOP, ge=1, le=TRACK_FACET_MAX_TOP),
+    access: AccessScope = Depends(get_access_scope)
+):
+    """
+    Value counts for the dashboard filter panels (language, rights type, composer,
+    singer, album), computed with a single $facet aggregation over the same
+    role-scoped query as GET /tracks. Results are cached briefly per scope and filters.
+    """
+    scope = access.languages
+    cache_key = (
+        "*" if scope is None else tuple(sorted(scope)),
+        search, search_mode, composer, singer, album, language, rights_type, top
+    )
+    cached = track_facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    query, _ = await build_track_query(scope, search, composer, singer, album, language, rights_type, search_mode)
+    if query is None:
+        return {"total": 0, "facets": {name: [] for name in TRACK_FACET_FIELDS}}
+    
+    facet_stages = {
+        name: [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": top}
+        ]
+        for name, field in TRACK_FACET_FIELDS.items()
+    }
+    facet_stages["total"] = [{"$count": "count"}]
+    
+    results = await db.tracks.aggregate([{"$match": query}, {"$facet": facet_stages}]).to_list(1)
+    result = results[0] if results else {}
+    
+    total = result.get("total") or [{"count": 0}]
+    response = {
+        "total": total[0]["count"],
+        "facets": {
+            name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in result.get(name, [])]
+            for name in TRACK_FACET_FIELDS
+        }
+    }
+    track_facet_cache[cache_key] = response
+    return response
+
+@api_router.get("/autocomplete/{field}")
+async def autocomplete_track_names(
+    field: str,
+    prefix: str = "",
+    limit: int = Query(AUTOCOMPLETE_DEFAULT_LIMIT, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+    access: AccessScope = Depends(get_access_scope)
+):
+    """
+    Typeahead for composer, lyricist, singer and album names: distinct values
+    starting with `prefix` (case-insensitive), alphabetically, with the number of
+    tracks using each. Managers only see values from their assigned languages.
+    Served from the in-memory autocomplete index without querying the tracks
+    collection, unless another instance has written since the index was built.
+    """
+    if field not in AUTOCOMPLETE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field must be one of: {', '.join(AUTOCOMPLETE_FIELDS)}")
+    track_field = AUTOCOMPLETE_FIELDS[field]
+    
+    scope = access.languages
+    if scope is not None and not scope:
+        return []
+    
+    if await catalog_index_is_current(track_autocomplete_index):
+        return track_autocomplete_index.complete(track_field, prefix, languages=scope, limit=limit)
+    
+    match = {track_field: {"$regex": f"^{re.escape(prefix.strip())}", "$options": "i"}}
+    if scope is not None:
+        match["audio_language"] = {"$in": scope}
+    results = await db.tracks.aggregate([
+        {"$match": match},
+        {"$group": {"_id": f"${track_field}", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit}
+    ]).to_list(limit)
+    return [{"value": result["_id"], "count": result["count"]} for result in results]
+
+@api_router.get("/tracks/export")
+async def export_tracks(
+    format: str = "xlsx",
+    search: Optional[str] = None,
+    composer: Optional[str] = None,
+    singer: Optional[str] = None,
+    album: Optional[str] = None,
+    language: Optional[str] = None,
+    rights_type: Optional[str] = None,
+    search_mode: str = "contains",
+    sort: Optional[str] = None,
+    access: AccessScope = Depends(get_access_scope)
+):
+    """
+    Exports the catalog as an Excel workbook or CSV file, with the same filters,
+    sorting and role-based scoping as GET /tracks.
+    CSV rows are streamed as they are read. The xlsx file is built by a worker
+    thread in a temporary file and then streamed; in both cases memory stays
+    bounded regardless of the number of rows.
+    """
+    if format not in TRACK_EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(TRACK_EXPORT_MEDIA_TYPES)}")
+    
+    order = resolve_track_sort(sort)
+    scope = access.languages
+    query, ranked = await build_track_query(
+        scope, search, composer, singer, album, language, rights_type, search_mode
+    )
+    ranked = ranked and not sort
+    projection = {"_id": 0, **{field: 1 for field in TRACK_EXPORT_COLUMNS}}
+    
+    filename = f"tracks_export_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    
+    if format == "csv":
+        body = stream_csv_export(query, projection, ranked, order)
+    else:
+        try:
+            path = await build_xlsx_export(query, projection, ranked, order)
+        except Exception:
+            logger.exception("Failed to build the catalog export.")
+            raise HTTPException(status_code=500, detail="Could not generate the export.")
+        headers["Content-Length"] = str(os.path.getsize(path))
+        body = stream_file_and_delete(path)
     
-    tracks = await db.tracks.find(query).to_list(1000)
-    return [MusicTrack(**parse_from_mongo(track)) for track in tracks]
+    logger.info(f"User {access.user.email} exported tracks as {format}")
+    return StreamingResponse(body, media_type=TRACK_EXPORT_MEDIA_TYPES[format], headers=headers)
 
 # REPLACE THE ENTIRE delete_track FUNCTION WITH THIS
 @api_router.delete("/tracks/{track_id}")
-async def delete_track(track_id: str, current_user: User = Depends(get_current_user)):
-    # Step 1: Find the track metadata in MongoDB
-    track = await db.tracks.find_one({"id": track_id})
-    if not track:
-        raise HTTPException(status_code=404, detail="Track not found")
-
-    # Step 2: Authorization - Language-based access for managers
-    if current_user.user_type == "manager":
-        # Fetch manager record to get assigned languages
-        manager_record = await db.managers.find_one({"id": current_user.manager_id})
-        
-        if not manager_record:
-            logger.warning(f"Manager record not found for user_id={current_user.id}, manager_id={current_user.manager_id}")
-            raise HTTPException(status_code=403, detail="Manager profile not found")
-        
-        manager_languages = manager_record.get("assigned_language", [])
-        track_language = track.get("audio_language", "")
-        
-        # Check if track's language is in manager's assigned languages
-        if track_language not in manager_languages:
-            logger.warning(
-                f"Manager {current_user.manager_id} attempted to delete track {track_id} "
-                f"with language '{track_language}' not in their assigned languages {manager_languages}"
-            )
-            raise HTTPException(status_code=403, detail="Not authorized to delete this track")
+async def delete_track(track_id: str, access: AccessScope = Depends(get_access_scope)):
+    # Step 1-2: Find the track metadata in MongoDB, restricted to the manager's languages
+    track = await find_track_in_scope(access, track_id, "delete")
 
     # Step 3: Delete all associated files from Google Cloud Storage
     blob_name_fields = [
@@ -1975,10 +3244,11 @@ async def delete_track(track_id: str, current_user: User = Depends(get_current_u
     for field in blob_name_fields:
         blob_name = track.get(field)
         if blob_name:
-            await delete_from_gcs(blob_name)
+            await delete_from_storage(blob_name)
 
     # Step 4: After deleting files, delete the record from MongoDB
     await db.tracks.delete_one({"id": track_id})
+    await record_track_change(track, None)
     
     return {"message": "Track and associated files deleted successfully"}
 
@@ -2014,7 +3284,8 @@ async def download_bulk_upload_template(current_user: User = Depends(get_current
 @api_router.post("/tracks/bulk-upload")
 async def bulk_upload_tracks(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    access: AccessScope = Depends(get_access_scope)
 ):
     """
     Process bulk upload of tracks from an Excel file.
@@ -2040,7 +3311,7 @@ async def bulk_upload_tracks(
             row_number = index + 2  # +2 because Excel rows start at 1 and we have a header
             
             try:
-                track_id, error = await process_bulk_upload_row(row.to_dict(), row_number, current_user)
+                track_id, error = await process_bulk_upload_row(row.to_dict(), row_number, current_user, access)
                 
                 if error:
                     failed_rows.append({
@@ -2081,78 +3352,144 @@ async def bulk_upload_tracks(
         raise HTTPException(status_code=500, detail=f"Bulk upload failed: {str(e)}")
 
 @api_router.get("/tracks/{track_id}", response_model=MusicTrack) 
-async def get_track_details(track_id: str, current_user: User = Depends(get_current_user)):
+async def get_track_details(
+    track_id: str,
+    request: StarletteRequest,
+    response: Response,
+    access: AccessScope = Depends(get_access_scope)
+):
     """
     Fetch the details for a single music track.
+    The ETag is derived from the track's revision; a matching If-None-Match is
+    answered with 304 after authorization.
     """
-    track = await db.tracks.find_one({"id": track_id})
-    if not track:
-        raise HTTPException(status_code=404, detail="Track not found")
-    
-    # Authorization check: Language-based access for managers
-    if current_user.user_type == "manager":
-        # Fetch manager record to get assigned languages
-        manager_record = await db.managers.find_one({"id": current_user.manager_id})
-        
-        if not manager_record:
-            logger.warning(f"Manager record not found for user_id={current_user.id}, manager_id={current_user.manager_id}")
-            raise HTTPException(status_code=403, detail="Manager profile not found")
-        
-        manager_languages = manager_record.get("assigned_language", [])
-        track_language = track.get("audio_language", "")
-        
-        # Check if track's language is in manager's assigned languages
-        if track_language not in manager_languages:
-            logger.warning(
-                f"Manager {current_user.manager_id} attempted to view track {track_id} "
-                f"with language '{track_language}' not in their assigned languages {manager_languages}"
-            )
-            raise HTTPException(status_code=403, detail="Not authorized to view this track")
+    # One scoped read; the existence check behind 403 vs 404 only runs on a miss
+    track = await find_track_in_scope(access, track_id, "view", {"_id": 0})
 
+    etag = compute_etag("track", track_id, track.get("revision", 0))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
     return MusicTrack(**parse_from_mongo(track))
 
+def attachment_disposition(filename: str) -> str:
+    """
+    Content-Disposition that saves a download as `filename`. Header values must
+    be latin-1, so non-ASCII names (Telugu, Hindi, ...) get an ASCII-only
+    ASCII `filename` for old clients plus the exact name as RFC 5987 `filename*`.
+    """
+    filename = re.sub(r"[\x00-\x1f\x7f]", "_", filename)
+    name, ext = (
+        unicodedata.normalize("NFKD", part).encode("ascii", "ignore").decode("ascii")
+        for part in os.path.splitext(filename)
+    )
+    fallback = (name if name.strip(" ._") else "download") + ext
+    fallback = fallback.replace("\\", "\\\\").replace('"', '\\"')
+    disposition = f'attachment; filename="{fallback}"'
+    if not filename.isascii():
+        disposition += f"; filename*=UTF-8''{quote(filename, safe='')}"
+    return disposition
+
+def download_disposition(track: dict, file_type: str) -> str:
+    """Content-Disposition that saves a track file under its original name"""
+    blob_name = track[TRACK_FILE_BLOB_FIELDS[file_type]]
+    original_filename = track.get(f"{file_type}_filename") or blob_name.split('/')[-1]
+    return attachment_disposition(original_filename)
+
+@api_router.post("/tracks/signed-urls", response_model=TrackSignedUrlResponse)
+async def get_track_signed_urls(request: TrackSignedUrlRequest, access: AccessScope = Depends(get_access_scope)):
+    """
+    Stream and download URLs for many (track, file type) pairs in one round trip.
+    All tracks are authorized with a single scoped query, URLs are signed
+    concurrently (reusing cached ones) and every pair gets either a URL or the
+    error the single-item endpoints would have returned.
+    """
+    track_ids = list(dict.fromkeys(item.track_id for item in request.items))
+    projection = {"_id": 0, "id": 1}
+    for file_type, blob_field in TRACK_FILE_BLOB_FIELDS.items():
+        projection[blob_field] = 1
+        projection[f"{file_type}_filename"] = 1
+    
+    scope = access.languages
+    if scope is not None and not scope:
+        tracks = []
+    else:
+        query = {"id": {"$in": track_ids}}
+        if scope is not None:
+            query["audio_language"] = {"$in": scope}
+        tracks = await db.tracks.find(query, projection).to_list(len(track_ids))
+    found = {track["id"]: track for track in tracks}
+    
+    existing_ids = set()
+    missing = [track_id for track_id in track_ids if track_id not in found]
+    if missing and scope is not None:
+        # Only managers can be denied; tell "exists elsewhere" apart from "does not exist"
+        existing = await db.tracks.find({"id": {"$in": missing}}, {"_id": 0, "id": 1}).to_list(len(missing))
+        existing_ids = {track["id"] for track in existing}
+        if existing_ids:
+            logger.warning(f"Manager {access.user.manager_id} requested URLs for {len(existing_ids)} tracks outside their assigned languages")
+    
+    results = []
+    to_sign = {}  # (blob name, expiration, disposition) -> result dicts waiting for that URL
+    for item in request.items:
+        result = {
+            "track_id": item.track_id, "file_type": item.file_type, "mode": item.mode,
+            "url": None, "max_age": None, "status": 200, "error": None,
+        }
+        results.append(result)
+        track = found.get(item.track_id)
+        blob_field = TRACK_FILE_BLOB_FIELDS.get(item.file_type)
+        if item.mode not in ("download", "stream") or (item.mode == "stream" and item.file_type != "mp3"):
+            result.update(status=400, error="Only mp3 files can be streamed" if item.mode == "stream" else f"Invalid mode '{item.mode}'")
+        elif track is None:
+            if item.track_id in existing_ids:
+                result.update(status=403, error="Not authorized to access this track")
+            else:
+                result.update(status=404, error="Track not found")
+        elif not blob_field or not track.get(blob_field):
+            result.update(status=404, error=f"File of type '{item.file_type}' not found.")
+        elif item.mode == "stream":
+            to_sign.setdefault((track[blob_field], TRACK_STREAM_URL_EXPIRATION, None), []).append(result)
+        else:
+            key = (track[blob_field], TRACK_DOWNLOAD_URL_EXPIRATION, download_disposition(track, item.file_type))
+            to_sign.setdefault(key, []).append(result)
+    
+    semaphore = asyncio.Semaphore(SIGNED_URL_BATCH_CONCURRENCY)
+    
+    async def sign(key):
+        blob_name, expiration, disposition = key
+        async with semaphore:
+            try:
+                url, max_age = await get_cached_signed_url(blob_name, expiration, disposition)
+                update = {"url": url, "max_age": int(max_age)}
+            except HTTPException:
+                # Already logged by the signing helper
+                update = {"status": 500, "error": "Could not generate URL"}
+        for result in to_sign[key]:
+            result.update(update)
+    
+    await asyncio.gather(*(sign(key) for key in to_sign))
+    return ORJSONResponse({"items": results})
+
 @api_router.get("/tracks/{track_id}/download/{file_type}", response_model=dict)
-async def get_track_download_url(track_id: str, file_type: str, current_user: User = Depends(get_current_user)):
+async def get_track_download_url(track_id: str, file_type: str, response: Response, access: AccessScope = Depends(get_access_scope)):
     """Generates and returns a download URL by calling the robust helper function."""
     try:
-        track = await db.tracks.find_one({"id": track_id})
-        if not track: 
-            raise HTTPException(status_code=404, detail="Track not found")
-
-        # Authorization check: Language-based access for managers
-        if current_user.user_type == "manager":
-            # Fetch manager record to get assigned languages
-            manager_record = await db.managers.find_one({"id": current_user.manager_id})
-            
-            if not manager_record:
-                logger.warning(f"Manager record not found for user_id={current_user.id}, manager_id={current_user.manager_id}")
-                raise HTTPException(status_code=403, detail="Manager profile not found")
-            
-            manager_languages = manager_record.get("assigned_language", [])
-            track_language = track.get("audio_language", "")
-            
-            # Check if track's language is in manager's assigned languages
-            if track_language not in manager_languages:
-                logger.warning(
-                    f"Manager {current_user.manager_id} attempted to download track {track_id} "
-                    f"with language '{track_language}' not in their assigned languages {manager_languages}"
-                )
-                raise HTTPException(status_code=403, detail="Not authorized to access this track")
+        # Authorization check: language-based access for managers is part of the query
+        track = await find_track_in_scope(access, track_id, "access")
 
-        blob_field_map = { "mp3": "mp3_blob_name", "lyrics": "lyrics_blob_name", "session": "session_blob_name", "singer_agreement": "singer_agreement_blob_name", "music_director_agreement": "music_director_agreement_blob_name" }
-        blob_field = blob_field_map.get(file_type)
+        blob_field = TRACK_FILE_BLOB_FIELDS.get(file_type)
         if not blob_field or not track.get(blob_field):
             raise HTTPException(status_code=404, detail=f"File of type '{file_type}' not found.")
 
-        blob_name = track[blob_field]
-        original_filename = track.get(f"{file_type}_filename") or blob_name.split('/')[-1]
-        
-        url = await generate_signed_url_with_impersonation(
-            blob_name=blob_name,
-            expiration=timedelta(minutes=15),
-            method="GET",
-            response_disposition=f'attachment; filename="{original_filename}"'
+        url, max_age = await get_cached_signed_url(
+            blob_name=track[blob_field],
+            expiration=TRACK_DOWNLOAD_URL_EXPIRATION,
+            response_disposition=download_disposition(track, file_type)
         )
+        response.headers["Cache-Control"] = signed_url_cache_control(max_age)
         return {"url": url}
     except Exception as e:
         logger.exception(f"Failed to get download URL for track {track_id}")
@@ -2162,43 +3499,157 @@ async def get_track_download_url(track_id: str, file_type: str, current_user: Us
         raise HTTPException(status_code=500, detail="Could not process download request.")
 
 
+audio_chunk_cache = AudioChunkCache(AUDIO_CHUNK_CACHE_DIR, AUDIO_CHUNK_SIZE, AUDIO_CHUNK_CACHE_MAX_BYTES)
+# blob name -> BlobMetadata
+audio_metadata_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=AUDIO_METADATA_CACHE_TTL_SECONDS)
+
+async def get_audio_blob_metadata(blob_name: str):
+    """Size, generation and content type of a stored audio file, cached briefly"""
+    metadata = audio_metadata_cache.get(blob_name)
+    if metadata is None:
+        metadata = await storage_backend.metadata(blob_name)
+        if metadata is None:
+            raise HTTPException(status_code=404, detail="Audio file not found.")
+        audio_metadata_cache[blob_name] = metadata
+    return metadata
+
+async def read_audio_chunk(blob_name: str, generation, size: int, index: int) -> bytes:
+    """One AUDIO_CHUNK_SIZE chunk of a blob generation, from disk or with a ranged storage read"""
+    async def fetch():
+        start = index * AUDIO_CHUNK_SIZE
+        end = min(start + AUDIO_CHUNK_SIZE, size) - 1  # Inclusive
+        return await storage_backend.read_range(blob_name, generation, start, end)
+    
+    return await audio_chunk_cache.get(blob_name, generation, index, fetch)
+
+async def iter_audio_range(blob_name: str, generation, size: int, start: int, end: int, first_chunk: bytes):
+    """
+    Bytes start..end (inclusive) of a blob, reading one chunk ahead of the
+    client. `first_chunk` is the already-read chunk containing `start`.
+    """
+    first, last = start // AUDIO_CHUNK_SIZE, end // AUDIO_CHUNK_SIZE
+    next_chunk = None
+    try:
+        for index in range(first, last + 1):
+            next_chunk, chunk = None, next_chunk
+            if index < last:
+                next_chunk = asyncio.ensure_future(read_audio_chunk(blob_name, generation, size, index + 1))
+            data = first_chunk if index == first else await chunk
+            offset = index * AUDIO_CHUNK_SIZE
+            yield data[max(start - offset, 0):end - offset + 1]
+    except FileNotFoundError:
+        # Replaced while streaming: too late for a 404, but the next request sees the new file
+        audio_metadata_cache.pop(blob_name, None)
+        logger.warning(f"Audio file {blob_name} changed while it was being streamed")
+        raise
+    finally:
+        # The shared fetch keeps running and still fills the cache
+        if next_chunk is not None:
+            next_chunk.cancel()
+
+def parse_byte_range(range_header: str, size: int):
+    """
+    (start, end) of a single-range "bytes=" header, end inclusive. Returns None
+    when the header should be ignored (other units, multiple ranges, malformed)
+    and raises 416 when the range lies outside the file.
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", range_header)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            start = size
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+async def blob_response(request: StarletteRequest, blob_name: str, metadata, media_type: str, headers: dict) -> Response:
+    """
+    Response with a stored file, honouring a single byte range (206). Local
+    files are sent from disk (a full file as a FileResponse, which ASGI servers
+    supporting the pathsend extension transmit zero-copy); remote ones go
+    through the audio chunk cache. The first remote chunk is read before the
+    response starts, so a file replaced since `metadata` was read raises
+    FileNotFoundError here rather than breaking the response midway.
+    """
+    size = metadata.size
+    etag = f'"{metadata.generation}"'
+    headers = {**headers, "Accept-Ranges": "bytes", "ETag": etag}
+    
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size and (not if_range or if_range == etag):
+        byte_range = parse_byte_range(range_header, size)
+    
+    if byte_range is None:
+        if isinstance(storage_backend, LocalStorageBackend):
+            return FileResponse(storage_backend.path(blob_name), media_type=media_type, headers=headers)
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    if not size:
+        body = iter(())
+    elif isinstance(storage_backend, LocalStorageBackend):
+        body = storage_backend.iter_range(blob_name, start, end)
+    else:
+        first_chunk = await read_audio_chunk(blob_name, metadata.generation, size, start // AUDIO_CHUNK_SIZE)
+        body = iter_audio_range(blob_name, metadata.generation, size, start, end, first_chunk)
+    return StreamingResponse(body, status_code=status_code, media_type=media_type, headers=headers)
+
+@api_router.get("/tracks/{track_id}/audio")
+async def get_track_audio(track_id: str, request: StarletteRequest, access: AccessScope = Depends(get_access_scope)):
+    """
+    The track's MP3 through the API, for clients that cannot follow signed URLs.
+    Honours single byte-range requests (206); only the chunks covering the
+    range are read from remote storage, and chunks already on local disk are reused.
+    """
+    track = await find_track_in_scope(access, track_id, "access", {"_id": 0, "mp3_blob_name": 1})
+    blob_name = track.get("mp3_blob_name")
+    if not blob_name:
+        raise HTTPException(status_code=404, detail="Audio file not found.")
+    
+    # Cached metadata may name a generation that has since been replaced: re-read it once
+    for _ in range(2):
+        metadata = await get_audio_blob_metadata(blob_name)
+        try:
+            return await blob_response(
+                request, blob_name, metadata,
+                media_type=metadata.content_type or "audio/mpeg",
+                headers={"Cache-Control": AUDIO_PROXY_CACHE_CONTROL}
+            )
+        except FileNotFoundError:
+            audio_metadata_cache.pop(blob_name, None)
+    raise HTTPException(status_code=404, detail="Audio file not found.")
+
 @api_router.get("/tracks/{track_id}/stream", response_model=dict)
-async def get_track_stream_url(track_id: str, current_user: User = Depends(get_current_user)):
+async def get_track_stream_url(track_id: str, response: Response, access: AccessScope = Depends(get_access_scope)):
     """Generates and returns a stream URL by calling the robust helper function."""
     try:
-        track = await db.tracks.find_one({"id": track_id})
-        if not track: 
-            raise HTTPException(status_code=404, detail="Track not found")
-        
-        # Authorization check: Language-based access for managers
-        if current_user.user_type == "manager":
-            # Fetch manager record to get assigned languages
-            manager_record = await db.managers.find_one({"id": current_user.manager_id})
-            
-            if not manager_record:
-                logger.warning(f"Manager record not found for user_id={current_user.id}, manager_id={current_user.manager_id}")
-                raise HTTPException(status_code=403, detail="Manager profile not found")
-            
-            manager_languages = manager_record.get("assigned_language", [])
-            track_language = track.get("audio_language", "")
-            
-            # Check if track's language is in manager's assigned languages
-            if track_language not in manager_languages:
-                logger.warning(
-                    f"Manager {current_user.manager_id} attempted to access track {track_id} "
-                    f"with language '{track_language}' not in their assigned languages {manager_languages}"
-                )
-                raise HTTPException(status_code=403, detail="Not authorized to access this track")
+        # Authorization check: language-based access for managers is part of the query
+        track = await find_track_in_scope(access, track_id, "access", {"_id": 0, "mp3_blob_name": 1})
 
         blob_name = track.get("mp3_blob_name")
         if not blob_name:
             raise HTTPException(status_code=404, detail="Audio file not found.")
         
-        url = await generate_signed_url_with_impersonation(
-            blob_name=blob_name,
-            expiration=timedelta(hours=2),
-            method="GET"
-        )
+        url, max_age = await get_cached_signed_url(blob_name=blob_name, expiration=TRACK_STREAM_URL_EXPIRATION)
+        response.headers["Cache-Control"] = signed_url_cache_control(max_age)
         return {"url": url}
     except Exception as e:
         logger.exception(f"Failed to get stream URL for track {track_id}")
@@ -2268,40 +3719,40 @@ async def get_next_unique_code(full_prefix: str, current_user: User = Depends(ge
 async def update_track(
     track_id: str,
     track_update: MusicTrackUpdate,
-    current_user: User = Depends(get_current_user)
+    access: AccessScope = Depends(get_access_scope)
 ):
-    track = await db.tracks.find_one({"id": track_id})
-    if not track:
-        raise HTTPException(status_code=404, detail="Track not found")
-    
-    # Authorization: Language-based access for managers
-    if current_user.user_type == "manager":
-        # Fetch manager record to get assigned languages
-        manager_record = await db.managers.find_one({"id": current_user.manager_id})
-        
-        if not manager_record:
-            logger.warning(f"Manager record not found for user_id={current_user.id}, manager_id={current_user.manager_id}")
-            raise HTTPException(status_code=403, detail="Manager profile not found")
-        
-        manager_languages = manager_record.get("assigned_language", [])
-        track_language = track.get("audio_language", "")
-        
-        # Check if track's language is in manager's assigned languages
-        if track_language not in manager_languages:
-            logger.warning(
-                f"Manager {current_user.manager_id} attempted to update track {track_id} "
-                f"with language '{track_language}' not in their assigned languages {manager_languages}"
-            )
-            raise HTTPException(status_code=403, detail="Not authorized to update this track")
-    # Admins can edit any track (no additional check needed)
-    
     update_data = {k: v for k, v in track_update.dict().items() if v is not None}
     
-    if update_data:
-        await db.tracks.update_one({"id": track_id}, {"$set": update_data})
+    if "audio_language" in update_data and not access.allows_language(update_data["audio_language"]):
+        raise HTTPException(
+            status_code=403,
+            detail=f"You can only assign your assigned languages: {', '.join(access.languages)}"
+        )
+    
+    if not update_data:
+        track = await find_track_in_scope(access, track_id, "update", {"_id": 0})
+        return MusicTrack(**parse_from_mongo(track))
     
-    updated_track = await db.tracks.find_one({"id": track_id})
-    return MusicTrack(**parse_from_mongo(updated_track))
+    # Authorization: language-based access for managers is part of the update filter;
+    # admins can edit any track
+    try:
+        track = await db.tracks.find_one_and_update(
+            access.track_filter(track_id),
+            {"$set": update_data, "$inc": {"revision": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Unique code already exists")
+    if not track:
+        # Raises the appropriate 403 or 404
+        await find_track_in_scope(access, track_id, "update", {"_id": 0, "id": 1})
+        # The track moved into scope after the update missed it; nothing was written
+        raise HTTPException(status_code=409, detail="Track changed during the update, please retry")
+
+    updated_track = {**track, **update_data, "revision": track.get("revision", 0) + 1}
+    await record_track_change(track, updated_track)
+    return MusicTrack(**parse_from_mongo(dict(updated_track)))
 
 @api_router.get("/verify-deployment")
 async def verify_deployment():
@@ -2328,14 +3779,9 @@ async def verify_signing():
 
         logger.info(f"Attempting to sign using the identity of: {target_service_account}")
         
-        # We create credentials that are "impersonating" our own service account.
-        # This is the action that requires the 'Service Account Token Creator' role.
-        creds = impersonated_credentials.Credentials(
-            source_credentials=None,  # Use application default credentials
-            target_principal=target_service_account,
-            target_scopes=["https://www.googleapis.com/auth/devstorage.read_write"],
-            # The signer is the IAM Credentials API, not a local private key
-        )
+        # The same impersonated credentials the signed URLs use.
+        # Impersonation requires the 'Service Account Token Creator' role.
+        creds = await signing_credentials.credentials(STORAGE_SCOPES)
         
         # The data we want to sign
         payload_to_sign = "test-payload-for-signing".encode('utf-8')
@@ -2379,27 +3825,84 @@ async def verify_libraries():
     except Exception as e:
         return {"error": str(e)}
 
+def local_storage_path(blob_name: str):
+    """Path of a blob in local storage, or 404 when files are not stored locally"""
+    if not isinstance(storage_backend, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        return storage_backend.path(blob_name)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid blob name")
+
+@api_router.get("/storage/{blob_name:path}")
+async def download_local_storage_file(
+    blob_name: str,
+    request: StarletteRequest,
+    expires: int,
+    signature: str,
+    response_content_disposition: Optional[str] = Query(None, alias="response-content-disposition")
+):
+    """Serve a locally stored file to the holder of a signed URL (the local stand-in for GCS)"""
+    local_storage_path(blob_name)
+    if not verify_local_storage_signature(
+        SECRET_KEY.encode(), "GET", blob_name, expires, signature, None, response_content_disposition
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    
+    metadata = await storage_backend.metadata(blob_name)
+    if metadata is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    headers = {"Cache-Control": "private, max-age=3600"}
+    if response_content_disposition:
+        headers["Content-Disposition"] = response_content_disposition
+    return await blob_response(
+        request, blob_name, metadata,
+        media_type=metadata.content_type or "application/octet-stream",
+        headers=headers
+    )
+
+@api_router.put("/storage/{blob_name:path}")
+async def upload_local_storage_file(blob_name: str, request: StarletteRequest, expires: int, signature: str):
+    """Store a direct upload made with a signed PUT URL from /tracks/generate-upload-url"""
+    local_storage_path(blob_name)
+    if not verify_local_storage_signature(
+        SECRET_KEY.encode(), "PUT", blob_name, expires, signature, request.headers.get("content-type")
+    ):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    
+    too_large = HTTPException(
+        status_code=413, detail=f"File exceeds the {LOCAL_STORAGE_MAX_UPLOAD_BYTES} byte upload limit"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > LOCAL_STORAGE_MAX_UPLOAD_BYTES:
+        raise too_large
+    try:
+        # Chunked bodies carry no length, so the limit is also enforced while writing
+        size = await storage_backend.write_stream(blob_name, request.stream(), LOCAL_STORAGE_MAX_UPLOAD_BYTES)
+    except UploadTooLarge:
+        logger.warning(f"Rejected direct upload {blob_name}: over {LOCAL_STORAGE_MAX_UPLOAD_BYTES} bytes")
+        raise too_large
+    logger.info(f"Stored direct upload {storage_backend.describe(blob_name)} ({size} bytes)")
+    return Response(status_code=200)
+
 @api_router.post("/tracks/generate-upload-url")
 async def generate_upload_url(
     filename: str = Form(...),
     content_type: str = Form(...),
     folder: str = Form(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    access: AccessScope = Depends(get_access_scope)
 ):
     """
-    Generate a signed URL using explicit, manual impersonation to fix credential auto-discovery issues.
-    This is the definitive and final version.
+    Generate a signed PUT URL for a direct browser upload with the configured signer.
     """
     logger.info(f"Upload URL request from user {current_user.id}: folder={folder}, file={filename}")
 
     # --- Initial Configuration Checks ---
-    if not GCS_BUCKET_NAME:
-        logger.error("FATAL: GCS_BUCKET_NAME environment variable is not set.")
-        raise HTTPException(status_code=500, detail="Server is misconfigured: Storage bucket name is missing.")
-    
-    if not SIGNING_SERVICE_ACCOUNT_EMAIL:
-        logger.error("FATAL: SIGNING_SERVICE_ACCOUNT_EMAIL environment variable is not set.")
-        raise HTTPException(status_code=500, detail="Server is misconfigured: Signing service account is missing.")
+    if url_signer is None:
+        logger.error("FATAL: no URL signer is configured.")
+        raise HTTPException(status_code=500, detail="Server is misconfigured: URL signing is not configured.")
 
     # --- Input Validation ---
     valid_folders = ['audio', 'lyrics', 'sessions', 'agreements']
@@ -2407,46 +3910,21 @@ async def generate_upload_url(
         raise HTTPException(status_code=400, detail=f"Invalid folder specified.")
     
     # You can add your content-type validation logic here if needed
-    await require_upload_permission(folder, current_user)
+    await require_upload_permission(folder, access)
 
     try:
-        # --- Prepare GCS Blob ---
+        # --- Prepare Blob Name ---
         safe_filename = sanitize_filename(filename)
         blob_name = f"{folder}/{uuid.uuid4()}_{safe_filename}"
-        bucket = storage_client.bucket(GCS_BUCKET_NAME)
-        blob = bucket.blob(blob_name)
-
-        logger.info("--- Starting Explicit Impersonation Process ---")
-
-        # Step 1: Manually fetch the base credentials from the Cloud Run environment (ADC).
-        # This is the key fix that prevents the 'NoneType' error by forcing the credential discovery.
-        base_creds, project_id = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
-        if not project_id:
-             logger.warning("Could not determine project ID from default credentials.")
-        logger.info(f"Base credentials successfully obtained for project: {project_id}")
-
-        # Step 2: Manually create the impersonated credentials object.
-        # We explicitly provide the base credentials, bypassing the broken auto-discovery mechanism.
-        impersonated_creds = impersonated_credentials.Credentials(
-            source_credentials=base_creds,
-            target_principal=SIGNING_SERVICE_ACCOUNT_EMAIL,
-            target_scopes=["https://www.googleapis.com/auth/devstorage.read_write"],
-            lifetime=900  # Lifetime in seconds (15 minutes), matching the URL expiration
-        )
-        logger.info(f"Impersonated credentials object successfully created for target: {SIGNING_SERVICE_ACCOUNT_EMAIL}")
 
-        # Step 3: Generate the signed URL using the EXPLICIT credentials object.
-        # We now pass the 'credentials=' parameter instead of 'service_account_email='.
-        signed_url = await asyncio.to_thread(
-            blob.generate_signed_url,
-            expiration=timedelta(minutes=15),
+        signed_url = await url_signer.sign(
+            blob_name,
+            timedelta(minutes=15),
             method="PUT",
-            version="v4",
-            content_type=content_type,
-            credentials=impersonated_creds,  # <-- THE CRITICAL FIX IS HERE
+            content_type=content_type
         )
         
-        logger.info("--- Explicit Impersonation and URL Signing SUCCEEDED ---")
+        logger.info("--- URL Signing SUCCEEDED ---")
 
     except Exception as e:
         logger.exception("CRITICAL ERROR during explicit signed URL generation")
@@ -2462,9 +3940,10 @@ async def generate_upload_url(
 @api_router.delete("/tracks/cleanup-upload/{blob_name:path}")
 async def cleanup_upload(
     blob_name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    access: AccessScope = Depends(get_access_scope)
 ):
-    """Delete an uploaded file from GCS storage"""
+    """Delete an uploaded file from storage"""
     if not blob_name:
         raise HTTPException(status_code=400, detail="Blob name is required")
 
@@ -2479,11 +3958,11 @@ async def cleanup_upload(
         )
 
     # Check user's permission for the folder
-    await require_upload_permission(folder, current_user)
+    await require_upload_permission(folder, access)
 
     try:
         # Attempt to delete the blob
-        await delete_from_gcs(blob_name)
+        await delete_from_storage(blob_name)
         logger.info(f"Successfully cleaned up blob {blob_name} for user {current_user.id}")
         return {"message": "File cleaned up successfully"}
         
@@ -2543,6 +4022,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes(db)
+
+@app.on_event("startup")
+async def build_track_search_index():
+    # Built in the background, and rebuilt whenever writes made by other instances
+    # leave it behind; searches fall back to the regex scan meanwhile
+    schedule_catalog_index_rebuild(track_search_index)
+
+@app.on_event("startup")
+async def build_track_autocomplete_index():
+    # Until it is ready, and while writes made by other instances are being caught
+    # up, autocomplete falls back to a Mongo aggregation
+    schedule_catalog_index_rebuild(track_autocomplete_index)
+
+@app.on_event("startup")
+async def start_catalog_stats_reconciliation():
+    app.state.catalog_stats_task = asyncio.create_task(run_catalog_stats_reconciliation())
+
+@app.on_event("startup")
+async def start_signing_credentials_refresh():
+    # Fetches the signing credentials once, then refreshes them ahead of expiry
+    if signing_credentials and URL_SIGNER == "iam":
+        app.state.signing_credentials_task = asyncio.create_task(signing_credentials.run())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+    password_hasher.shutdown()
+    audio_chunk_cache.close()
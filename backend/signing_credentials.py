@@ -0,0 +1,151 @@
+"""
+Shared impersonated credentials for signing GCS URLs.
+
+V4 signed URLs are signed through the IAM signBlob API on behalf of the
+signing service account. Discovering application default credentials and
+obtaining tokens for them is the slow part, so the credentials are created
+once per target scope set and kept valid by a background task that refreshes
+them well before they expire. A signed URL then only costs the sign call.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+import google.auth
+from google.auth import impersonated_credentials
+from google.auth.transport.requests import Request
+
+logger = logging.getLogger(__name__)
+
+SOURCE_SCOPES = ("https://www.googleapis.com/auth/cloud-platform",)
+STORAGE_SCOPES = ("https://www.googleapis.com/auth/devstorage.read_write",)
+
+
+def _naive_utcnow() -> datetime:
+    # google-auth keeps expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SigningCredentialManager:
+    """Impersonated credentials for one target principal, cached per scope set.
+
+    Refreshes run in worker threads; a lock per credentials object keeps
+    concurrent callers from refreshing the same token twice.
+    """
+
+    def __init__(
+        self,
+        target_principal: str,
+        lifetime_seconds: int = 3600,
+        refresh_margin: timedelta = timedelta(minutes=10),
+        check_interval_seconds: int = 60,
+    ):
+        self.target_principal = target_principal
+        self.lifetime_seconds = lifetime_seconds
+        self.refresh_margin = refresh_margin
+        self.check_interval_seconds = check_interval_seconds
+        self._source = None
+        self._credentials = {}  # scopes -> impersonated Credentials
+        self._lock = threading.Lock()
+        self._refresh_locks = {}  # id(credentials) -> threading.Lock
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.inline_refreshes = 0
+
+    def _expiring(self, creds) -> bool:
+        if not creds.token:
+            return True
+        if creds.expiry is None:
+            # Token without a known lifetime
+            return False
+        return creds.expiry - self.refresh_margin <= _naive_utcnow()
+
+    def _source_credentials(self):
+        """Application default credentials, discovered once (blocking)"""
+        with self._lock:
+            if self._source is None:
+                self._source, project_id = google.auth.default(scopes=list(SOURCE_SCOPES))
+                logger.info(f"Signing source credentials loaded for project {project_id}")
+            return self._source
+
+    def _get_or_create(self, scopes: tuple):
+        """Cached impersonated credentials for `scopes` (blocking on first use)"""
+        source = self._source_credentials()
+        with self._lock:
+            creds = self._credentials.get(scopes)
+            if creds is None:
+                creds = impersonated_credentials.Credentials(
+                    source_credentials=source,
+                    target_principal=self.target_principal,
+                    target_scopes=list(scopes),
+                    lifetime=self.lifetime_seconds,
+                )
+                self._credentials[scopes] = creds
+                self._refresh_locks[id(creds)] = threading.Lock()
+                logger.info(f"Created impersonated credentials for {self.target_principal} with scopes {list(scopes)}")
+            return creds
+
+    def _refresh(self, creds) -> None:
+        """Refresh `creds` unless another thread already did (blocking)"""
+        with self._refresh_locks.setdefault(id(creds), threading.Lock()):
+            if not self._expiring(creds):
+                return
+            try:
+                creds.refresh(Request())
+                self.refreshes += 1
+            except Exception:
+                self.refresh_failures += 1
+                raise
+
+    def _prepare(self, scopes: tuple):
+        """Credentials for `scopes` with fresh source and impersonated tokens (blocking)"""
+        creds = self._get_or_create(scopes)
+        # signBlob authenticates with the source credentials, so keep their token fresh too
+        for candidate in (self._source, creds):
+            if self._expiring(candidate):
+                self.inline_refreshes += 1
+                self._refresh(candidate)
+        return creds
+
+    async def credentials(self, scopes: tuple = STORAGE_SCOPES):
+        """Ready-to-sign credentials; only refreshes inline if the background task fell behind"""
+        creds = self._credentials.get(scopes)
+        if creds is not None and self._source is not None and not self._expiring(creds) and not self._expiring(self._source):
+            return creds
+        return await asyncio.to_thread(self._prepare, scopes)
+
+    async def refresh_expiring(self) -> None:
+        """Refresh every cached credential that expires within the margin"""
+        if self._source is None:
+            return
+        for creds in [self._source, *self._credentials.values()]:
+            if self._expiring(creds):
+                try:
+                    await asyncio.to_thread(self._refresh, creds)
+                except Exception as e:
+                    logger.error(f"Background refresh of signing credentials failed: {e}")
+
+    async def run(self) -> None:
+        """Load the default scope set, then keep everything fresh until cancelled"""
+        try:
+            await self.credentials()
+        except Exception as e:
+            logger.error(f"Could not prepare signing credentials at startup: {e}")
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.refresh_expiring()
+
+    def stats(self) -> dict:
+        """Cached scope sets with their expiry, and refresh counters"""
+        def expiry(creds):
+            return creds.expiry.isoformat() + "Z" if creds is not None and creds.expiry and creds.token else None
+
+        return {
+            "target_principal": self.target_principal,
+            "source_expiry": expiry(self._source),
+            "credentials": {" ".join(scopes): expiry(creds) for scopes, creds in self._credentials.items()},
+            "refreshes": self.refreshes,
+            "inline_refreshes": self.inline_refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
@@ -0,0 +1,235 @@
+"""
+Where track files live.
+
+StorageBackend is the interface the API uses for every file operation. Two
+implementations exist:
+
+- GCSStorageBackend stores blobs in a Google Cloud Storage bucket.
+- LocalStorageBackend stores them as files under a root directory, for
+  on-prem deployments and benchmarks without cloud calls. Downloads of its
+  files are served straight from disk (see GET /api/storage/...), so it adds
+  the path and streaming operations the API needs for that.
+
+Blob names are the same in both ("<folder>/<uuid>_<filename>"), so track
+documents do not depend on the backend.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKEND_KINDS = ("gcs", "local")
+# Read size when streaming local files
+LOCAL_READ_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class BlobMetadata:
+    size: int
+    generation: str  # Changes whenever the content is replaced
+    content_type: Optional[str]  # None when unknown
+
+
+class UploadTooLarge(Exception):
+    """A streamed upload exceeded its size limit"""
+
+
+class StorageBackend(ABC):
+    """File operations on blob names; every method is safe to call from the event loop"""
+
+    kind = None
+
+    @abstractmethod
+    def describe(self, blob_name: str) -> str:
+        """Human-readable location of a blob, for logs"""
+
+    @abstractmethod
+    async def upload_file(self, file_path: str, blob_name: str, content_type: Optional[str] = None) -> None:
+        """Store the file at `file_path` (left in place) as `blob_name`"""
+
+    @abstractmethod
+    async def read_text(self, blob_name: str) -> str:
+        """Contents of a text blob"""
+
+    @abstractmethod
+    async def delete(self, blob_name: str) -> bool:
+        """Delete a blob; False if it did not exist"""
+
+    @abstractmethod
+    async def metadata(self, blob_name: str) -> Optional[BlobMetadata]:
+        """Size, generation and content type, or None if the blob does not exist"""
+
+    @abstractmethod
+    async def read_range(self, blob_name: str, generation: str, start: int, end: int) -> bytes:
+        """
+        Bytes start..end (inclusive) of the given generation of a blob; raises
+        FileNotFoundError once that generation has been replaced or deleted
+        """
+
+
+class GCSStorageBackend(StorageBackend):
+    """Blobs in a Google Cloud Storage bucket"""
+
+    kind = "gcs"
+
+    def __init__(self, bucket_name: str, client=None):
+        from google.cloud import storage
+
+        self.bucket_name = bucket_name
+        self.client = client or storage.Client()
+        self.bucket = self.client.bucket(bucket_name)
+
+    def check(self) -> None:
+        """Raise if the bucket cannot be accessed (blocking)"""
+        self.client.get_bucket(self.bucket_name)
+
+    def describe(self, blob_name: str) -> str:
+        return f"gs://{self.bucket_name}/{blob_name}"
+
+    async def upload_file(self, file_path, blob_name, content_type=None):
+        blob = self.bucket.blob(blob_name)
+        if content_type:
+            blob.content_type = content_type
+        # Streams the file without loading it entirely into memory
+        await asyncio.to_thread(blob.upload_from_filename, file_path)
+
+    async def read_text(self, blob_name):
+        return await asyncio.to_thread(self.bucket.blob(blob_name).download_as_text)
+
+    async def delete(self, blob_name):
+        blob = self.bucket.blob(blob_name)
+        if not await asyncio.to_thread(blob.exists):
+            return False
+        await asyncio.to_thread(blob.delete)
+        return True
+
+    async def metadata(self, blob_name):
+        blob = await asyncio.to_thread(self.bucket.get_blob, blob_name)
+        if blob is None:
+            return None
+        return BlobMetadata(blob.size or 0, str(blob.generation), blob.content_type)
+
+    async def read_range(self, blob_name, generation, start, end):
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(blob_name, generation=int(generation))
+        try:
+            return await asyncio.to_thread(blob.download_as_bytes, start=start, end=end)
+        except NotFound as e:
+            raise FileNotFoundError(f"{self.describe(blob_name)}#{generation} no longer exists") from e
+
+
+class LocalStorageBackend(StorageBackend):
+    """Blobs as files under `root`"""
+
+    kind = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, blob_name: str) -> Path:
+        """Filesystem path of a blob; rejects names that escape the root"""
+        path = (self.root / blob_name).resolve()
+        if path == self.root or self.root not in path.parents:
+            raise ValueError(f"Invalid blob name: {blob_name!r}")
+        return path
+
+    def describe(self, blob_name):
+        return str(self.path(blob_name))
+
+    def _copy(self, file_path: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Copy then rename, so readers never see a partial file
+        temporary = path.with_name(path.name + ".part")
+        shutil.copyfile(file_path, temporary)
+        os.replace(temporary, path)
+
+    async def upload_file(self, file_path, blob_name, content_type=None):
+        # Content types are derived from the file name on read
+        await asyncio.to_thread(self._copy, file_path, self.path(blob_name))
+
+    async def read_text(self, blob_name):
+        return await asyncio.to_thread(self.path(blob_name).read_text, encoding="utf-8")
+
+    async def delete(self, blob_name):
+        try:
+            await asyncio.to_thread(os.unlink, self.path(blob_name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def metadata(self, blob_name):
+        path = self.path(blob_name)
+        try:
+            stat = await asyncio.to_thread(path.stat)
+        except FileNotFoundError:
+            return None
+        return BlobMetadata(stat.st_size, str(stat.st_mtime_ns), mimetypes.guess_type(path.name)[0])
+
+    def _read(self, path: Path, start: int, end: int, generation: Optional[str] = None) -> bytes:
+        with open(path, "rb") as f:
+            # Checked on the open file, so a replacement after this point cannot be read
+            if generation is not None and str(os.fstat(f.fileno()).st_mtime_ns) != generation:
+                raise FileNotFoundError(f"{path}#{generation} has been replaced")
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    async def read_range(self, blob_name, generation, start, end):
+        return await asyncio.to_thread(self._read, self.path(blob_name), start, end, generation)
+
+    async def iter_range(self, blob_name: str, start: int, end: int):
+        """Bytes start..end (inclusive) of a file, in LOCAL_READ_CHUNK_SIZE reads"""
+        path = self.path(blob_name)
+        position = start
+        while position <= end:
+            last = min(position + LOCAL_READ_CHUNK_SIZE, end + 1) - 1
+            data = await asyncio.to_thread(self._read, path, position, last)
+            if not data:
+                return
+            yield data
+            position += len(data)
+
+    async def write_stream(self, blob_name: str, chunks, max_bytes: Optional[int] = None) -> int:
+        """
+        Store an async iterable of bytes as `blob_name`; returns the size written.
+        Raises UploadTooLarge, keeping nothing, once more than `max_bytes` arrive.
+        """
+        path = self.path(blob_name)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + ".part")
+        size = 0
+        f = await asyncio.to_thread(open, temporary, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(f"{blob_name} exceeds {max_bytes} bytes")
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(temporary.unlink, True)
+            raise
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, temporary, path)
+        return size
+
+
+def build_storage_backend(kind: str, bucket_name: Optional[str] = None, local_root: Optional[str] = None) -> StorageBackend:
+    """Backend of the given kind; raises ValueError if its configuration is missing"""
+    if kind == "gcs":
+        if not bucket_name:
+            raise ValueError("GCS storage requires GCS_BUCKET_NAME")
+        return GCSStorageBackend(bucket_name)
+    if kind == "local":
+        if not local_root:
+            raise ValueError("Local storage requires LOCAL_STORAGE_ROOT")
+        return LocalStorageBackend(local_root)
+    raise ValueError(f"Unknown storage backend '{kind}', expected one of {STORAGE_BACKEND_KINDS}")
@@ -0,0 +1,223 @@
+"""
+Interchangeable signers for V4 GCS URLs.
+
+- ImpersonationSigner signs through the IAM signBlob API as the signing
+  service account (one network round trip per URL).
+- LocalKeySigner signs with a service-account key file in process, so a URL
+  costs an RSA signature and no network call.
+- LocalStorageSigner signs URLs to the API's own /storage endpoints with an
+  HMAC, for the local-disk storage backend.
+- FakeSigner returns deterministic, unusable URLs for tests and benchmarks,
+  optionally after a simulated latency.
+
+Every signer caps the number of signatures in flight and keeps latency
+counters; select one with build_url_signer().
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+logger = logging.getLogger(__name__)
+
+URL_SIGNER_KINDS = ("iam", "local_key", "local", "fake")
+
+
+class UrlSigner(ABC):
+    """Base class: concurrency limit and metrics around `_sign`"""
+
+    kind = None
+
+    def __init__(self, max_concurrency: int = 16):
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.signed = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @abstractmethod
+    async def _sign(self, blob_name: str, expiration: timedelta, method: str,
+                    content_type: Optional[str], response_disposition: Optional[str]) -> str:
+        """Sign one URL; called with a concurrency slot held"""
+
+    async def sign(self, blob_name: str, expiration: timedelta, method: str = "GET",
+                   content_type: Optional[str] = None, response_disposition: Optional[str] = None) -> str:
+        """Signed V4 URL for `blob_name`, valid for `expiration`"""
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            url = await self._sign(blob_name, expiration, method, content_type, response_disposition)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        elapsed = time.perf_counter() - started
+        self.signed += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        return url
+
+    def stats(self) -> dict:
+        """Signer kind, concurrency and latency counters"""
+        return {
+            "kind": self.kind,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "signed": self.signed,
+            "failures": self.failures,
+            "avg_ms": round(self.total_seconds / self.signed * 1000, 3) if self.signed else 0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+
+def _signed_url_kwargs(expiration, method, content_type, response_disposition) -> dict:
+    kwargs = {"version": "v4", "expiration": expiration, "method": method}
+    if content_type:
+        kwargs["content_type"] = content_type
+    if response_disposition:
+        kwargs["response_disposition"] = response_disposition
+    return kwargs
+
+
+class ImpersonationSigner(UrlSigner):
+    """Signs via IAM signBlob with shared impersonated credentials"""
+
+    kind = "iam"
+
+    def __init__(self, bucket, credential_manager, max_concurrency: int = 16):
+        super().__init__(max_concurrency)
+        self.bucket = bucket
+        self.credential_manager = credential_manager
+
+    async def _sign(self, blob_name, expiration, method, content_type, response_disposition):
+        credentials = await self.credential_manager.credentials()
+        return await asyncio.to_thread(
+            self.bucket.blob(blob_name).generate_signed_url,
+            credentials=credentials,
+            **_signed_url_kwargs(expiration, method, content_type, response_disposition),
+        )
+
+
+class LocalKeySigner(UrlSigner):
+    """Signs in process with a service-account private key"""
+
+    kind = "local_key"
+
+    def __init__(self, bucket, key_file: str, max_concurrency: int = 16):
+        from google.oauth2 import service_account
+
+        super().__init__(max_concurrency)
+        self.bucket = bucket
+        self.credentials = service_account.Credentials.from_service_account_file(key_file)
+        logger.info(f"Local URL signing key loaded for {self.credentials.service_account_email}")
+
+    async def _sign(self, blob_name, expiration, method, content_type, response_disposition):
+        # RSA signing is CPU-bound but short; keep it off the event loop anyway
+        return await asyncio.to_thread(
+            self.bucket.blob(blob_name).generate_signed_url,
+            credentials=self.credentials,
+            **_signed_url_kwargs(expiration, method, content_type, response_disposition),
+        )
+
+
+def local_storage_signature(secret: bytes, method: str, blob_name: str, expires: int,
+                            content_type: Optional[str] = None, response_disposition: Optional[str] = None) -> str:
+    """HMAC over everything a local storage URL grants"""
+    payload = "\n".join([method, blob_name, str(expires), content_type or "", response_disposition or ""])
+    return hmac.new(secret, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_local_storage_signature(secret: bytes, method: str, blob_name: str, expires: int, signature: str,
+                                   content_type: Optional[str] = None, response_disposition: Optional[str] = None) -> bool:
+    """Whether a local storage URL is authentic and not expired"""
+    if expires < time.time():
+        return False
+    expected = local_storage_signature(secret, method, blob_name, expires, content_type, response_disposition)
+    return hmac.compare_digest(expected, signature)
+
+
+class LocalStorageSigner(UrlSigner):
+    """URLs to `base_url`/<blob name> that the API itself verifies and serves"""
+
+    kind = "local"
+
+    def __init__(self, base_url: str, secret: bytes, max_concurrency: int = 16):
+        super().__init__(max_concurrency)
+        self.base_url = base_url.rstrip("/")
+        self.secret = secret
+
+    async def _sign(self, blob_name, expiration, method, content_type, response_disposition):
+        expires = int(time.time() + expiration.total_seconds())
+        params = {"expires": expires}
+        if response_disposition:
+            params["response-content-disposition"] = response_disposition
+        params["signature"] = local_storage_signature(
+            self.secret, method, blob_name, expires, content_type, response_disposition
+        )
+        return f"{self.base_url}/{quote(blob_name, safe='/~')}?{urlencode(params)}"
+
+
+class FakeSigner(UrlSigner):
+    """Deterministic URLs (same input, same URL) that no server will accept"""
+
+    kind = "fake"
+
+    def __init__(self, bucket_name: str = "fake-bucket", latency: float = 0.0,
+                 secret: bytes = b"fake-signing-key", max_concurrency: int = 16):
+        super().__init__(max_concurrency)
+        self.bucket_name = bucket_name
+        self.latency = latency
+        self.secret = secret
+
+    async def _sign(self, blob_name, expiration, method, content_type, response_disposition):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        params = {"X-Goog-Algorithm": "FAKE-HMAC-SHA256", "X-Goog-Expires": int(expiration.total_seconds())}
+        if response_disposition:
+            params["response-content-disposition"] = response_disposition
+        payload = "\n".join([method, self.bucket_name, blob_name, content_type or "", urlencode(params)])
+        params["X-Goog-Signature"] = hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()
+        return f"https://storage.invalid/{self.bucket_name}/{quote(blob_name, safe='/~')}?{urlencode(params)}"
+
+
+def build_url_signer(kind: str, bucket=None, credential_manager=None, key_file: Optional[str] = None,
+                     max_concurrency: int = 16, fake_latency: float = 0.0,
+                     bucket_name: str = "fake-bucket", local_base_url: Optional[str] = None,
+                     local_secret: Optional[bytes] = None) -> UrlSigner:
+    """
+    Signer of the given kind; raises ValueError if its configuration is missing.
+    `bucket` is the storage Bucket GCS signers sign for; the fake only needs `bucket_name`.
+    """
+    if kind in ("iam", "local_key") and bucket is None:
+        raise ValueError(f"The '{kind}' signer requires GCS storage")
+    if kind == "iam":
+        if credential_manager is None:
+            raise ValueError("IAM signing requires SIGNING_SERVICE_ACCOUNT_EMAIL")
+        return ImpersonationSigner(bucket, credential_manager, max_concurrency)
+    if kind == "local_key":
+        if not key_file:
+            raise ValueError("Local key signing requires SIGNING_KEY_FILE")
+        return LocalKeySigner(bucket, key_file, max_concurrency)
+    if kind == "local":
+        if not local_base_url or not local_secret:
+            raise ValueError("Local storage signing requires a base URL and a secret")
+        return LocalStorageSigner(local_base_url, local_secret, max_concurrency)
+    if kind == "fake":
+        return FakeSigner(bucket_name, fake_latency, max_concurrency=max_concurrency)
+    raise ValueError(f"Unknown URL signer '{kind}', expected one of {URL_SIGNER_KINDS}")
@@ -223,7 +223,7 @@ class MusicVaultAPITester:
         response = self.make_request('GET', 'tracks')
         
         if response and response.status_code == 200:
-            tracks = response.json()
+            tracks = response.json()["items"]
             self.log_test("Get All Tracks", True, f"Found {len(tracks)} tracks")
             return True
         else:
@@ -237,7 +237,7 @@ class MusicVaultAPITester:
         response = self.make_request('GET', 'tracks', params={'search': 'Test Track'})
         
         if response and response.status_code == 200:
-            tracks = response.json()
+            tracks = response.json()["items"]
             self.log_test("Search Tracks by Title", True, f"Found {len(tracks)} tracks")
         else:
             self.log_test("Search Tracks by Title", False, error=f"Status: {response.status_code if response else 'None'}")
@@ -247,7 +247,7 @@ class MusicVaultAPITester:
         response = self.make_request('GET', 'tracks', params={'composer': 'Test Composer'})
         
         if response and response.status_code == 200:
-            tracks = response.json()
+            tracks = response.json()["items"]
             self.log_test("Filter by Composer", True, f"Found {len(tracks)} tracks")
         else:
             self.log_test("Filter by Composer", False, error=f"Status: {response.status_code if response else 'None'}")
@@ -257,7 +257,7 @@ class MusicVaultAPITester:
         response = self.make_request('GET', 'tracks', params={'singer': 'Test Singer'})
         
         if response and response.status_code == 200:
-            tracks = response.json()
+            tracks = response.json()["items"]
             self.log_test("Filter by Singer", True, f"Found {len(tracks)} tracks")
         else:
             self.log_test("Filter by Singer", False, error=f"Status: {response.status_code if response else 'None'}")
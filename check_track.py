@@ -22,7 +22,7 @@ if tracks_resp.status_code != 200:
     print(f"Failed to get tracks: {tracks_resp.text}")
     sys.exit(1)
 
-tracks = tracks_resp.json()
+tracks = tracks_resp.json()["items"]
 print(f"Found {len(tracks)} tracks\n")
 
 # Find the most recent track
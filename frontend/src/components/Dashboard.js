@@ -17,6 +17,8 @@ import { Search, Music, Plus, Play, Pause, Download, Eye, Clock, User, Mic, Albu
 
 const Dashboard = ({ apiClient }) => {
   const [tracks, setTracks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [user, setUser] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
@@ -36,7 +38,8 @@ const Dashboard = ({ apiClient }) => {
     composer: '',
     singer: '',
     album: '',
-    language: ''
+    language: '',
+    sort: ''
   });
   const [activeTab, setActiveTab] = useState('cards');
   const [mainTab, setMainTab] = useState('tracks');
@@ -75,7 +78,7 @@ const Dashboard = ({ apiClient }) => {
   // Auto-trigger search when filters change
   useEffect(() => {
     fetchTracks();
-  }, [filters.composer, filters.singer, filters.album, filters.language, filters.rights_type]);
+  }, [filters.composer, filters.singer, filters.album, filters.language, filters.rights_type, filters.sort]);
 
   const fetchCurrentUser = async () => {
     try {
@@ -86,61 +89,112 @@ const Dashboard = ({ apiClient }) => {
     }
   };
 
-  const fetchTracks = async () => {
-    try {
-      setLoading(true);
-      const params = new URLSearchParams();
+  const buildTrackParams = () => {
+    const params = new URLSearchParams();
 
-      // Add search term if present
-      if (searchTerm && searchTerm.trim()) {
-        params.append('search', searchTerm.trim());
-      }
+    // Add search term if present
+    if (searchTerm && searchTerm.trim()) {
+      params.append('search', searchTerm.trim());
+    }
 
-      // Add filter parameters if they have values
-      if (filters.composer && filters.composer.trim()) {
-        params.append('composer', filters.composer.trim());
-      }
-      if (filters.singer && filters.singer.trim()) {
-        params.append('singer', filters.singer.trim());
-      }
-      if (filters.album && filters.album.trim()) {
-        params.append('album', filters.album.trim());
-      }
-      if (filters.language && filters.language.trim()) {
-        params.append('language', filters.language.trim());
-      }
-      if (filters.rights_type && filters.rights_type.trim()) {
-        params.append('rights_type', filters.rights_type.trim());
-      }
+    // Add filter parameters if they have values
+    if (filters.composer && filters.composer.trim()) {
+      params.append('composer', filters.composer.trim());
+    }
+    if (filters.singer && filters.singer.trim()) {
+      params.append('singer', filters.singer.trim());
+    }
+    if (filters.album && filters.album.trim()) {
+      params.append('album', filters.album.trim());
+    }
+    if (filters.language && filters.language.trim()) {
+      params.append('language', filters.language.trim());
+    }
+    if (filters.rights_type && filters.rights_type.trim()) {
+      params.append('rights_type', filters.rights_type.trim());
+    }
+    if (filters.sort) {
+      params.append('sort', filters.sort);
+    }
+
+    return params;
+  };
 
+  const fetchTracks = async () => {
+    try {
+      setLoading(true);
+      const params = buildTrackParams();
       const response = await apiClient.get(`/tracks?${params.toString()}`);
 
       // Handle response data
       if (response.data && Array.isArray(response.data.items)) {
         setTracks(response.data.items);
+        setNextCursor(response.data.next_cursor || null);
       } else if (Array.isArray(response.data)) {
         setTracks(response.data);
+        setNextCursor(null);
       } else {
         console.warn("Unexpected data structure from /tracks endpoint:", response.data);
         setTracks([]);
+        setNextCursor(null);
       }
 
     } catch (error) {
       console.error('Error fetching tracks:', error);
       toast.error('Failed to load tracks');
       setTracks([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreTracks = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const params = buildTrackParams();
+      params.append('after', nextCursor);
+      const response = await apiClient.get(`/tracks?${params.toString()}`);
+      setTracks((prev) => [...prev, ...(response.data.items || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading more tracks:', error);
+      toast.error('Failed to load more tracks');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const exportTracks = async (format) => {
+    try {
+      const params = buildTrackParams();
+      params.append('format', format);
+      const response = await apiClient.get(`/tracks/export?${params.toString()}`, {
+        responseType: 'blob'
+      });
+
+      const url = window.URL.createObjectURL(new Blob([response.data]));
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `tracks_export.${format}`;
+      document.body.appendChild(link);
+      link.click();
+      link.remove();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error exporting tracks:', error);
+      toast.error('Failed to export tracks');
+    }
+  };
+
   const handleSearch = () => {
     fetchTracks();
   };
 
   const clearFilters = () => {
     setSearchTerm('');
-    setFilters({ composer: '', singer: '', album: '', language: '', rights_type: '' });
+    setFilters({ composer: '', singer: '', album: '', language: '', rights_type: '', sort: '' });
     setTimeout(() => fetchTracks(), 100);
   };
 
@@ -760,6 +814,29 @@ const playTrack = async (track) => {
               </SelectContent>
             </Select>
           </div>
+
+          {/* Sort Order */}
+          <div>
+            <Label className="text-gray-400 mb-2 block">Sort By</Label>
+            <Select
+              value={filters.sort || 'newest'}
+              onValueChange={(value) => setFilters({ ...filters, sort: value === 'newest' ? '' : value })}
+            >
+              <SelectTrigger className="bg-gray-800/50 border-gray-600 text-white" data-testid="sort-select">
+                <SelectValue placeholder="Sort tracks" />
+              </SelectTrigger>
+              <SelectContent className="bg-gray-800 border-gray-600">
+                <SelectItem value="newest">Newest First</SelectItem>
+                <SelectItem value="created_at" className="text-white">Oldest First</SelectItem>
+                <SelectItem value="title" className="text-white">Title (A-Z)</SelectItem>
+                <SelectItem value="-title" className="text-white">Title (Z-A)</SelectItem>
+                <SelectItem value="unique_code" className="text-white">Unique Code</SelectItem>
+                <SelectItem value="serial_number" className="text-white">Serial Number</SelectItem>
+                <SelectItem value="-release_date" className="text-white">Release Date (Newest)</SelectItem>
+                <SelectItem value="release_date" className="text-white">Release Date (Oldest)</SelectItem>
+              </SelectContent>
+            </Select>
+          </div>
           
           <div className="flex justify-between items-center">
             <Button 
@@ -770,7 +847,27 @@ const playTrack = async (track) => {
             >
               Clear Filters
             </Button>
-            <span className="text-sm text-gray-400">{tracks.length} track(s) found</span>
+            <div className="flex items-center gap-2">
+              <Button
+                variant="outline"
+                onClick={() => exportTracks('xlsx')}
+                className="border-gray-600 text-gray-400 hover:text-white hover:border-gray-500"
+                data-testid="export-xlsx-btn"
+              >
+                <Download className="h-4 w-4 mr-2" />
+                Export Excel
+              </Button>
+              <Button
+                variant="outline"
+                onClick={() => exportTracks('csv')}
+                className="border-gray-600 text-gray-400 hover:text-white hover:border-gray-500"
+                data-testid="export-csv-btn"
+              >
+                <Download className="h-4 w-4 mr-2" />
+                Export CSV
+              </Button>
+              <span className="text-sm text-gray-400">{tracks.length} track(s) found</span>
+            </div>
           </div>
         </CardContent>
       </Card>
@@ -961,7 +1058,7 @@ const playTrack = async (track) => {
                           MP3
                         </Button>
                       )}
-                      {track.lyrics_file_path && (
+                      {track.lyrics_blob_name && (
                         <>
                           <Button
                             size="sm"
@@ -985,7 +1082,7 @@ const playTrack = async (track) => {
                           </Button>
                         </>
                       )}
-                      {track.session_file_path && (
+                      {track.session_blob_name && (
                         <Button
                           size="sm"
                           variant="outline"
@@ -1143,12 +1240,12 @@ const playTrack = async (track) => {
                                   MP3
                                 </Badge>
                               )}
-                              {track.lyrics_file_path && (
+                              {track.lyrics_blob_name && (
                                 <Badge variant="secondary" className="bg-blue-500/20 text-blue-400 text-xs">
                                   Lyrics
                                 </Badge>
                               )}
-                              {track.session_file_path && (
+                              {track.session_blob_name && (
                                 <Badge variant="secondary" className="bg-purple-500/20 text-purple-400 text-xs">
                                   Session
                                 </Badge>
@@ -1258,6 +1355,21 @@ const playTrack = async (track) => {
           )}
         </TabsContent>
       </Tabs>
+
+      {/* Pagination */}
+      {nextCursor && !loading && (
+        <div className="flex justify-center mt-6">
+          <Button
+            variant="outline"
+            className="border-gray-600 text-gray-300 hover:bg-gray-800"
+            onClick={loadMoreTracks}
+            disabled={loadingMore}
+            data-testid="load-more-tracks-btn"
+          >
+            {loadingMore ? 'Loading...' : 'Load More Tracks'}
+          </Button>
+        </div>
+      )}
         </TabsContent>
 
         {/* Managers Tab Content - Admin Only */}
@@ -49,9 +49,15 @@ const ManagerProfile = ({ apiClient }) => {
       if (profileForm.username) formData.append('username', profileForm.username);
       if (profileForm.phone) formData.append('phone', profileForm.phone);
 
-      await apiClient.put('/profile', formData, {
+      const response = await apiClient.put('/profile', formData, {
         headers: { 'Content-Type': 'multipart/form-data' }
       });
+
+      // A username change revokes existing sessions; keep this one with the fresh token
+      if (response.data?.access_token) {
+        localStorage.setItem('token', response.data.access_token);
+        apiClient.defaults.headers.common['Authorization'] = `Bearer ${response.data.access_token}`;
+      }
       
       toast.success('Profile updated successfully!');
       fetchProfile();
@@ -79,9 +85,15 @@ const ManagerProfile = ({ apiClient }) => {
       formData.append('old_password', passwordForm.oldPassword);
       formData.append('new_password', passwordForm.newPassword);
 
-      await apiClient.put('/profile/password', formData, {
+      const response = await apiClient.put('/profile/password', formData, {
         headers: { 'Content-Type': 'multipart/form-data' }
       });
+
+      // Changing the password revokes existing sessions; keep this one with the fresh token
+      if (response.data?.access_token) {
+        localStorage.setItem('token', response.data.access_token);
+        apiClient.defaults.headers.common['Authorization'] = `Bearer ${response.data.access_token}`;
+      }
       
       toast.success('Password updated successfully!');
       setPasswordForm({ oldPassword: '', newPassword: '', confirmPassword: '' });
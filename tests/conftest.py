@@ -0,0 +1,18 @@
+"""
+Unit tests import the backend modules directly, the way server.py imports its
+helpers. Importing server.py needs its environment; the values below keep it
+offline (local storage, no GCS) and never open a database connection.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", os.path.join(_scratch, "storage"))
+os.environ.setdefault("AUDIO_CHUNK_CACHE_DIR", os.path.join(_scratch, "audio-chunks"))
@@ -0,0 +1,14 @@
+class FakeCollection:
+    """Just enough of a Motor collection for the in-process index builds"""
+
+    def __init__(self, documents, on_read=None):
+        self.documents = documents
+        self.on_read = on_read  # Called with each document as the cursor reaches it
+
+    def find(self, query, projection):
+        async def cursor():
+            for document in self.documents:
+                if self.on_read:
+                    self.on_read(document)
+                yield {key: value for key, value in document.items() if projection.get(key)}
+        return cursor()
@@ -0,0 +1,125 @@
+import asyncio
+import os
+
+from audio_chunk_cache import AudioChunkCache
+
+
+def make_cache(tmp_path, max_bytes=100):
+    return AudioChunkCache(str(tmp_path), chunk_size=10, max_bytes=max_bytes)
+
+
+def fetcher(data: bytes, calls: list):
+    async def fetch():
+        calls.append(data)
+        await asyncio.sleep(0.01)
+        return data
+    return fetch
+
+
+def test_files_live_in_a_private_subdirectory(tmp_path):
+    unrelated = tmp_path / "keep.txt"
+    unrelated.write_text("not a chunk")
+    cache = make_cache(tmp_path)
+
+    assert cache.directory.parent == tmp_path
+    asyncio.run(cache.get("audio/a.mp3", "1", 0, fetcher(b"x" * 10, [])))
+    assert len(os.listdir(cache.directory)) == 1
+
+    cache.close()
+    assert not cache.directory.exists()
+    assert unrelated.read_text() == "not a chunk"
+
+
+def test_hits_are_served_from_disk(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def run():
+        first = await cache.get("audio/a.mp3", "1", 0, fetcher(b"a" * 10, calls))
+        second = await cache.get("audio/a.mp3", "1", 0, fetcher(b"b" * 10, calls))
+        return first, second
+
+    assert asyncio.run(run()) == (b"a" * 10, b"a" * 10)
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["fetched_bytes"]) == (1, 1, 10)
+
+
+def test_new_generation_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def run():
+        await cache.get("audio/a.mp3", "1", 0, fetcher(b"old", calls))
+        return await cache.get("audio/a.mp3", "2", 0, fetcher(b"new", calls))
+
+    assert asyncio.run(run()) == b"new"
+    assert len(calls) == 2
+
+
+def test_lru_eviction_by_bytes(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=25)
+    calls = []
+
+    async def run():
+        await cache.get("a", "1", 0, fetcher(b"0" * 10, calls))
+        await cache.get("a", "1", 1, fetcher(b"1" * 10, calls))
+        await cache.get("a", "1", 0, fetcher(b"x" * 10, calls))  # Chunk 0 becomes most recent
+        await cache.get("a", "1", 2, fetcher(b"2" * 10, calls))  # 30 bytes: evicts chunk 1
+
+    asyncio.run(run())
+    assert list(cache.entries) == [("a", "1", 0), ("a", "1", 2)]
+    assert cache.bytes == 20
+    assert cache.evictions == 1
+    assert len(os.listdir(cache.directory)) == 2
+
+
+def test_chunks_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=5)
+    assert asyncio.run(cache.get("a", "1", 0, fetcher(b"x" * 10, []))) == b"x" * 10
+    assert cache.stats()["chunks"] == 0
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def run():
+        fetch = fetcher(b"shared", calls)
+        return await asyncio.gather(*(cache.get("a", "1", 0, fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == [b"shared"] * 5
+    assert len(calls) == 1
+    assert cache.misses == 1
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    async def run():
+        fetch = fetcher(b"shared", calls)
+        first = asyncio.ensure_future(cache.get("a", "1", 0, fetch))
+        second = asyncio.ensure_future(cache.get("a", "1", 0, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == b"shared"
+    assert ("a", "1", 0) in cache.entries
+
+
+def test_failed_fetch_is_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def failing():
+        raise FileNotFoundError("gone")
+
+    async def run():
+        try:
+            await cache.get("a", "1", 0, failing)
+        except FileNotFoundError:
+            pass
+        return await cache.get("a", "1", 0, fetcher(b"retry", []))
+
+    assert asyncio.run(run()) == b"retry"
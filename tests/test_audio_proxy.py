@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+from audio_chunk_cache import AudioChunkCache
+from storage_backends import BlobMetadata
+
+SIZE = 1000
+
+
+def test_parse_byte_range():
+    assert server.parse_byte_range("bytes=0-99", SIZE) == (0, 99)
+    assert server.parse_byte_range("bytes=900-", SIZE) == (900, 999)
+    assert server.parse_byte_range("bytes=500-5000", SIZE) == (500, 999)
+    assert server.parse_byte_range(" bytes = 1 - 2 ", SIZE) == (1, 2)
+
+
+def test_parse_suffix_ranges():
+    assert server.parse_byte_range("bytes=-100", SIZE) == (900, 999)
+    assert server.parse_byte_range("bytes=-5000", SIZE) == (0, 999)
+
+
+@pytest.mark.parametrize("header", ["bytes=-0", "bytes=1000-", "bytes=1000-1001"])
+def test_unsatisfiable_ranges_raise_416(header):
+    with pytest.raises(HTTPException) as error:
+        server.parse_byte_range(header, SIZE)
+    assert error.value.status_code == 416
+    assert error.value.headers == {"Content-Range": f"bytes */{SIZE}"}
+
+
+@pytest.mark.parametrize("header", ["bytes=10-5", "bytes=0-1,5-6", "items=0-10", "bytes=-", "bytes=a-b", ""])
+def test_ignored_ranges(header):
+    assert server.parse_byte_range(header, SIZE) is None
+
+
+class FakeRemoteBackend:
+    """A remote storage backend whose blobs can be replaced between reads"""
+
+    def __init__(self, data: bytes, generation: str = "1"):
+        self.data = data
+        self.generation = generation
+        self.reads = []
+
+    async def metadata(self, blob_name):
+        if self.data is None:
+            return None
+        return BlobMetadata(len(self.data), self.generation, "audio/mpeg")
+
+    async def read_range(self, blob_name, generation, start, end):
+        if self.data is None or generation != self.generation:
+            raise FileNotFoundError(blob_name)
+        self.reads.append((start, end))
+        return self.data[start:end + 1]
+
+
+@pytest.fixture
+def remote(monkeypatch, tmp_path):
+    backend = FakeRemoteBackend(bytes(range(256)) * 10)
+    monkeypatch.setattr(server, "storage_backend", backend)
+    monkeypatch.setattr(server, "AUDIO_CHUNK_SIZE", 1000)
+    monkeypatch.setattr(server, "audio_chunk_cache", AudioChunkCache(str(tmp_path), 1000, 10_000))
+    server.audio_metadata_cache.clear()
+
+    async def track_in_scope(access, track_id, action, projection):
+        return {"mp3_blob_name": "audio/x.mp3"}
+
+    monkeypatch.setattr(server, "find_track_in_scope", track_in_scope)
+    yield backend
+    server.audio_metadata_cache.clear()
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def fetch_audio(**headers):
+    async def run():
+        response = await server.get_track_audio("track", make_request(**headers), access=None)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        return response, body
+    return asyncio.run(run())
+
+
+def test_full_response(remote):
+    response, body = fetch_audio()
+    assert response.status_code == 200
+    assert body == remote.data
+    assert response.headers["content-length"] == str(len(remote.data))
+    assert response.headers["etag"] == '"1"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_range_reads_only_the_covering_chunks(remote):
+    response, body = fetch_audio(range="bytes=1500-2100")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 1500-2100/{len(remote.data)}"
+    assert body == remote.data[1500:2101]
+    assert remote.reads == [(1000, 1999), (2000, 2559)]
+
+
+def test_if_range_match_serves_the_range(remote):
+    response, body = fetch_audio(range="bytes=0-9", if_range='"1"')
+    assert response.status_code == 206
+    assert body == remote.data[:10]
+
+
+def test_if_range_mismatch_serves_the_whole_file(remote):
+    response, body = fetch_audio(range="bytes=0-9", if_range='"0"')
+    assert response.status_code == 200
+    assert body == remote.data
+    assert "content-range" not in response.headers
+
+
+def test_unsatisfiable_range(remote):
+    with pytest.raises(HTTPException) as error:
+        fetch_audio(range=f"bytes={len(remote.data)}-")
+    assert error.value.status_code == 416
+
+
+def test_replaced_file_rereads_metadata(remote):
+    fetch_audio(range="bytes=0-9")
+    remote.data, remote.generation = bytes(reversed(remote.data)), "2"
+
+    response, body = fetch_audio(range="bytes=1000-1009")
+    assert response.status_code == 206
+    assert body == remote.data[1000:1010]
+    assert response.headers["etag"] == '"2"'
+
+
+def test_file_replaced_mid_stream_aborts_and_recovers(remote):
+    fetch_audio(range="bytes=0-9")
+    remote.data, remote.generation = b"new file", "2"
+
+    # Chunk 0 of the old generation is cached, so the failure comes after the headers
+    with pytest.raises(FileNotFoundError):
+        fetch_audio()
+    assert "audio/x.mp3" not in server.audio_metadata_cache
+
+    response, body = fetch_audio()
+    assert body == b"new file"
+
+
+def test_deleted_file_is_404(remote):
+    fetch_audio(range="bytes=0-9")
+    remote.data = None
+
+    with pytest.raises(HTTPException) as error:
+        fetch_audio(range="bytes=1000-1009")
+    assert error.value.status_code == 404
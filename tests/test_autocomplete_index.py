@@ -0,0 +1,113 @@
+import asyncio
+
+from autocomplete_index import AutocompleteIndex
+from tests.fakes import FakeCollection
+
+
+def make_index(*tracks):
+    index = AutocompleteIndex()
+    for track in tracks:
+        index.add(track)
+    return index
+
+
+def values(results):
+    return [(result["value"], result["count"]) for result in results]
+
+
+def test_complete_prefixes_case_insensitively_with_counts():
+    index = make_index(
+        {"id": "1", "audio_language": "Telugu", "music_composer": "Ilaiyaraaja"},
+        {"id": "2", "audio_language": "Tamil", "music_composer": "Ilaiyaraaja"},
+        {"id": "3", "audio_language": "Telugu", "music_composer": "Ismail Darbar"},
+        {"id": "4", "audio_language": "Hindi", "music_composer": "A. R. Rahman"},
+    )
+    assert values(index.complete("music_composer", "i")) == [("Ilaiyaraaja", 2), ("Ismail Darbar", 1)]
+    assert values(index.complete("music_composer", " ILA ")) == [("Ilaiyaraaja", 2)]
+    assert values(index.complete("music_composer", "x")) == []
+
+
+def test_complete_is_alphabetical_and_limited():
+    index = make_index(*({"id": str(i), "singer_name": f"Singer {i}"} for i in (3, 1, 2)))
+    assert values(index.complete("singer_name", "singer", limit=2)) == [("Singer 1", 1), ("Singer 2", 1)]
+
+
+def test_complete_restricted_to_languages():
+    index = make_index(
+        {"id": "1", "audio_language": "Telugu", "album_name": "Hits"},
+        {"id": "2", "audio_language": "Tamil", "album_name": "Hits"},
+        {"id": "3", "audio_language": "Hindi", "album_name": "Hindi Hits"},
+    )
+    assert values(index.complete("album_name", "h", languages=["Telugu"])) == [("Hits", 1)]
+    assert values(index.complete("album_name", "h", languages=["Telugu", "Tamil"])) == [("Hits", 2)]
+    assert values(index.complete("album_name", "h", languages=[])) == []
+    assert values(index.complete("album_name", "h")) == [("Hindi Hits", 1), ("Hits", 2)]
+
+
+def test_blank_values_are_not_indexed():
+    index = make_index({"id": "1", "lyricist": "   ", "singer_name": None})
+    assert index.complete("lyricist", "") == []
+    assert index.stats()["distinct_values"]["lyricist"] == 0
+
+
+def test_add_replaces_and_remove_drops_unused_values():
+    index = make_index(
+        {"id": "1", "audio_language": "Telugu", "lyricist": "Sirivennela"},
+        {"id": "2", "audio_language": "Telugu", "lyricist": "Sirivennela"},
+    )
+    index.add({"id": "1", "audio_language": "Telugu", "lyricist": "Sahithi"})
+    assert values(index.complete("lyricist", "s")) == [("Sahithi", 1), ("Sirivennela", 1)]
+
+    index.remove("2")
+    assert values(index.complete("lyricist", "s")) == [("Sahithi", 1)]
+    assert values(index.complete("lyricist", "s", languages=["Telugu"])) == [("Sahithi", 1)]
+    index.remove("2")  # Removing again is a no-op
+    assert len(index) == 1
+
+
+def test_build_and_writes_during_build():
+    index = AutocompleteIndex()
+
+    def concurrent_writes(document):
+        if document["id"] == "1":
+            index.add({"id": "2", "singer_name": "Chitra"})
+            index.remove("3")
+
+    collection = FakeCollection(
+        [
+            {"id": "1", "singer_name": "Balu"},
+            {"id": "2", "singer_name": "Stale"},
+            {"id": "3", "singer_name": "Deleted"},
+        ],
+        on_read=concurrent_writes,
+    )
+    asyncio.run(index.build(collection))
+
+    assert index.ready
+    assert values(index.complete("singer_name", "")) == [("Balu", 1), ("Chitra", 1)]
+    assert index.stats()["tracks"] == 2
+
+
+def test_rebuild_swaps_in_a_fresh_index():
+    index = make_index({"id": "1", "singer_name": "Balu"}, {"id": "gone", "singer_name": "Deleted Elsewhere"})
+    index.ready, index.version = True, 1
+
+    def concurrent_writes(document):
+        assert values(index.complete("singer_name", "del")) == [("Deleted Elsewhere", 1)]
+        if document["id"] == "1":
+            index.add({"id": "2", "singer_name": "Chitra"})
+            index.remove("3")
+
+    collection = FakeCollection(
+        [
+            {"id": "1", "singer_name": "Balu"},
+            {"id": "2", "singer_name": "Stale"},
+            {"id": "3", "singer_name": "Removed"},
+        ],
+        on_read=concurrent_writes,
+    )
+    asyncio.run(index.rebuild(collection, 5))
+
+    assert (index.ready, index.version) == (True, 5)
+    assert values(index.complete("singer_name", "")) == [("Balu", 1), ("Chitra", 1)]
+    assert index._shadow is None
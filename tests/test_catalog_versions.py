@@ -0,0 +1,143 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from autocomplete_index import AutocompleteIndex
+from search_index import TrigramIndex
+from tests.fakes import FakeCollection
+
+
+class FlakyVersions:
+    """catalog_versions collection whose first `failures` writes raise"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.versions = {}
+
+    def increment(self, key):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("MongoDB is down")
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            self.increment(operation._filter["_id"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        self.increment(query["_id"])
+        return {"_id": query["_id"], "version": self.versions[query["_id"]]}
+
+    async def find_one(self, query):
+        if query["_id"] not in self.versions:
+            return None
+        return {"_id": query["_id"], "version": self.versions[query["_id"]]}
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    collection = FlakyVersions()
+    monkeypatch.setattr(server, "db", SimpleNamespace(catalog_versions=collection))
+    monkeypatch.setattr(server, "CATALOG_VERSION_BUMP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(server, "CATALOG_VERSION_REPAIR_RETRY_SECONDS", 0)
+    server.track_result_cache.clear()
+    yield collection
+    server.track_result_cache.clear()
+
+
+async def drain_repairs():
+    while server.catalog_version_repair_tasks:
+        await asyncio.gather(*server.catalog_version_repair_tasks)
+
+
+def test_bump_retries_transient_failures(versions):
+    versions.failures = server.CATALOG_VERSION_BUMP_ATTEMPTS - 1
+    assert asyncio.run(server.bump_catalog_versions({"Telugu", None})) == 1
+    assert versions.versions == {"*": 1, "Telugu": 1}
+    assert not server.catalog_version_repair_tasks
+
+
+def test_failed_bump_never_raises_and_is_repaired(versions):
+    server.track_result_cache.store(("page",), ["Telugu"], "*=1", b"body")
+    versions.failures = server.CATALOG_VERSION_BUMP_ATTEMPTS + 2
+
+    async def run():
+        assert await server.bump_catalog_versions({"Telugu"}) is None
+        assert len(server.track_result_cache) == 0
+        assert versions.versions == {}
+        await drain_repairs()
+
+    asyncio.run(run())
+    assert versions.versions == {"*": 1, "Telugu": 1}
+
+
+def test_repair_gives_up(versions, monkeypatch):
+    monkeypatch.setattr(server, "CATALOG_VERSION_REPAIR_ATTEMPTS", 2)
+    versions.failures = server.CATALOG_VERSION_BUMP_ATTEMPTS + 2
+
+    async def run():
+        await server.bump_catalog_versions({"Telugu"})
+        await drain_repairs()
+
+    asyncio.run(run())
+    assert versions.versions == {}
+
+
+@pytest.fixture
+def search_index(monkeypatch, versions):
+    index = TrigramIndex()
+    tracks = FakeCollection([{"id": "1", "title": "Nee Kallalona"}])
+    monkeypatch.setattr(server, "db", SimpleNamespace(catalog_versions=versions, tracks=tracks))
+    monkeypatch.setattr(server, "track_search_index", index)
+    return index
+
+
+async def drain_rebuilds():
+    while server.catalog_index_rebuilds:
+        await asyncio.gather(*server.catalog_index_rebuilds.values())
+
+
+def test_stale_index_falls_back_to_regex_and_rebuilds(search_index, versions):
+    async def run():
+        versions.versions["*"] = 3
+        await server.rebuild_catalog_index(search_index)
+        assert search_index.version == 3
+        indexed, _ = await server.build_track_search_filter("kalla", "contains")
+
+        versions.versions["*"] = 4  # Written by another instance
+        stale, _ = await server.build_track_search_filter("kalla", "contains")
+        await drain_rebuilds()
+        caught_up, _ = await server.build_track_search_filter("kalla", "contains")
+        return indexed, stale, caught_up
+
+    indexed, stale, caught_up = asyncio.run(run())
+    assert indexed == caught_up == {"id": {"$in": ["1"]}}
+    assert "$or" in stale
+    assert search_index.version == 4
+
+
+def test_own_writes_advance_the_index_version(search_index, versions, monkeypatch):
+    async def no_stats(before, after):
+        pass
+
+    monkeypatch.setattr(server, "update_catalog_stats", no_stats)
+    autocomplete_index = AutocompleteIndex()
+    monkeypatch.setattr(server, "track_autocomplete_index", autocomplete_index)
+
+    async def run():
+        await server.rebuild_catalog_index(search_index)
+        await server.rebuild_catalog_index(autocomplete_index)
+        await server.record_track_change(None, {"id": "2", "title": "Kalla Kapatam"})
+        assert search_index.version == autocomplete_index.version == 1
+
+        versions.versions["*"] += 1  # Another instance's write lands in between
+        await server.record_track_change(None, {"id": "3", "title": "Kallu"})
+        assert search_index.version == autocomplete_index.version == 1
+        assert not await server.catalog_index_is_current(search_index)
+        assert not await server.catalog_index_is_current(autocomplete_index)
+        await drain_rebuilds()
+
+    asyncio.run(run())
+    assert search_index.version == autocomplete_index.version == 3
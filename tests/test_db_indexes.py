@@ -0,0 +1,46 @@
+import asyncio
+
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+from db_indexes import INDEXES, ensure_indexes
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    async def create_index(self, keys, **options):
+        self.db.calls.append((self.name, options.get("name")))
+        if self.db.error is not None and len(self.db.calls) in self.db.failing_calls:
+            raise self.db.error
+
+
+class FakeDatabase:
+    def __init__(self, error=None, failing_calls=()):
+        self.error = error
+        self.failing_calls = set(failing_calls)
+        self.calls = []
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+
+TOTAL = sum(len(indexes) for indexes in INDEXES.values())
+
+
+def test_creates_every_index():
+    db = FakeDatabase()
+    assert asyncio.run(ensure_indexes(db)) is True
+    assert len(db.calls) == TOTAL
+
+
+def test_index_failure_does_not_stop_the_others():
+    db = FakeDatabase(OperationFailure("duplicate key"), failing_calls={1})
+    assert asyncio.run(ensure_indexes(db)) is False
+    assert len(db.calls) == TOTAL
+
+
+def test_unreachable_server_is_logged_not_raised():
+    db = FakeDatabase(ServerSelectionTimeoutError("no servers"), failing_calls=range(1, TOTAL + 1))
+    assert asyncio.run(ensure_indexes(db)) is False
+    assert len(db.calls) == 1
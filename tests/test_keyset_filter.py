@@ -0,0 +1,87 @@
+import pytest
+
+from server import build_keyset_filter
+
+TRACKS = [
+    {"id": "a", "title": "Beta"},
+    {"id": "b", "title": None},
+    {"id": "c", "title": "Alpha"},
+    {"id": "d"},  # Missing field
+    {"id": "e", "title": "Beta"},
+    {"id": "f", "title": None},
+    {"id": "g", "title": "Gamma"},
+]
+
+
+def sort_key(value):
+    # Mongo orders null/missing before strings
+    return (0, "") if value is None else (1, value)
+
+
+def compare(left, right) -> int:
+    left, right = sort_key(left), sort_key(right)
+    return (left > right) - (left < right)
+
+
+def matches(document: dict, condition: dict) -> bool:
+    """Evaluate the subset of the Mongo query language build_keyset_filter emits"""
+    for key, expected in condition.items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in expected):
+                return False
+            continue
+        actual = document.get(key)
+        if isinstance(expected, dict):
+            (operator, operand), = expected.items()
+            if operator == "$gt" and not (actual is not None and compare(actual, operand) > 0):
+                return False
+            if operator == "$lt" and not (actual is not None and compare(actual, operand) < 0):
+                return False
+            if operator == "$ne" and actual == operand:
+                return False
+        elif actual != expected:
+            return False
+    return True
+
+
+def sorted_tracks(direction: int) -> list:
+    return sorted(TRACKS, key=lambda track: (sort_key(track.get("title")), track["id"]), reverse=direction == -1)
+
+
+def test_ascending_non_null_value():
+    assert build_keyset_filter(("title", 1), "Beta", "a") == {
+        "$or": [{"title": {"$gt": "Beta"}}, {"title": "Beta", "id": {"$gt": "a"}}]
+    }
+
+
+def test_descending_non_null_value_includes_nulls_after():
+    assert build_keyset_filter(("title", -1), "Beta", "a") == {
+        "$or": [{"title": {"$lt": "Beta"}}, {"title": "Beta", "id": {"$lt": "a"}}, {"title": None}]
+    }
+
+
+def test_ascending_null_value_includes_every_non_null():
+    assert build_keyset_filter(("title", 1), None, "b") == {
+        "$or": [{"title": None, "id": {"$gt": "b"}}, {"title": {"$ne": None}}]
+    }
+
+
+def test_descending_null_value_stays_within_nulls():
+    assert build_keyset_filter(("title", -1), None, "f") == {
+        "$or": [{"title": None, "id": {"$lt": "f"}}]
+    }
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+def test_pages_cover_every_track_once_in_order(direction, page_size):
+    expected = sorted_tracks(direction)
+    seen = []
+    remaining = expected
+    while remaining:
+        page = remaining[:page_size]
+        seen.extend(page)
+        last = page[-1]
+        keyset = build_keyset_filter(("title", direction), last.get("title"), last["id"])
+        remaining = [track for track in expected if matches(track, keyset)]
+    assert [track["id"] for track in seen] == [track["id"] for track in expected]
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from storage_backends import LocalStorageBackend, StorageBackend, UploadTooLarge
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def sign(blob_name, method="GET", **kwargs):
+    return asyncio.run(server.url_signer.sign(blob_name, timedelta(minutes=5), method=method, **kwargs))
+
+
+@pytest.fixture
+def client():
+    # No context manager: the startup handlers need MongoDB
+    return TestClient(server.app)
+
+
+def test_storage_backend_is_abstract():
+    class Incomplete(StorageBackend):
+        def describe(self, blob_name):
+            return blob_name
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("blob_name", ["../outside.mp3", "audio/../../outside.mp3", "/etc/passwd", ""])
+def test_local_paths_stay_under_the_root(tmp_path, blob_name):
+    with pytest.raises(ValueError):
+        LocalStorageBackend(str(tmp_path)).path(blob_name)
+
+
+def test_local_round_trip(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+
+    async def run():
+        assert await backend.write_stream("audio/a.mp3", chunks(b"abc", b"def")) == 6
+        metadata = await backend.metadata("audio/a.mp3")
+        data = await backend.read_range("audio/a.mp3", metadata.generation, 1, 3)
+        streamed = b"".join([part async for part in backend.iter_range("audio/a.mp3", 2, 5)])
+        deleted = await backend.delete("audio/a.mp3")
+        return metadata, data, streamed, deleted, await backend.delete("audio/a.mp3")
+
+    metadata, data, streamed, deleted, deleted_again = asyncio.run(run())
+    assert (metadata.size, metadata.content_type) == (6, "audio/mpeg")
+    assert (data, streamed) == (b"bcd", b"cdef")
+    assert (deleted, deleted_again) == (True, False)
+
+
+def test_write_stream_limit_keeps_nothing(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(backend.write_stream("audio/big.mp3", chunks(b"x" * 6, b"x" * 6), max_bytes=10))
+    assert list(tmp_path.rglob("*.mp3*")) == []
+
+
+def test_attachment_disposition_ascii():
+    assert server.attachment_disposition("song.mp3") == 'attachment; filename="song.mp3"'
+    assert server.attachment_disposition('say "hi".mp3') == r'attachment; filename="say \"hi\".mp3"'
+    assert server.attachment_disposition("a\r\nSet-Cookie: x.mp3") == 'attachment; filename="a__Set-Cookie: x.mp3"'
+
+
+def test_attachment_disposition_non_ascii():
+    telugu = "పాట.mp3"
+    disposition = server.attachment_disposition(telugu)
+    assert disposition == (
+        "attachment; filename=\"download.mp3\"; filename*=UTF-8''%E0%B0%AA%E0%B0%BE%E0%B0%9F.mp3"
+    )
+    disposition.encode("latin-1")
+    assert server.attachment_disposition("Café.mp3").startswith('attachment; filename="Cafe.mp3"; filename*=')
+
+
+def test_download_with_non_ascii_name(client):
+    asyncio.run(server.storage_backend.write_stream("audio/t.mp3", chunks(b"0123456789")))
+    url = sign("audio/t.mp3", response_disposition=server.attachment_disposition("పాట.mp3"))
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert "filename*=UTF-8''%E0%B0%AA" in response.headers["content-disposition"]
+
+    response = client.get(url, headers={"Range": "bytes=2-4"})
+    assert (response.status_code, response.content) == (206, b"234")
+
+
+def test_download_rejects_tampered_signature(client):
+    url = sign("audio/t.mp3")
+    assert client.get(url.replace("signature=", "signature=0")).status_code == 403
+
+
+def test_upload_limit(client, monkeypatch):
+    monkeypatch.setattr(server, "LOCAL_STORAGE_MAX_UPLOAD_BYTES", 10)
+    url = sign("audio/up.mp3", method="PUT", content_type="audio/mpeg")
+    headers = {"Content-Type": "audio/mpeg"}
+
+    assert client.put(url, content=b"x" * 10, headers=headers).status_code == 200
+    assert client.put(url, content=b"x" * 11, headers=headers).status_code == 413
+    # Without a Content-Length the limit applies while the body is written
+    response = client.put(url, content=iter([b"x" * 6, b"x" * 6]), headers=headers)
+    assert response.status_code == 413
+    assert server.storage_backend.path("audio/up.mp3").read_bytes() == b"x" * 10
+
+
+
+def test_read_range_rejects_a_replaced_generation(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+
+    async def run():
+        await backend.write_stream("audio/a.mp3", chunks(b"old content"))
+        old = await backend.metadata("audio/a.mp3")
+        await backend.write_stream("audio/a.mp3", chunks(b"new content"))
+        # Give the replacement a distinct mtime even where the clock is coarse
+        later = int(old.generation) + 1_000_000_000
+        os.utime(backend.path("audio/a.mp3"), ns=(later, later))
+        new = await backend.metadata("audio/a.mp3")
+
+        with pytest.raises(FileNotFoundError):
+            await backend.read_range("audio/a.mp3", old.generation, 0, 2)
+        return await backend.read_range("audio/a.mp3", new.generation, 0, 2)
+
+    assert asyncio.run(run()) == b"new"
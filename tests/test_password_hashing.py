@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+import server
+from password_hashing import PasswordHasher, PasswordHasherBusy
+
+
+def make_hasher(**kwargs):
+    # The lowest bcrypt cost keeps the tests fast
+    return PasswordHasher(**{"rounds": 4, **kwargs})
+
+
+def test_hash_and_verify_round_trip():
+    hasher = make_hasher()
+
+    async def run():
+        hashed = await hasher.hash("s3cret")
+        return hashed, await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, correct, wrong = asyncio.run(run())
+    assert hashed.startswith("$2b$04$")
+    assert (correct, wrong) == (True, False)
+    assert not hasher.needs_rehash(hashed)
+    assert hasher.stats()["completed"] == 3
+
+
+def test_hashes_are_salted():
+    hasher = make_hasher()
+
+    async def run():
+        return await hasher.hash("same"), await hasher.hash("same")
+
+    first, second = asyncio.run(run())
+    assert first != second
+
+
+def test_legacy_sha256_hashes_verify_and_need_rehash():
+    hasher = make_hasher()
+    legacy = hashlib.sha256(b"old password").hexdigest()
+
+    async def run():
+        return await hasher.verify("old password", legacy), await hasher.verify("other", legacy)
+
+    assert asyncio.run(run()) == (True, False)
+    assert hasher.needs_rehash(legacy)
+    # Legacy checks never reach the pool
+    assert hasher.stats()["completed"] == 0
+
+
+def test_needs_rehash_for_lower_cost_or_unknown_hashes():
+    hasher = make_hasher(rounds=5)
+    assert hasher.needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=4)).decode())
+    assert not hasher.needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=5)).decode())
+    assert hasher.needs_rehash("not a hash")
+
+
+def test_verify_rejects_empty_and_malformed_hashes():
+    hasher = make_hasher()
+
+    async def run():
+        return await hasher.verify("x", ""), await hasher.verify("x", "$2b$04$garbage")
+
+    assert asyncio.run(run()) == (False, False)
+
+
+def test_passwords_longer_than_72_bytes_are_prehashed():
+    hasher = make_hasher()
+    long_password = "p" * 100
+
+    async def run():
+        hashed = await hasher.hash(long_password)
+        # Plain bcrypt would ignore everything past byte 72
+        return await hasher.verify(long_password, hashed), await hasher.verify("p" * 72, hashed)
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_callers_beyond_the_queue_are_turned_away():
+    hasher = make_hasher(workers=1, max_queue=1)
+
+    async def run():
+        # One hash runs, one waits for the slot and the third has nowhere to queue
+        return await asyncio.gather(*(hasher.hash("x") for _ in range(3)), return_exceptions=True)
+
+    first, second, third = asyncio.run(run())
+    assert isinstance(first, str) and isinstance(second, str)
+    assert isinstance(third, PasswordHasherBusy)
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["peak_waiting"]) == (2, 1, 1)
+
+
+def test_busy_hasher_becomes_503(monkeypatch):
+    monkeypatch.setattr(server, "password_hasher", make_hasher(workers=1, max_queue=0))
+
+    async def run():
+        return await asyncio.gather(*(server.get_password_hash("x") for _ in range(2)), return_exceptions=True)
+
+    hashed, error = asyncio.run(run())
+    assert isinstance(hashed, str)
+    assert isinstance(error, HTTPException)
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
@@ -0,0 +1,122 @@
+import asyncio
+
+from search_index import TrigramIndex, trigrams
+from tests.fakes import FakeCollection
+
+
+def make_index(*tracks):
+    index = TrigramIndex()
+    for track in tracks:
+        index.add(track)
+    return index
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_search_matches_substrings_case_insensitively():
+    index = make_index(
+        {"id": "1", "title": "Nee Kallalona", "singer_name": "Sid Sriram"},
+        {"id": "2", "title": "Kalla Kapatam", "album_name": "HITS"},
+        {"id": "3", "title": "Other", "unique_code": "TEL-0042"},
+    )
+    assert index.search("KALLA") == {"1", "2"}
+    assert index.search("sriram") == {"1"}
+    assert index.search("hits") == {"2"}
+    assert index.search("tel-00") == {"3"}
+    assert index.search("  alla ") == {"1", "2"}
+
+
+def test_search_confirms_candidates():
+    # Both trigrams of "abcd" occur in the title, but not next to each other
+    index = make_index({"id": "1", "title": "abc xbcd"})
+    assert index.search("abcd") == set()
+    assert index.search("xbcd") == {"1"}
+
+
+def test_short_queries_are_not_answered():
+    index = make_index({"id": "1", "title": "abc"})
+    assert index.search("ab") is None
+    assert index.search("  a ") is None
+
+
+def test_unknown_trigram_returns_empty_set():
+    index = make_index({"id": "1", "title": "abc"})
+    assert index.search("xyz") == set()
+
+
+def test_add_replaces_and_remove_cleans_postings():
+    index = make_index({"id": "1", "title": "first"})
+    index.add({"id": "1", "title": "second"})
+    assert index.search("first") == set()
+    assert index.search("second") == {"1"}
+    assert len(index) == 1
+
+    index.remove("1")
+    assert len(index) == 0
+    assert index.postings == {}
+    index.remove("1")  # Removing again is a no-op
+
+
+def test_tracks_without_id_are_ignored():
+    index = make_index({"title": "no id"})
+    assert len(index) == 0
+
+
+def test_build_loads_collection_and_reports_stats():
+    index = TrigramIndex()
+    collection = FakeCollection([{"id": str(i), "title": f"track {i:03d}"} for i in range(5)])
+    asyncio.run(index.build(collection))
+
+    assert index.ready
+    assert index.search("track 00") == {"0", "1", "2", "3", "4"}
+    stats = index.stats()
+    assert stats["tracks"] == 5
+    assert stats["memory_bytes"] > 0
+    assert stats["memory_bytes_per_100k_tracks"] == int(stats["memory_bytes"] / 5 * 100_000)
+
+
+def test_writes_during_build_win_over_the_snapshot():
+    index = TrigramIndex()
+
+    def concurrent_writes(document):
+        if document["id"] == "1":
+            # A track updated and one deleted while the cursor is still reading
+            index.add({"id": "2", "title": "updated title"})
+            index.remove("3")
+
+    collection = FakeCollection(
+        [{"id": "1", "title": "one"}, {"id": "2", "title": "stale title"}, {"id": "3", "title": "deleted"}],
+        on_read=concurrent_writes,
+    )
+    asyncio.run(index.build(collection))
+
+    assert index.search("updated") == {"2"}
+    assert index.search("stale") == set()
+    assert index.search("deleted") == set()
+    assert set(index.documents) == {"1", "2"}
+
+
+def test_rebuild_swaps_in_a_fresh_index():
+    index = make_index({"id": "1", "title": "kept"}, {"id": "gone", "title": "deleted elsewhere"})
+    index.ready, index.version = True, 1
+
+    def concurrent_writes(document):
+        assert index.search("deleted") == {"gone"}  # Old entries serve until the swap
+        if document["id"] == "1":
+            index.add({"id": "2", "title": "written during rebuild"})
+            index.remove("3")
+
+    collection = FakeCollection(
+        [{"id": "1", "title": "kept"}, {"id": "2", "title": "stale"}, {"id": "3", "title": "removed"}],
+        on_read=concurrent_writes,
+    )
+    asyncio.run(index.rebuild(collection, 5))
+
+    assert (index.ready, index.version) == (True, 5)
+    assert set(index.documents) == {"1", "2"}
+    assert index.search("during") == {"2"}
+    assert index.search("deleted") == set()
+    assert index._shadow is None
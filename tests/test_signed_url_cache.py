@@ -0,0 +1,136 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+import server
+from models import AccessScope, User
+
+EXPIRATION = timedelta(hours=2)
+TRACK = {"id": "t1", "audio_language": "Telugu", "mp3_blob_name": "audio/t1.mp3", "lyrics_blob_name": "lyrics/t1.pdf"}
+
+
+class CountingSigner:
+    def __init__(self):
+        self.calls = []
+
+    async def sign(self, blob_name, expiration, method="GET", content_type=None, response_disposition=None):
+        self.calls.append(blob_name)
+        return f"https://signed.example/{blob_name}?n={len(self.calls)}"
+
+
+class FakeTracks:
+    """Evaluates the id / audio_language filters built by AccessScope.track_filter"""
+
+    def __init__(self, *tracks):
+        self.tracks = tracks
+
+    async def find_one(self, query, projection=None):
+        for track in self.tracks:
+            languages = query.get("audio_language", {}).get("$in")
+            if track["id"] == query["id"] and (languages is None or track["audio_language"] in languages):
+                return dict(track)
+        return None
+
+
+@pytest.fixture
+def signer(monkeypatch):
+    signer = CountingSigner()
+    monkeypatch.setattr(server, "url_signer", signer)
+    monkeypatch.setattr(server, "signed_url_cache", server.SignedUrlCache(10, 0.5))
+    return signer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(server.time, "time", lambda: now.value)
+    return now
+
+
+def signed_url(blob_name=TRACK["mp3_blob_name"], disposition=None):
+    return asyncio.run(server.get_cached_signed_url(blob_name, EXPIRATION, disposition))
+
+
+def test_url_is_reused_until_the_safety_margin(signer, clock):
+    url, max_age = signed_url()
+    assert max_age == EXPIRATION.total_seconds() / 2
+
+    clock.value += 3000
+    assert signed_url() == (url, EXPIRATION.total_seconds() / 2 - 3000)
+
+    # Less than half of the lifetime left: a fresh URL is signed
+    clock.value += EXPIRATION.total_seconds() / 2 - 3000
+    fresh, max_age = signed_url()
+    assert fresh != url
+    assert max_age == EXPIRATION.total_seconds() / 2
+    assert len(signer.calls) == 2
+    stats = server.signed_url_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_disposition_is_part_of_the_key(signer, clock):
+    inline, _ = signed_url()
+    attachment, _ = signed_url(disposition='attachment; filename="a.mp3"')
+    assert inline != attachment
+    assert len(signer.calls) == 2
+
+
+def test_lru_eviction_keeps_the_blob_index_consistent(signer, clock, monkeypatch):
+    monkeypatch.setattr(server, "signed_url_cache", server.SignedUrlCache(2, 0.5))
+    for blob_name in ("a", "b", "c"):
+        signed_url(blob_name)
+    assert set(server.signed_url_cache.keys_by_blob) == {"b", "c"}
+
+
+@pytest.fixture
+def track_writes(monkeypatch):
+    async def noop(*args):
+        return None
+
+    monkeypatch.setattr(server, "update_catalog_stats", noop)
+    monkeypatch.setattr(server, "bump_catalog_versions", noop)
+    monkeypatch.setattr(server, "track_search_index", server.TrigramIndex())
+    monkeypatch.setattr(server, "track_autocomplete_index", server.AutocompleteIndex())
+
+
+def test_replaced_file_drops_only_that_blob(signer, clock, track_writes):
+    mp3, _ = signed_url(TRACK["mp3_blob_name"])
+    lyrics, _ = signed_url(TRACK["lyrics_blob_name"])
+
+    asyncio.run(server.record_track_change(TRACK, {**TRACK, "mp3_blob_name": "audio/t1-v2.mp3", "title": "New"}))
+    assert signed_url(TRACK["mp3_blob_name"])[0] != mp3
+    assert signed_url(TRACK["lyrics_blob_name"])[0] == lyrics
+
+
+def test_deleted_track_drops_its_blobs(signer, clock, track_writes):
+    signed_url(TRACK["mp3_blob_name"])
+    signed_url(TRACK["lyrics_blob_name"])
+
+    asyncio.run(server.record_track_change(TRACK, None))
+    assert len(server.signed_url_cache) == 0
+    assert server.signed_url_cache.keys_by_blob == {}
+
+
+def scope(role, languages=None):
+    return AccessScope(user=User(username="u", email="u@example.com", user_type=role), role=role, languages=languages)
+
+
+def test_authorization_happens_before_the_cache_lookup(signer, clock, monkeypatch):
+    monkeypatch.setattr(server, "db", SimpleNamespace(tracks=FakeTracks(TRACK)))
+    admin_url = asyncio.run(server.get_track_stream_url("t1", Response(), access=scope("admin")))["url"]
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.get_track_stream_url("t1", Response(), access=scope("manager", ["Hindi"])))
+    assert error.value.status_code == 403
+    # The cached URL was never looked at, let alone handed out
+    stats = server.signed_url_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+
+    response = Response()
+    manager = scope("manager", ["Telugu"])
+    assert asyncio.run(server.get_track_stream_url("t1", response, access=manager))["url"] == admin_url
+    assert response.headers["cache-control"] == f"private, max-age={int(EXPIRATION.total_seconds() / 2)}"
+    assert len(signer.calls) == 1
@@ -0,0 +1,35 @@
+import asyncio
+import csv
+import io
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("value", ["=HYPERLINK(\"http://x\")", "+1+1", "-2+3", "@SUM(A1)", "\tcmd", "\rcmd"])
+def test_csv_cells_that_start_a_formula_are_escaped(value):
+    row = server.csv_export_row({"title": value})
+    assert row[list(server.TRACK_EXPORT_COLUMNS).index("title")] == "'" + value
+
+
+def test_csv_plain_values_are_unchanged():
+    track = {"title": "Nee Kallalona", "music_composer": "A=B", "serial_number": 12, "tempo": None}
+    assert server.csv_export_row(track) == server.export_row(track)
+
+
+def test_stream_csv_export_escapes_formulas(monkeypatch):
+    async def batches(*args):
+        yield [{"id": "1", "title": "=cmd|' /C calc'!A0", "music_composer": "Ilaiyaraaja"}]
+
+    monkeypatch.setattr(server, "iter_track_batches", batches)
+
+    async def collect():
+        return b"".join([chunk async for chunk in server.stream_csv_export(None, {}, False, server.TRACK_DEFAULT_SORT)])
+
+    rows = list(csv.DictReader(io.StringIO(asyncio.run(collect()).decode("utf-8"))))
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["Title"] == "'=cmd|' /C calc'!A0"
+    assert row["Music Composer"] == "Ilaiyaraaja"
+    assert row["Track ID"] == "1"
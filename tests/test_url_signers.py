@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from url_signers import (
+    FakeSigner,
+    ImpersonationSigner,
+    LocalStorageSigner,
+    UrlSigner,
+    build_url_signer,
+    verify_local_storage_signature,
+)
+
+SECRET = b"test-secret"
+BASE_URL = "http://api.example/api/storage"
+
+
+def sign_local(blob_name="audio/a b.mp3", expiration=timedelta(minutes=5), **kwargs):
+    signer = LocalStorageSigner(BASE_URL, SECRET)
+    url = asyncio.run(signer.sign(blob_name, expiration, **kwargs))
+    parts = urlsplit(url)
+    params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+    return unquote(parts.path[len("/api/storage/"):]), params
+
+
+def verify(blob_name, params, method="GET", content_type=None, secret=SECRET):
+    return verify_local_storage_signature(
+        secret, method, blob_name, int(params["expires"]), params["signature"],
+        content_type, params.get("response-content-disposition")
+    )
+
+
+def test_local_signature_round_trip():
+    blob_name, params = sign_local(response_disposition='attachment; filename="a.mp3"')
+    assert blob_name == "audio/a b.mp3"
+    assert params["response-content-disposition"] == 'attachment; filename="a.mp3"'
+    assert verify(blob_name, params)
+
+
+def test_expired_signature_is_rejected():
+    blob_name, params = sign_local(expiration=timedelta(seconds=-1))
+    assert not verify(blob_name, params)
+
+
+def test_expiry_cannot_be_extended():
+    blob_name, params = sign_local()
+    params["expires"] = str(int(params["expires"]) + 3600)
+    assert not verify(blob_name, params)
+
+
+def test_tampered_path_is_rejected():
+    blob_name, params = sign_local()
+    assert not verify("audio/other.mp3", params)
+
+
+def test_tampered_disposition_is_rejected():
+    blob_name, params = sign_local(response_disposition='attachment; filename="a.mp3"')
+    params["response-content-disposition"] = 'attachment; filename="b.mp3"'
+    assert not verify(blob_name, params)
+
+
+def test_wrong_method_is_rejected():
+    blob_name, params = sign_local()
+    assert not verify(blob_name, params, method="PUT")
+
+
+def test_upload_signature_binds_the_content_type():
+    blob_name, params = sign_local(method="PUT", content_type="audio/mpeg")
+    assert verify(blob_name, params, method="PUT", content_type="audio/mpeg")
+    assert not verify(blob_name, params, method="PUT", content_type="text/html")
+
+
+def test_other_secret_is_rejected():
+    blob_name, params = sign_local()
+    assert not verify(blob_name, params, secret=b"another-secret")
+
+
+def test_signature_expires_in_the_future():
+    _, params = sign_local(expiration=timedelta(minutes=5))
+    assert time.time() < int(params["expires"]) <= time.time() + 300
+
+
+def test_fake_signer_is_deterministic_and_counted():
+    signer = FakeSigner()
+
+    async def run():
+        return [await signer.sign("audio/a.mp3", timedelta(hours=2)) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert first.startswith("https://storage.invalid/fake-bucket/audio/a.mp3?")
+    assert signer.stats()["signed"] == 2
+
+
+def test_url_signer_is_abstract():
+    with pytest.raises(TypeError):
+        UrlSigner()
+
+
+def test_failures_are_counted():
+    class FailingSigner(UrlSigner):
+        async def _sign(self, blob_name, expiration, method, content_type, response_disposition):
+            raise RuntimeError("IAM unavailable")
+
+    signer = FailingSigner()
+    with pytest.raises(RuntimeError):
+        asyncio.run(signer.sign("a", timedelta(minutes=1)))
+    assert (signer.stats()["failures"], signer.stats()["in_flight"]) == (1, 0)
+
+
+def test_build_url_signer_selects_the_kind():
+    assert isinstance(build_url_signer("local", local_base_url=BASE_URL, local_secret=SECRET), LocalStorageSigner)
+    assert isinstance(build_url_signer("fake", bucket_name="b"), FakeSigner)
+    signer = build_url_signer("iam", bucket=object(), credential_manager=object(), max_concurrency=3)
+    assert isinstance(signer, ImpersonationSigner)
+    assert signer.max_concurrency == 3
+
+
+@pytest.mark.parametrize("kind, kwargs", [
+    ("iam", {}),
+    ("iam", {"bucket": object()}),
+    ("local_key", {}),
+    ("local_key", {"bucket": object()}),
+    ("local", {"local_base_url": BASE_URL}),
+    ("local", {"local_secret": SECRET}),
+    ("hsm", {}),
+])
+def test_build_url_signer_rejects_missing_configuration(kind, kwargs):
+    with pytest.raises(ValueError):
+        build_url_signer(kind, **kwargs)